@@ -3,26 +3,112 @@ Advanced Analytics Module
 Quantitative analysis functions for trading strategies
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 from scipy import stats
 from statsmodels.tsa.stattools import adfuller
-from sklearn.linear_model import LinearRegression, HuberRegressor
+from sklearn.linear_model import HuberRegressor
+from joblib import Parallel, delayed
 import warnings
-warnings.filterwarnings('ignore')
+
+from config import Config
+from analytics_numba import (
+    NUMBA_AVAILABLE, run_backtest, rolling_zscore, rolling_corr, ols_beta
+)
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# pandas rolling aggregations run through its numba engine when numba is present
+_ROLLING_ENGINE = 'numba' if NUMBA_AVAILABLE else None
+_ROLLING_ENGINE_KWARGS = {'nopython': True, 'nogil': True, 'parallel': False} if NUMBA_AVAILABLE else None
+
+# Timeframe -> pandas offset, using the non-deprecated 's'/'min'/'h' aliases
+_FREQ_CACHE = {
+    tf: pd.tseries.frequencies.to_offset(alias) for tf, alias in {
+        '1s': '1s', '5s': '5s', '10s': '10s', '30s': '30s',
+        '1min': '1min', '5min': '5min', '15min': '15min', '1h': '1h', '1H': '1h'
+    }.items()
+}
+
+# Below this length pandas' rolling corr is cheaper than the kernel call overhead
+_STREAM_CORR_MIN_LEN = 256
+
+# ADF results keyed on the series contents, least recently used evicted first.
+# Streamlit sessions run in separate threads, so every access holds the lock.
+_ADF_CACHE = OrderedDict()
+_ADF_CACHE_LOCK = threading.Lock()
+_ADF_CACHE_MAX_LEN = 100_000  # above this, hashing costs more than it saves
+
+
+def _run_backtest_vectorized(spread_v, zscore_v, entry_th, exit_th):
+    """
+    NumPy equivalent of analytics_numba.run_backtest for environments without numba
+    
+    Signals are evaluated once as boolean arrays; the state machine then only
+    steps trade-to-trade, locating each next entry/exit with np.searchsorted.
+    """
+    n = len(zscore_v)
+    positions = np.zeros(n, dtype=np.int64)
+    
+    short_sig = zscore_v > entry_th
+    long_sig = zscore_v < -entry_th
+    entry_bars = np.flatnonzero(short_sig | long_sig)
+    short_exit_bars = np.flatnonzero(zscore_v < exit_th)
+    long_exit_bars = np.flatnonzero(zscore_v > exit_th)
+    
+    max_trades = n // 2 + 1
+    entries = np.empty(max_trades, dtype=np.int64)
+    exits = np.full(max_trades, -1, dtype=np.int64)
+    sides = np.empty(max_trades, dtype=np.int64)
+    n_trades = 0
+    start = 1
+    while True:
+        k = np.searchsorted(entry_bars, start)
+        if k >= len(entry_bars):
+            break
+        entry = entry_bars[k]
+        side = -1 if short_sig[entry] else 1
+        exit_bars = short_exit_bars if side == -1 else long_exit_bars
+        
+        entries[n_trades] = entry
+        sides[n_trades] = side
+        n_trades += 1
+        
+        j = np.searchsorted(exit_bars, entry + 1)
+        if j >= len(exit_bars):
+            positions[entry:] = side
+            break
+        
+        exit_bar = exit_bars[j]
+        positions[entry:exit_bar] = side
+        exits[n_trades - 1] = exit_bar
+        start = exit_bar + 1
+    
+    return positions, entries[:n_trades], exits[:n_trades], sides[:n_trades]
 
 
 class Analytics:
     """Statistical and quantitative analytics for trading"""
     
     @staticmethod
-    def resample_ohlcv(df: pd.DataFrame, timeframe: str = '1min') -> pd.DataFrame:
+    def resample_ohlcv(df: pd.DataFrame, timeframe: str = '1min',
+                       chunk_size: int = Config.RESAMPLE_CHUNK_SIZE,
+                       engine: str = 'pandas') -> pd.DataFrame:
         """
         Resample tick data to OHLCV candles with gap filling for ALL timeframes
         
         Args:
             df: DataFrame with columns ['symbol', 'timestamp', 'price', 'size']
             timeframe: Resampling period (e.g., '1s', '5s', '1min', '5min')
+            chunk_size: Symbols per parallel worker chunk (single process below 2 chunks)
+            engine: 'pandas' or 'polars' (falls back to pandas if polars is not installed)
         
         Returns:
             DataFrame with OHLCV data (gaps filled with flat candles)
@@ -30,80 +116,329 @@ class Analytics:
         if df.empty:
             return pd.DataFrame()
         
-        # Convert timeframe to pandas frequency format
-        freq_map = {
-            '1s': '1S', '5s': '5S', '10s': '10S', '30s': '30S',
-            '1min': '1T', '5min': '5T', '15min': '15T', '1h': '1H', '1H': '1H'
-        }
-        pandas_freq = freq_map.get(timeframe, timeframe)
-        
         try:
-            df = df.copy()
-            df = df[df['price'] > 0]
+            pandas_freq = Analytics._resolve_freq(timeframe)
+            
+            # Boolean indexing already yields a new frame; project only the needed columns
+            price = df['price'].to_numpy(dtype=np.float64, na_value=np.nan)
+            df = df.loc[price > 0, ['symbol', 'timestamp', 'price', 'size']]
             if df.empty:
                 return pd.DataFrame()
             
-            if df['timestamp'].dtype == 'object':
-                df['datetime'] = pd.to_datetime(df['timestamp'], format='ISO8601')
-            else:
-                df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+            df.index = pd.DatetimeIndex(Analytics._parse_timestamps(df['timestamp']), name='datetime')
             
-            df = df.set_index('datetime')
+            # Polars windows are epoch-aligned, which matches pandas' midnight-anchored
+            # bins only for frequencies that divide a day
+            if engine == 'polars' and pl is not None and Analytics._fixed_freq_ns(pandas_freq):
+                return Analytics._resample_polars(df, pandas_freq)
             
-            ohlc_list = []
-            for symbol in df['symbol'].unique():
-                sdf = df[df['symbol'] == symbol]
-                if sdf.empty:
-                    continue
-                
-                # Resample with pandas frequency
-                price = sdf['price'].resample(pandas_freq).ohlc()
-                if price.empty:
-                    continue
-                
-                price['low'] = price['low'].where(price['low'] > 0)
-                volume = sdf['size'].resample(pandas_freq).sum().rename('volume')
-                result = price.join(volume)
-                
-                # Create complete continuous time range for gap filling
-                if not result.empty:
-                    full_range = pd.date_range(
-                        start=result.index.min(),
-                        end=result.index.max(),
-                        freq=pandas_freq
-                    )
-                    result = result.reindex(full_range)
-                    
-                    # Forward-fill close price for gaps
-                    result['close'] = result['close'].ffill()
-                    
-                    # For gaps: create flat candles (OHLC = Close, Volume = 0)
-                    gap_mask = result['open'].isna()
-                    result.loc[gap_mask, 'open'] = result.loc[gap_mask, 'close']
-                    result.loc[gap_mask, 'high'] = result.loc[gap_mask, 'close']
-                    result.loc[gap_mask, 'low'] = result.loc[gap_mask, 'close']
-                    result.loc[gap_mask, 'volume'] = 0
-                    
-                    # Drop any remaining NaN rows (at start before first trade)
-                    result = result.dropna()
-                
-                if result.empty:
-                    continue
-                
-                result['symbol'] = symbol
-                ohlc_list.append(result)
+            symbols = df['symbol'].unique()
+            chunks = np.array_split(symbols, max(1, len(symbols) // chunk_size))
             
-            if ohlc_list:
-                combined = pd.concat(ohlc_list).reset_index()
-                combined.columns = ['datetime', 'open', 'high', 'low', 'close', 'volume', 'symbol']
-                return combined
+            if len(chunks) > 1:
+                # Resample symbol chunks in parallel worker processes
+                parts = Parallel(n_jobs=-1, backend='loky')(
+                    delayed(Analytics._resample_chunk)(df[df['symbol'].isin(chunk)], pandas_freq)
+                    for chunk in chunks
+                )
+                parts = [p for p in parts if not p.empty]
+                result = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+            else:
+                result = Analytics._resample_chunk(df, pandas_freq)
             
-            return pd.DataFrame()
+            return result
         
         except Exception as e:
             print(f"Error resampling OHLCV: {e}")
             return pd.DataFrame()
     
+    @staticmethod
+    def resample_ohlcv_stream(chunks, timeframe: str = '1min',
+                              chunksize: int = 1_000_000):
+        """
+        Resample tick data chunk by chunk, folding candles that span chunk edges
+        
+        Peak memory follows the chunk size rather than the full tick history.
+        Chunks must arrive in time order (e.g. pd.read_sql(..., chunksize=n)).
+        
+        Args:
+            chunks: Tick DataFrame or iterable of tick DataFrames
+            timeframe: Resampling period (e.g., '1s', '5s', '1min', '5min')
+            chunksize: Rows per chunk when a single DataFrame is passed
+        
+        Yields:
+            DataFrames of finished OHLCV candles (same layout as resample_ohlcv)
+        """
+        if isinstance(chunks, pd.DataFrame):
+            frame = chunks
+            chunks = (frame.iloc[i:i + chunksize] for i in range(0, len(frame), chunksize))
+        
+        pandas_freq = Analytics._resolve_freq(timeframe)
+        columns = ['datetime', 'open', 'high', 'low', 'close', 'volume', 'symbol']
+        carry = {}  # symbol -> last (possibly still open) candle
+        
+        for chunk in chunks:
+            result = Analytics.resample_ohlcv(chunk, timeframe)
+            if result.empty:
+                continue
+            
+            parts = []
+            for symbol, candles in result.groupby('symbol', sort=False, observed=True):
+                candles = candles.reset_index(drop=True)
+                prev = carry.pop(symbol, None)
+                if prev is not None:
+                    first_dt = candles.at[0, 'datetime']
+                    if first_dt == prev['datetime']:
+                        # Same bucket continued in this chunk
+                        candles.at[0, 'open'] = prev['open']
+                        candles.at[0, 'high'] = max(prev['high'], candles.at[0, 'high'])
+                        candles.at[0, 'low'] = min(prev['low'], candles.at[0, 'low'])
+                        candles.at[0, 'volume'] += prev['volume']
+                    else:
+                        parts.append(pd.DataFrame([prev], columns=columns))
+                        gap = pd.date_range(prev['datetime'] + pandas_freq, first_dt - pandas_freq,
+                                            freq=pandas_freq)
+                        if first_dt > prev['datetime'] and len(gap):
+                            close = prev['close']
+                            parts.append(pd.DataFrame({
+                                'datetime': gap, 'open': close, 'high': close, 'low': close,
+                                'close': close, 'volume': 0.0, 'symbol': symbol,
+                            }))
+                
+                carry[symbol] = candles.iloc[-1].to_dict()
+                parts.append(candles.iloc[:-1])
+            
+            parts = [p for p in parts if not p.empty]
+            if parts:
+                yield pd.concat(parts, ignore_index=True)[columns]
+        
+        if carry:
+            yield pd.DataFrame(list(carry.values()), columns=columns)
+    
+    @staticmethod
+    def _resolve_freq(timeframe: str) -> pd.DateOffset:
+        """Prebuilt offset for the known timeframes; anything else is parsed here"""
+        pandas_freq = _FREQ_CACHE.get(timeframe)
+        if pandas_freq is None:
+            pandas_freq = pd.tseries.frequencies.to_offset(timeframe)
+        return pandas_freq
+    
+    @staticmethod
+    def _parse_timestamps(timestamps: pd.Series) -> pd.Series:
+        """
+        Convert tick timestamps (ISO strings or epoch milliseconds) to datetime64
+        
+        Args:
+            timestamps: Timestamp column
+        
+        Returns:
+            datetime64[ns] values aligned with the input
+        """
+        if pd.api.types.is_integer_dtype(timestamps.dtype):
+            # Epoch ms: reinterpret + widen in one NumPy cast, no per-element parsing
+            values = timestamps.to_numpy(dtype=np.int64).astype('datetime64[ms]')
+            return pd.Series(values.astype('datetime64[ns]'), index=timestamps.index)
+        
+        if pd.api.types.is_numeric_dtype(timestamps.dtype):
+            return pd.to_datetime(timestamps, unit='ms')
+        
+        # pandas' ISO8601 parser is a C fast path that also accepts the
+        # whole-second rows isoformat() writes without a fractional part
+        return pd.to_datetime(timestamps, format='ISO8601')
+    
+    @staticmethod
+    def _resample_polars(df: pd.DataFrame, pandas_freq: pd.DateOffset) -> pd.DataFrame:
+        """
+        Polars implementation of the grouped resample + gap fill
+        
+        Args:
+            df: Tick DataFrame indexed by datetime
+            pandas_freq: Pandas resampling offset
+        
+        Returns:
+            DataFrame with OHLCV data, same layout as _resample_chunk
+        """
+        every = f"{pandas_freq.nanos}ns"
+        symbols = df['symbol'].unique()
+        
+        ticks = pl.from_pandas(df[['symbol', 'price', 'size']].reset_index())
+        out = (
+            ticks.sort(['symbol', 'datetime'], maintain_order=True)
+            .group_by_dynamic('datetime', every=every, group_by='symbol')
+            .agg(
+                pl.col('price').first().alias('open'),
+                pl.col('price').max().alias('high'),
+                pl.col('price').min().alias('low'),
+                pl.col('price').last().alias('close'),
+                pl.col('size').sum().alias('volume'),
+            )
+            # Insert the empty buckets, then fill them as flat candles
+            .upsample('datetime', every=every, group_by='symbol', maintain_order=True)
+            .with_columns(
+                pl.col('close').forward_fill().over('symbol'),
+                pl.when(pl.col('low') > 0).then(pl.col('low')).alias('low'),
+                pl.col('open').is_null().alias('_gap'),
+            )
+            .with_columns(
+                pl.when(pl.col('_gap')).then(pl.col('close')).otherwise(pl.col(c)).alias(c)
+                for c in ('open', 'high', 'low')
+            )
+            .with_columns(pl.col('volume').fill_null(0.0))
+            .drop('_gap')
+            .drop_nulls()
+        )
+        if out.is_empty():
+            return pd.DataFrame()
+        
+        result = out.to_pandas()
+        
+        # Keep symbols in first-appearance order like the pandas groupby(sort=False)
+        order = result['symbol'].map({s: i for i, s in enumerate(symbols)}).to_numpy()
+        result = result.iloc[np.argsort(order, kind='stable')].reset_index(drop=True)
+        return result[['datetime', 'open', 'high', 'low', 'close', 'volume', 'symbol']]
+    
+    @staticmethod
+    def _fixed_freq_ns(pandas_freq: pd.DateOffset):
+        """
+        Bucket width in nanoseconds when integer bucketing matches pandas resample
+        
+        Resample bins start at midnight, so epoch-aligned buckets give the same
+        bins only for fixed frequencies that divide a day evenly.
+        
+        Returns:
+            Width in ns, or None to fall back to pandas resample
+        """
+        try:
+            freq_ns = pandas_freq.nanos
+        except ValueError:
+            return None
+        if freq_ns <= 0 or 86_400_000_000_000 % freq_ns:
+            return None
+        return freq_ns
+    
+    @staticmethod
+    def _resample_buckets(df: pd.DataFrame, freq_ns: int) -> pd.DataFrame:
+        """
+        Resample via int64 bucket ids instead of a DatetimeIndex binner
+        
+        Args:
+            df: Tick DataFrame indexed by datetime
+            freq_ns: Bucket width in nanoseconds
+        
+        Returns:
+            DataFrame with OHLCV data, same layout as the resample path
+        """
+        codes, symbols = pd.factorize(df['symbol'], sort=False)
+        ts = df.index.as_unit('ns').asi8
+        
+        # Order ticks by (symbol, time); lexsort is stable, so equal timestamps keep row order
+        order = np.lexsort((ts, codes))
+        bucket = ts[order] // freq_ns
+        price = df['price'].to_numpy(dtype=np.float64)[order]
+        size = np.nan_to_num(df['size'].to_numpy(dtype=np.float64))[order]
+        
+        b_min = bucket.min()
+        span = bucket.max() - b_min + 1
+        key = codes[order].astype(np.int64) * span + (bucket - b_min)
+        
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        ends = np.r_[starts[1:], len(key)]
+        group_key = key[starts]
+        group_code = group_key // span
+        group_bucket = group_key % span
+        
+        # Dense per-symbol grid from first to last traded bucket
+        code_starts = np.flatnonzero(np.r_[True, group_code[1:] != group_code[:-1]])
+        code_ends = np.r_[code_starts[1:], len(group_code)]
+        first_bucket = group_bucket[code_starts]
+        lengths = group_bucket[code_ends - 1] - first_bucket + 1
+        offsets = np.r_[0, np.cumsum(lengths)[:-1]]
+        n_rows = int(lengths.sum())
+        
+        seg = np.repeat(np.arange(len(lengths)), code_ends - code_starts)
+        pos = offsets[seg] + (group_bucket - first_bucket[seg])
+        
+        close = np.full(n_rows, np.nan)
+        close[pos] = price[ends - 1]
+        filled = np.zeros(n_rows, dtype=bool)
+        filled[pos] = True
+        
+        # Forward-fill close: every symbol's grid starts on a traded bucket
+        last_seen = np.where(filled, np.arange(n_rows), 0)
+        np.maximum.accumulate(last_seen, out=last_seen)
+        close = close[last_seen]
+        
+        # Gap buckets become flat candles (OHLC = Close, Volume = 0)
+        open_ = close.copy()
+        high = close.copy()
+        low = close.copy()
+        volume = np.zeros(n_rows)
+        open_[pos] = price[starts]
+        high[pos] = np.maximum.reduceat(price, starts)
+        low[pos] = np.minimum.reduceat(price, starts)
+        volume[pos] = np.add.reduceat(size, starts)
+        
+        row_seg = np.repeat(np.arange(len(lengths)), lengths)
+        row_bucket = first_bucket[row_seg] + (np.arange(n_rows) - offsets[row_seg]) + b_min
+        
+        return pd.DataFrame({
+            'datetime': (row_bucket * freq_ns).view('datetime64[ns]'),
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume,
+            'symbol': symbols.take(group_code[code_starts][row_seg]),
+        })
+    
+    @staticmethod
+    def _resample_chunk(df: pd.DataFrame, pandas_freq: pd.DateOffset) -> pd.DataFrame:
+        """
+        Resample a datetime-indexed tick frame (one or more symbols) to OHLCV
+        
+        Args:
+            df: Tick DataFrame indexed by datetime
+            pandas_freq: Pandas resampling offset
+        
+        Returns:
+            DataFrame with OHLCV data (gaps filled with flat candles)
+        """
+        freq_ns = Analytics._fixed_freq_ns(pandas_freq)
+        if freq_ns is not None:
+            return Analytics._resample_buckets(df, freq_ns)
+        
+        # Resample all symbols in a single grouped pass
+        result = df.groupby('symbol', sort=False)[['price', 'size']].resample(pandas_freq).agg(
+            open=('price', 'first'),
+            high=('price', 'max'),
+            low=('price', 'min'),
+            close=('price', 'last'),
+            volume=('size', 'sum'),
+        )
+        if result.empty:
+            return pd.DataFrame()
+        
+        result['low'] = result['low'].where(result['low'] > 0)
+        
+        # Forward-fill close price for gaps (within each symbol)
+        result['close'] = result['close'].groupby(level='symbol', sort=False).ffill()
+        
+        # For gaps: create flat candles (OHLC = Close, Volume = 0)
+        ohl = result[['open', 'high', 'low']].to_numpy(dtype=np.float64, na_value=np.nan)
+        close = result['close'].to_numpy(dtype=np.float64, na_value=np.nan)
+        gap_mask = np.isnan(ohl[:, 0])
+        result[['open', 'high', 'low']] = np.where(gap_mask[:, None], close[:, None], ohl)
+        result['volume'] = np.where(gap_mask, 0.0, result['volume'].to_numpy(dtype=np.float64, na_value=np.nan))
+        
+        # Drop any remaining NaN rows (at start before first trade)
+        result = result.dropna()
+        
+        if result.empty:
+            return pd.DataFrame()
+        
+        combined = result.reset_index()
+        return combined[['datetime', 'open', 'high', 'low', 'close', 'volume', 'symbol']]
+    
     @staticmethod
     def calculate_hedge_ratio(price1: pd.Series, price2: pd.Series, 
                              method: str = 'ols', window: int = 20) -> tuple:
@@ -179,12 +514,15 @@ class Analytics:
                 
                 # Calculate rolling covariance and variance
                 cov = df['x'].rolling(window=window).cov(df['y'])
-                var = df['x'].rolling(window=window).var()
+                var = df['x'].rolling(window=window).var(engine=_ROLLING_ENGINE,
+                                                         engine_kwargs=_ROLLING_ENGINE_KWARGS)
                 
                 beta = cov / var
-                alpha = df['y'].rolling(window=window).mean() - beta * df['x'].rolling(window=window).mean()
+                means = df.rolling(window=window).mean(engine=_ROLLING_ENGINE,
+                                                       engine_kwargs=_ROLLING_ENGINE_KWARGS)
+                alpha = means['y'] - beta * means['x']
                 
-                return beta.fillna(method='bfill').fillna(0), alpha.fillna(method='bfill').fillna(0)
+                return beta.bfill().fillna(0), alpha.bfill().fillna(0)
             
             elif method == 'tls':
                 # Total Least Squares (Orthogonal Regression)
@@ -206,13 +544,32 @@ class Analytics:
                 
                 return float(beta), float(alpha)
                 
-            else:
-                # Standard OLS or Huber
-                X_r = X.reshape(-1, 1)
-                model = HuberRegressor() if method == 'huber' else LinearRegression()
-                model.fit(X_r, y)
+            elif method == 'huber':
+                # Robust regression (iteratively reweighted, needs the solver)
+                model = HuberRegressor()
+                with warnings.catch_warnings():
+                    # Convergence warnings on short/flat windows are expected here
+                    warnings.simplefilter('ignore')
+                    model.fit(X.reshape(-1, 1), y)
                 
                 return float(model.coef_[0]), float(model.intercept_)
+            
+            else:
+                # Standard OLS in closed form: beta = cov(x, y) / var(x)
+                x = np.ascontiguousarray(X, dtype=np.float64)
+                y = np.ascontiguousarray(y, dtype=np.float64)
+                if NUMBA_AVAILABLE:
+                    beta, alpha = ols_beta(x, y)
+                    return float(beta), float(alpha)
+                
+                xm = x.mean()
+                ym = y.mean()
+                dx = x - xm
+                sxx = dx @ dx
+                beta = (dx @ (y - ym)) / sxx if sxx != 0 else 0.0
+                alpha = ym - beta * xm
+                
+                return float(beta), float(alpha)
         
         except Exception as e:
             print(f"Error calculating hedge ratio ({method}): {e}")
@@ -234,6 +591,23 @@ class Analytics:
         """
         return price1 - hedge_ratio * price2
     
+    @staticmethod
+    def calculate_spread_raw(p1: np.ndarray, p2: np.ndarray, hedge_ratio=1.0) -> np.ndarray:
+        """
+        Array variant of calculate_spread (no index alignment)
+        
+        Args:
+            p1: First price array
+            p2: Second price array
+            hedge_ratio: Scalar or per-bar hedge ratio array
+        
+        Returns:
+            Spread array
+        """
+        spread = np.multiply(p2, hedge_ratio, dtype=np.float64)
+        np.subtract(p1, spread, out=spread)
+        return spread
+    
     @staticmethod
     def calculate_zscore(series: pd.Series, window: int = 20) -> pd.Series:
         """
@@ -250,19 +624,43 @@ class Analytics:
             return pd.Series(0, index=series.index)
         
         try:
-            rolling_mean = series.rolling(window=window).mean()
-            rolling_std = series.rolling(window=window).std()
-            
-            # Avoid division by zero
-            rolling_std = rolling_std.replace(0, np.nan)
-            
-            zscore = (series - rolling_mean) / rolling_std
-            return zscore.fillna(0)
+            return pd.Series(Analytics.calculate_zscore_raw(series.to_numpy(), window), index=series.index)
         
         except Exception as e:
             print(f"Error calculating z-score: {e}")
             return pd.Series(0, index=series.index)
     
+    @staticmethod
+    def calculate_zscore_raw(values: np.ndarray, window: int = 20, basic_window: int = 64) -> np.ndarray:
+        """
+        Array variant of calculate_zscore (undefined windows yield 0)
+        
+        Args:
+            values: Price or spread array
+            window: Rolling window size
+            basic_window: Minimum ticks between exact re-computations of the window statistics
+        
+        Returns:
+            Z-score array
+        """
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        if len(values) < window:
+            return np.zeros(len(values))
+        
+        if NUMBA_AVAILABLE:
+            # Single-pass Welford kernel (mean and M2 slide together)
+            return rolling_zscore(values, int(window), int(basic_window))
+        
+        series = pd.Series(values)
+        rolling_mean = series.rolling(window=window).mean()
+        rolling_std = series.rolling(window=window).std()
+        
+        # Avoid division by zero
+        rolling_std = rolling_std.replace(0, np.nan)
+        
+        zscore = (series - rolling_mean) / rolling_std
+        return zscore.fillna(0).to_numpy()
+    
     @staticmethod
     def adf_test(series: pd.Series) -> dict:
         """
@@ -279,19 +677,81 @@ class Analytics:
             if len(series_clean) < 10:
                 return None
             
-            result = adfuller(series_clean, maxlag=min(10, len(series_clean)//5))
+            values = np.ascontiguousarray(series_clean.to_numpy(), dtype=np.float64)
+            key = None
+            if Config.ADF_CACHE_SIZE > 0 and len(values) <= _ADF_CACHE_MAX_LEN:
+                key = (len(values), hashlib.blake2b(values.tobytes(), digest_size=16).digest())
+                with _ADF_CACHE_LOCK:
+                    cached = _ADF_CACHE.get(key)
+                    if cached is not None:
+                        _ADF_CACHE.move_to_end(key)
+                if cached is not None:
+                    return {**cached, 'critical_values': dict(cached['critical_values'])}
             
-            return {
+            with warnings.catch_warnings():
+                # statsmodels warns on near-constant or short series
+                warnings.simplefilter('ignore')
+                result = adfuller(values, maxlag=min(10, len(values)//5))
+            
+            output = {
                 'statistic': float(result[0]),
                 'pvalue': float(result[1]),
                 'critical_values': {k: float(v) for k, v in result[4].items()},
                 'is_stationary': result[1] < 0.05
             }
+            
+            if key is not None:
+                with _ADF_CACHE_LOCK:
+                    _ADF_CACHE[key] = {**output, 'critical_values': dict(output['critical_values'])}
+                    if len(_ADF_CACHE) > Config.ADF_CACHE_SIZE:
+                        _ADF_CACHE.popitem(last=False)
+            
+            return output
         
         except Exception as e:
             print(f"Error in ADF test: {e}")
             return None
     
+    @staticmethod
+    def correlation_matrix(df: pd.DataFrame, symbols: list) -> pd.DataFrame:
+        """
+        Pairwise close-price correlation between symbols, aligned on datetime
+        
+        Same result as pivot_table + DataFrame.corr() for candles that are
+        unique per (symbol, datetime), without building the pivot through a
+        groupby: rows are scattered into a preallocated time x symbol array.
+        
+        Args:
+            df: Long-format DataFrame with symbol, datetime and close columns
+            symbols: Symbols to correlate, in output order
+        
+        Returns:
+            Square correlation DataFrame indexed by symbol on both axes
+        """
+        symbols = list(symbols)
+        sub = df[df['symbol'].isin(symbols)]
+        rows, times = pd.factorize(sub['datetime'])
+        cols = pd.Index(symbols).get_indexer(sub['symbol'])
+        
+        wide = np.full((len(times), len(symbols)), np.nan)
+        wide[rows, cols] = sub['close'].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(wide)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if valid.all():
+                corr = np.corrcoef(wide, rowvar=False).reshape(len(symbols), len(symbols))
+            else:
+                # Gaps: each pair uses only the times both symbols traded, like pandas
+                corr = np.full((len(symbols), len(symbols)), np.nan)
+                for i in range(len(symbols)):
+                    for j in range(i, len(symbols)):
+                        both = valid[:, i] & valid[:, j]
+                        if both.sum() > 1:
+                            corr[i, j] = corr[j, i] = np.corrcoef(wide[both, i], wide[both, j])[0, 1]
+        
+        return pd.DataFrame(corr, index=pd.Index(symbols, name='symbol'),
+                            columns=pd.Index(symbols, name='symbol'))
+    
     @staticmethod
     def rolling_correlation(s1: pd.Series, s2: pd.Series, 
                            window: int = 20) -> pd.Series:
@@ -306,12 +766,46 @@ class Analytics:
         Returns:
             Rolling correlation series
         """
+        # Long series go through the O(1)-per-tick running co-moment kernel
+        if NUMBA_AVAILABLE and len(s1) > _STREAM_CORR_MIN_LEN:
+            return Analytics.rolling_correlation_stream(s1, s2, window)
+        
         try:
             return s1.rolling(window=window).corr(s2)
         except Exception as e:
             print(f"Error calculating rolling correlation: {e}")
             return pd.Series(0, index=s1.index)
     
+    @staticmethod
+    def rolling_correlation_stream(s1: pd.Series, s2: pd.Series,
+                                   window: int = 20, basic_window: int = 64) -> pd.Series:
+        """
+        Rolling correlation with incremental per-tick updates
+        
+        Same output as rolling_correlation, but each new tick updates the window
+        statistics in O(1) instead of recomputing them over the whole window.
+        
+        Args:
+            s1: First series
+            s2: Second series
+            window: Rolling window size
+            basic_window: Minimum ticks between exact re-computations of the window statistics
+        
+        Returns:
+            Rolling correlation series
+        """
+        if not NUMBA_AVAILABLE:
+            return Analytics.rolling_correlation(s1, s2, window)
+        
+        try:
+            s1, s2 = s1.align(s2)
+            x = np.ascontiguousarray(s1.to_numpy(), dtype=np.float64)
+            y = np.ascontiguousarray(s2.to_numpy(), dtype=np.float64)
+            return pd.Series(rolling_corr(x, y, int(window), int(basic_window)), index=s1.index)
+        except Exception as e:
+            print(f"Error calculating rolling correlation: {e}")
+            return pd.Series(0, index=s1.index)
+    
     @staticmethod
     def backtest_mean_reversion(spread: pd.Series, zscore: pd.Series,
                                 entry_th: float = 2.0, 
@@ -329,61 +823,133 @@ class Analytics:
             (trades_df, positions_series)
         """
         try:
-            positions = pd.Series(0, index=spread.index)
-            trades = []
-            pos = 0
-            entry_price = 0
+            # C-contiguous float64 views keep the kernel on a single compiled signature
+            spread_v = np.ascontiguousarray(spread.to_numpy(), dtype=np.float64)
+            zscore_v = np.ascontiguousarray(zscore.to_numpy(), dtype=np.float64)
             
-            for i in range(1, len(zscore)):
-                z = zscore.iloc[i]
-                
-                # Entry logic
-                if pos == 0:
-                    if z > entry_th:  # Short when z-score is high
-                        pos = -1
-                        entry_price = spread.iloc[i]
-                        trades.append({
-                            'entry_time': spread.index[i],
-                            'entry_price': entry_price,
-                            'entry_zscore': z,
-                            'side': 'short'
-                        })
-                    elif z < -entry_th:  # Long when z-score is low
-                        pos = 1
-                        entry_price = spread.iloc[i]
-                        trades.append({
-                            'entry_time': spread.index[i],
-                            'entry_price': entry_price,
-                            'entry_zscore': z,
-                            'side': 'long'
-                        })
-                
-                # Exit logic
-                elif pos != 0:
-                    if (pos == -1 and z < exit_th) or (pos == 1 and z > exit_th):
-                        trades[-1]['exit_time'] = spread.index[i]
-                        trades[-1]['exit_price'] = spread.iloc[i]
-                        trades[-1]['exit_zscore'] = z
-                        trades[-1]['pnl'] = pos * (entry_price - spread.iloc[i])
-                        pos = 0
-                
-                positions.iloc[i] = pos
+            backtest_fn = run_backtest if NUMBA_AVAILABLE else _run_backtest_vectorized
+            pos_v, entry_idx, exit_idx, sides = backtest_fn(
+                spread_v, zscore_v, float(entry_th), float(exit_th)
+            )
             
-            return pd.DataFrame(trades), positions
+            positions = pd.Series(pos_v, index=spread.index)
+            return Analytics._build_trades(spread, spread_v, zscore_v, entry_idx, exit_idx, sides), positions
         
         except Exception as e:
             print(f"Error in backtest: {e}")
             return pd.DataFrame(), pd.Series(0, index=spread.index)
     
+    @staticmethod
+    def backtest_pair(price1: pd.Series, price2: pd.Series, hedge_ratio=1.0,
+                      window: int = 20, entry_th: float = 2.0,
+                      exit_th: float = 0.0) -> tuple[pd.Series, pd.Series, pd.DataFrame, pd.Series]:
+        """
+        Spread -> z-score -> backtest pipeline on raw arrays
+        
+        Intermediates stay as ndarrays; Series are only built for the outputs.
+        
+        Args:
+            price1: First price series
+            price2: Second price series (same index as price1)
+            hedge_ratio: Scalar or per-bar hedge ratio series
+            window: Z-score rolling window
+            entry_th: Entry threshold (absolute z-score)
+            exit_th: Exit threshold (z-score)
+        
+        Returns:
+            (spread_series, zscore_series, trades_df, positions_series)
+        """
+        index = price1.index
+        try:
+            if isinstance(hedge_ratio, pd.Series):
+                hedge_ratio = hedge_ratio.reindex(index).to_numpy(dtype=np.float64)
+            
+            spread_v = Analytics.calculate_spread_raw(price1.to_numpy(dtype=np.float64),
+                                                      price2.to_numpy(dtype=np.float64),
+                                                      hedge_ratio)
+            zscore_v = Analytics.calculate_zscore_raw(spread_v, window)
+            
+            backtest_fn = run_backtest if NUMBA_AVAILABLE else _run_backtest_vectorized
+            pos_v, entry_idx, exit_idx, sides = backtest_fn(
+                spread_v, zscore_v, float(entry_th), float(exit_th)
+            )
+            
+            spread = pd.Series(spread_v, index=index)
+            trades = Analytics._build_trades(spread, spread_v, zscore_v, entry_idx, exit_idx, sides)
+            return spread, pd.Series(zscore_v, index=index), trades, pd.Series(pos_v, index=index)
+        
+        except Exception as e:
+            print(f"Error in backtest: {e}")
+            empty = pd.Series(0, index=index)
+            return empty, empty, pd.DataFrame(), empty
+    
+    @staticmethod
+    def _build_trades(spread: pd.Series, spread_v: np.ndarray, zscore_v: np.ndarray,
+                      entry_idx: np.ndarray, exit_idx: np.ndarray,
+                      sides: np.ndarray) -> pd.DataFrame:
+        """
+        Assemble the trade log from entry/exit bar indices
+        
+        Args:
+            spread: Spread series (supplies the time index)
+            spread_v: Spread values
+            zscore_v: Z-score values
+            entry_idx: Entry bar index per trade
+            exit_idx: Exit bar index per trade (-1 while still open)
+            sides: Position per trade (-1 short, 1 long)
+        
+        Returns:
+            Trade log DataFrame (exit columns only present once a trade has closed)
+        """
+        if len(entry_idx) == 0:
+            return pd.DataFrame()
+        
+        entry_price = spread_v[entry_idx]
+        trades = pd.DataFrame({
+            'entry_time': spread.index[entry_idx],
+            'entry_price': entry_price,
+            'entry_zscore': zscore_v[entry_idx],
+            'side': np.where(sides == -1, 'short', 'long'),
+        })
+        
+        closed = exit_idx >= 0
+        if closed.any():
+            exit_pos = np.where(closed, exit_idx, 0)
+            exit_price = np.where(closed, spread_v[exit_pos], np.nan)
+            trades['exit_time'] = spread.index[exit_pos].where(closed)
+            trades['exit_price'] = exit_price
+            trades['exit_zscore'] = np.where(closed, zscore_v[exit_pos], np.nan)
+            trades['pnl'] = sides * (entry_price - exit_price)
+        
+        return trades
+    
     @staticmethod
     def calculate_returns(prices: pd.Series) -> pd.Series:
         """Calculate percentage returns"""
-        return prices.pct_change().fillna(0)
+        return pd.Series(Analytics.calculate_returns_raw(prices.to_numpy()), index=prices.index)
+    
+    @staticmethod
+    def calculate_returns_raw(prices: np.ndarray) -> np.ndarray:
+        """Array variant of calculate_returns"""
+        p = np.ascontiguousarray(prices, dtype=np.float64)
+        out = np.empty_like(p)
+        if len(p) == 0:
+            return out
+        
+        # Single pass p[t] / p[t-1] - 1 written straight into the output buffer
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(p[1:], p[:-1], out=out[1:])
+        out[1:] -= 1.0
+        out[0] = 0.0
+        out[np.isnan(out)] = 0.0  # same as fillna(0)
+        return out
     
     @staticmethod
     def calculate_volatility(returns: pd.Series, window: int = 20) -> pd.Series:
         """Calculate rolling volatility"""
-        return returns.rolling(window=window).std() * np.sqrt(252)  # Annualized
+        volatility = returns.rolling(window=window).std(engine=_ROLLING_ENGINE,
+                                                        engine_kwargs=_ROLLING_ENGINE_KWARGS)
+        return volatility * np.sqrt(252)  # Annualized
     
     @staticmethod
     def calculate_sharpe_ratio(returns: pd.Series, risk_free_rate: float = 0.0) -> float:
@@ -391,8 +957,18 @@ class Analytics:
         if len(returns) < 2:
             return 0.0
         
-        excess_returns = returns - risk_free_rate / 252  # Daily risk-free rate
-        if excess_returns.std() == 0:
+        excess_returns = returns.to_numpy(dtype=np.float64) - risk_free_rate / 252  # Daily risk-free rate
+        nan_mask = np.isnan(excess_returns)
+        if nan_mask.any():
+            excess_returns = excess_returns[~nan_mask]
+        if len(excess_returns) < 2:
+            return 0.0
+        
+        # Mean and sample std from one set of deviations (ddof=1, as pandas .std())
+        mean = excess_returns.mean()
+        dev = excess_returns - mean
+        std = np.sqrt(dev @ dev / (len(dev) - 1))
+        if std == 0:
             return 0.0
         
-        return np.sqrt(252) * excess_returns.mean() / excess_returns.std()
+        return np.sqrt(252) * mean / std
@@ -0,0 +1,260 @@
+"""
+Numba-compiled analytics kernels
+Tight loops over contiguous float64 arrays used by the Analytics class
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def run_backtest(spread_v, zscore_v, entry_th, exit_th):
+    """
+    Mean reversion state machine over raw arrays
+    
+    Returns:
+        (positions, entry_idx, exit_idx, sides) - exit_idx is -1 for open trades
+    """
+    n = len(zscore_v)
+    max_trades = n // 2 + 1
+    positions = np.zeros(n, dtype=np.int64)
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.full(max_trades, -1, dtype=np.int64)
+    sides = np.empty(max_trades, dtype=np.int64)
+    n_trades = 0
+    pos = 0
+    
+    for i in range(1, n):
+        z = zscore_v[i]
+        
+        # Entry logic
+        if pos == 0:
+            if z > entry_th:  # Short when z-score is high
+                pos = -1
+                entry_idx[n_trades] = i
+                sides[n_trades] = pos
+                n_trades += 1
+            elif z < -entry_th:  # Long when z-score is low
+                pos = 1
+                entry_idx[n_trades] = i
+                sides[n_trades] = pos
+                n_trades += 1
+        
+        # Exit logic
+        elif (pos == -1 and z < exit_th) or (pos == 1 and z > exit_th):
+            exit_idx[n_trades - 1] = i
+            pos = 0
+        
+        positions[i] = pos
+    
+    return positions, entry_idx[:n_trades], exit_idx[:n_trades], sides[:n_trades]
+
+
+@njit(cache=True)
+def rolling_zscore(x, window, basic_window):
+    """
+    Rolling z-score in one pass using Welford's running mean/M2 with window eviction
+    
+    Matches pandas rolling(window).mean()/.std() (ddof=1, min_periods=window);
+    undefined or zero-variance windows yield 0 like Analytics.calculate_zscore's fillna(0).
+    Every max(basic_window, window) ticks the mean and M2 are recomputed exactly over
+    the current window so rounding drift stays bounded at amortized O(1) cost.
+    """
+    n = len(x)
+    out = np.zeros(n)
+    if window < 1:
+        return out
+    
+    resync = max(basic_window, window)
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    prev = np.nan
+    same_run = 0
+    
+    for i in range(n):
+        v = x[i]
+        if v == v:
+            count += 1
+            delta = v - mean
+            mean += delta / count
+            m2 += delta * (v - mean)
+            
+            # Track identical trailing values so flat windows give exactly zero variance
+            if v == prev:
+                same_run += 1
+            else:
+                same_run = 1
+                prev = v
+        
+        if i >= window:
+            old = x[i - window]
+            if old == old:
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = old - mean
+                    mean -= delta / count
+                    m2 -= delta * (old - mean)
+        
+        # Re-anchor the running moments once per basic window
+        if (i + 1) % resync == 0 and count > 0:
+            start = max(0, i - window + 1)
+            total = 0.0
+            for j in range(start, i + 1):
+                if x[j] == x[j]:
+                    total += x[j]
+            mean = total / count
+            m2 = 0.0
+            for j in range(start, i + 1):
+                if x[j] == x[j]:
+                    m2 += (x[j] - mean) * (x[j] - mean)
+        
+        if v == v and count >= window and count > 1 and same_run < count:
+            var = m2 / (count - 1)
+            if var > 0.0:
+                out[i] = (v - mean) / np.sqrt(var)
+    
+    return out
+
+
+@njit(cache=True)
+def rolling_corr(x, y, window, basic_window):
+    """
+    Rolling Pearson correlation with O(1) per-tick co-moment updates
+    
+    Running means, M2s and the cross moment are updated on arrival and eviction;
+    every max(basic_window, window) ticks they are recomputed exactly over the
+    current window so rounding drift stays bounded at amortized O(1) cost. Output
+    is NaN until a window holds `window` valid (both non-NaN) pairs, or when
+    either side has zero variance.
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    if window < 2:
+        return out
+    
+    resync = max(basic_window, window)
+    count = 0
+    mx = 0.0
+    my = 0.0
+    m2x = 0.0
+    m2y = 0.0
+    cxy = 0.0
+    
+    for i in range(n):
+        xv = x[i]
+        yv = y[i]
+        if xv == xv and yv == yv:
+            count += 1
+            dx = xv - mx
+            dy = yv - my
+            mx += dx / count
+            my += dy / count
+            m2x += dx * (xv - mx)
+            m2y += dy * (yv - my)
+            cxy += dx * (yv - my)
+        
+        if i >= window:
+            xo = x[i - window]
+            yo = y[i - window]
+            if xo == xo and yo == yo:
+                count -= 1
+                if count == 0:
+                    mx = 0.0
+                    my = 0.0
+                    m2x = 0.0
+                    m2y = 0.0
+                    cxy = 0.0
+                else:
+                    mx_old = mx
+                    my_old = my
+                    mx -= (xo - mx) / count
+                    my -= (yo - my) / count
+                    m2x -= (xo - mx) * (xo - mx_old)
+                    m2y -= (yo - my) * (yo - my_old)
+                    cxy -= (xo - mx) * (yo - my_old)
+        
+        # Re-anchor the running moments once per basic window
+        if (i + 1) % resync == 0 and count > 0:
+            start = max(0, i - window + 1)
+            sx = 0.0
+            sy = 0.0
+            for j in range(start, i + 1):
+                if x[j] == x[j] and y[j] == y[j]:
+                    sx += x[j]
+                    sy += y[j]
+            mx = sx / count
+            my = sy / count
+            m2x = 0.0
+            m2y = 0.0
+            cxy = 0.0
+            for j in range(start, i + 1):
+                if x[j] == x[j] and y[j] == y[j]:
+                    ddx = x[j] - mx
+                    ddy = y[j] - my
+                    m2x += ddx * ddx
+                    m2y += ddy * ddy
+                    cxy += ddx * ddy
+        
+        if count >= window and m2x > 0.0 and m2y > 0.0:
+            r = cxy / np.sqrt(m2x * m2y)
+            out[i] = min(1.0, max(-1.0, r))
+    
+    return out
+
+
+@njit(cache=True)
+def ols_beta(x, y):
+    """
+    OLS slope and intercept of y on x in two fused passes (means, then co-moments)
+    
+    Returns:
+        (beta, alpha) - beta is 0 when x has no variance
+    """
+    n = len(x)
+    if n == 0:
+        return 0.0, 0.0
+    
+    sx = 0.0
+    sy = 0.0
+    for i in range(n):
+        sx += x[i]
+        sy += y[i]
+    xm = sx / n
+    ym = sy / n
+    
+    sxx = 0.0
+    sxy = 0.0
+    for i in range(n):
+        dx = x[i] - xm
+        sxx += dx * dx
+        sxy += dx * (y[i] - ym)
+    
+    beta = sxy / sxx if sxx != 0.0 else 0.0
+    return beta, ym - beta * xm
+
+
+def warmup():
+    """Compile (or load from the on-disk cache) every kernel on tiny inputs"""
+    if not NUMBA_AVAILABLE:
+        return
+    x = np.linspace(1.0, 2.0, 32)
+    y = x[::-1].copy()
+    run_backtest(x, y, 2.0, 0.0)
+    rolling_zscore(x, 8, 16)
+    rolling_corr(x, y, 8, 16)
+    ols_beta(x, y)
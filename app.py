@@ -6,20 +6,27 @@ Real-time data collection with advanced quantitative analytics
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import re
 import time
 from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
 
 from config import Config
 from database import (
     init_db, get_ticks, get_statistics, clear_database,
-    get_price_change, get_database_size, cleanup_old_data,
-    save_ohlc_data, get_ohlc_data
+    get_price_changes, get_database_size, cleanup_old_data,
+    save_ohlc_data, get_ohlc_data, iter_ticks
 )
 from collector import BatchTickCollector
 from analytics import Analytics
+from analytics_numba import warmup
 from visualizations import (
-    create_ohlc_chart, create_single_ohlc_chart, create_spread_chart, create_correlation_heatmap,
-    create_backtest_chart, create_distribution_chart, create_rolling_correlation_chart
+    create_ohlc_chart, create_single_ohlc_chart, update_ohlc_inplace, create_spread_chart,
+    create_correlation_matrix_chart, create_backtest_chart, create_distribution_chart, create_rolling_correlation_chart,
+    bars_from_frame, window_bars
 )
 
 st.set_page_config(
@@ -29,484 +36,444 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-    
-    * {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    }
-    
-    .stApp {
-        background: #0a0a0f;
-        background-color: #0a0a0f;  /* Fallback */
-        background-image: 
-            radial-gradient(ellipse at top, rgba(29, 78, 137, 0.15) 0%, transparent 50%),
-            radial-gradient(ellipse at bottom right, rgba(99, 102, 241, 0.1) 0%, transparent 50%),
-            radial-gradient(ellipse at bottom left, rgba(16, 185, 129, 0.08) 0%, transparent 50%);
-        background-attachment: fixed;
-        min-height: 100vh;
-    }
-    
-    /* Force dark background on main container to prevent white flash */
-    [data-testid="stAppViewContainer"] {
-        background-color: #0a0a0f;
-    }
-    
-    .main .block-container {
-        background: rgba(15, 23, 35, 0.7);
-        border: 1px solid rgba(255, 255, 255, 0.08);
-        border-radius: 16px;
-        padding: 2rem;
-        margin: 1rem;
-        backdrop-filter: blur(20px);
-    }
 
-    .hero-section {
-        text-align: center;
-        padding: 80px 20px 60px;
-        position: relative;
-    }
-    
-    .hero-badge {
-        display: inline-block;
-        background: linear-gradient(135deg, rgba(99, 102, 241, 0.2), rgba(16, 185, 129, 0.2));
-        border: 1px solid rgba(99, 102, 241, 0.3);
-        border-radius: 20px;
-        padding: 6px 16px;
-        font-size: 0.75rem;
-        color: #a5b4fc;
-        letter-spacing: 1px;
-        text-transform: uppercase;
-        margin-bottom: 24px;
-    }
-    
-    .hero-title {
-        font-size: 3.5rem;
-        font-weight: 800;
-        background: linear-gradient(135deg, #ffffff 0%, #a5b4fc 50%, #10b981 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin-bottom: 20px;
-        line-height: 1.1;
-        letter-spacing: -1px;
-    }
-    
-    .hero-subtitle {
-        font-size: 1.25rem;
-        color: #8899a6;
-        margin-bottom: 40px;
-        max-width: 600px;
-        margin-left: auto;
-        margin-right: auto;
-        line-height: 1.6;
-        font-weight: 400;
-    }
-    
-    .feature-card {
-        background: linear-gradient(145deg, rgba(20, 30, 48, 0.8), rgba(15, 23, 35, 0.9));
-        border: 1px solid rgba(255, 255, 255, 0.06);
-        border-radius: 16px;
-        padding: 28px;
-        text-align: left;
-        transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .feature-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 1px;
-        background: linear-gradient(90deg, transparent, rgba(99, 102, 241, 0.5), transparent);
-        opacity: 0;
-        transition: opacity 0.4s ease;
-    }
-    
-    .feature-card:hover {
-        transform: translateY(-4px);
-        border-color: rgba(99, 102, 241, 0.3);
-        box-shadow: 0 20px 40px rgba(0, 0, 0, 0.3);
-    }
-    
-    .feature-card:hover::before {
-        opacity: 1;
-    }
-    
-    .feature-icon {
-        width: 48px;
-        height: 48px;
-        background: linear-gradient(135deg, rgba(99, 102, 241, 0.2), rgba(16, 185, 129, 0.2));
-        border-radius: 12px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        margin-bottom: 16px;
-        font-size: 1.5rem;
-    }
-    
-    .feature-card h3 {
-        color: #ffffff;
-        margin-bottom: 10px;
-        font-size: 1.1rem;
-        font-weight: 600;
-    }
-    
-    .feature-card p {
-        color: #8899a6;
-        font-size: 0.9rem;
-        line-height: 1.6;
-        margin: 0;
-    }
-    
-    .steps-container {
-        background: linear-gradient(145deg, rgba(20, 30, 48, 0.6), rgba(15, 23, 35, 0.8));
-        border: 1px solid rgba(255, 255, 255, 0.06);
-        border-radius: 16px;
-        padding: 32px;
-        margin: 40px 0;
-    }
-    
-    .step-item {
-        display: flex;
-        align-items: flex-start;
-        margin-bottom: 20px;
-        padding: 16px;
-        border-radius: 12px;
-        transition: all 0.3s ease;
-    }
-    
-    .step-item:hover {
-        background: rgba(99, 102, 241, 0.05);
-    }
-    
-    .step-number {
-        width: 32px;
-        height: 32px;
-        background: linear-gradient(135deg, #6366f1, #10b981);
-        border-radius: 8px;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-weight: 700;
-        font-size: 0.9rem;
-        color: #ffffff;
-        margin-right: 16px;
-        flex-shrink: 0;
-    }
-    
-    .step-content h4 {
-        color: #ffffff;
-        margin: 0 0 4px 0;
-        font-size: 1rem;
-        font-weight: 600;
-    }
-    
-    .step-content p {
-        color: #8899a6;
-        margin: 0;
-        font-size: 0.9rem;
-    }
-    
-    .cta-container {
-        text-align: center;
-        padding: 40px 0;
-    }
-    
-    .main-header {
-        font-size: 2rem;
-        font-weight: 700;
-        text-align: center;
-        color: #ffffff;
-        margin-bottom: 0.5rem;
-        letter-spacing: -0.5px;
-    }
-    
-    .header-nav {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        margin-bottom: 20px;
-        padding-bottom: 16px;
-        border-bottom: 1px solid rgba(255, 255, 255, 0.08);
-    }
-    
-    .nav-brand {
-        font-size: 1.2rem;
-        font-weight: 700;
-        color: #ffffff;
-    }
-    
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 4px;
-        background: rgba(20, 30, 48, 0.8);
-        padding: 6px;
-        border-radius: 12px;
-        border: 1px solid rgba(255, 255, 255, 0.06);
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: transparent;
-        border-radius: 8px;
-        padding: 10px 20px;
-        color: #8899a6 !important;
-        font-weight: 500;
-        font-size: 0.85rem;
-        border: none;
-        transition: all 0.3s ease;
-    }
-    
-    .stTabs [data-baseweb="tab"]:hover {
-        background: rgba(99, 102, 241, 0.1);
-        color: #a5b4fc !important;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #6366f1, #4f46e5);
-        color: #ffffff !important;
-        box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3);
-    }
-    
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #0f1419 0%, #15202b 100%);
-        border-right: 1px solid rgba(255, 255, 255, 0.06);
-    }
-    
-    [data-testid="stSidebar"] * {
-        color: #d9d9d9 !important;
-    }
-    
-    [data-testid="stSidebar"] h1, [data-testid="stSidebar"] h2, [data-testid="stSidebar"] h3 {
-        color: #ffffff !important;
-        font-weight: 600;
-        font-size: 0.9rem !important;
-    }
-    
-    .metric-card {
-        background: linear-gradient(145deg, rgba(20, 30, 48, 0.9), rgba(15, 23, 35, 0.95));
-        border: 1px solid rgba(255, 255, 255, 0.06);
-        border-radius: 16px;
-        padding: 24px;
-        margin: 8px 0;
-        transition: all 0.3s ease;
-    }
-    
-    .metric-card:hover {
-        border-color: rgba(99, 102, 241, 0.3);
-        transform: translateY(-2px);
-        box-shadow: 0 12px 24px rgba(0, 0, 0, 0.2);
-    }
-    
-    .metric-label {
-        font-size: 0.7rem;
-        color: #8899a6 !important;
-        text-transform: uppercase;
-        letter-spacing: 1.5px;
-        margin-bottom: 8px;
-        font-weight: 600;
-    }
-    
-    .metric-value {
-        font-size: 2rem;
-        font-weight: 700;
-        color: #ffffff !important;
-    }
-    
-   
-    .stButton>button {
-        background: linear-gradient(135deg, #6366f1, #4f46e5);
-        color: #ffffff !important;
-        border: none;
-        border-radius: 10px;
-        padding: 12px 28px;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3);
-    }
-    
-    .stButton>button:hover {
-        background: linear-gradient(135deg, #4f46e5, #4338ca);
-        transform: translateY(-2px);
-        box-shadow: 0 8px 20px rgba(99, 102, 241, 0.4);
-    }
-    
+@st.cache_resource
+def load_css() -> str:
+    """Read the dashboard stylesheet once per server process"""
+    return (Path(__file__).parent / 'static' / 'app.css').read_text()
 
-    .stDownloadButton>button {
-        background: linear-gradient(135deg, #6366f1, #4f46e5) !important;
-        color: #ffffff !important;
-        border: none !important;
-        border-radius: 10px;
-        box-shadow: 0 4px 12px rgba(99, 102, 241, 0.3);
-    }
-    
 
-    div[data-testid="stMetricValue"] {
-        font-size: 1.5rem;
-        font-weight: 700;
-        color: #ffffff !important;
-    }
-    
-    div[data-testid="stMetricLabel"] {
-        color: #8899a6 !important;
-        font-weight: 500;
-        font-size: 0.8rem;
-    }
-    
-    div[data-testid="stMetricDelta"] svg {
-        display: none;
-    }
-    
-    /* === STATUS INDICATOR === */
-    .status-indicator {
-        display: inline-block;
-        width: 8px;
-        height: 8px;
-        border-radius: 50%;
-        margin-right: 8px;
-    }
-    
-    .status-active {
-        background: #10b981;
-        box-shadow: 0 0 12px rgba(16, 185, 129, 0.6);
-        animation: pulse-green 2s infinite;
-    }
-    
-    .status-inactive {
-        background: #ef4444;
-    }
-    
-    @keyframes pulse-green {
-        0%, 100% { box-shadow: 0 0 12px rgba(16, 185, 129, 0.6); }
-        50% { box-shadow: 0 0 20px rgba(16, 185, 129, 0.8); }
-    }
-    
-    /* === INPUTS === */
-    .stTextInput input, .stSelectbox > div > div, .stNumberInput input {
-        background: rgba(20, 30, 48, 0.8) !important;
-        border: 1px solid rgba(255, 255, 255, 0.1) !important;
-        color: #ffffff !important;
-        border-radius: 10px;
-    }
-    
-    .stTextInput input:focus, .stSelectbox > div > div:focus {
-        border-color: #6366f1 !important;
-        box-shadow: 0 0 0 2px rgba(99, 102, 241, 0.2) !important;
-    }
-    
-    /* === DATAFRAMES === */
-    .stDataFrame {
-        border: 1px solid rgba(255, 255, 255, 0.06);
-        border-radius: 12px;
-    }
-    
-    /* === SLIDERS === */
-    .stSlider > div > div > div {
-        background: linear-gradient(90deg, #6366f1, #10b981) !important;
-    }
-    
-    /* === ALERTS === */
-    .stAlert {
-        background: rgba(20, 30, 48, 0.9) !important;
-        border: 1px solid rgba(255, 255, 255, 0.06) !important;
-        border-radius: 12px;
-        color: #d9d9d9 !important;
-    }
-    
-    /* === EXPANDER === */
-    .streamlit-expanderHeader {
-        background: rgba(20, 30, 48, 0.8) !important;
-        color: #ffffff !important;
-        border-radius: 10px;
-    }
-    
-    /* === HEADINGS === */
-    h1, h2, h3 {
-        color: #ffffff !important;
-    }
-    
-    /* === TEXT === */
-    p, span, label {
-        color: #d9d9d9 !important;
-    }
-    
-    /* === FIX: Remove white line/separator at top === */
-    header[data-testid="stHeader"] {
-        background: transparent !important;
-        border-bottom: none !important;
-    }
-    
-    .stDeployButton {
-        display: none;
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    
-    /* === File Uploader Dark Theme === */
-    [data-testid="stFileUploader"] {
-        background: rgba(20, 30, 48, 0.8) !important;
-        border-radius: 12px;
-        padding: 12px;
-    }
-    
-    [data-testid="stFileUploader"] section {
-        background: rgba(15, 23, 35, 0.9) !important;
-        border: 2px dashed rgba(99, 102, 241, 0.3) !important;
-        border-radius: 10px;
-    }
-    
-    [data-testid="stFileUploader"] section > div {
-        color: #8899a6 !important;
-    }
-    
-    [data-testid="stFileUploader"] button {
-        background: linear-gradient(135deg, #6366f1, #4f46e5) !important;
-        color: white !important;
-        border: none !important;
-        border-radius: 8px;
-    }
-    
-    [data-testid="stFileUploader"] small {
-        color: #8899a6 !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
 
 # Initialize database
 init_db()
 
+
+@st.cache_resource(show_spinner=False)
+def _warm_jit_kernels() -> bool:
+    """Compile the numba kernels once per server process, before the first dashboard render"""
+    warmup()
+    return True
+
+
+_warm_jit_kernels()
+
+
+# Cached database reads. `version` advances once per committed collector batch,
+# so reruns between batches reuse the frame instead of re-querying SQLite.
+@st.cache_data(ttl=3, show_spinner=False)
+def _cached_get_ticks(limit: int, version: int, symbol: str = None, order: str = 'DESC',
+                      columns: tuple = None) -> pd.DataFrame:
+    """get_ticks memoized per (limit, symbol, order, columns, data version), as Arrow-backed columns"""
+    df = get_ticks(symbol=symbol, limit=limit, dtype_backend='pyarrow', order=order, columns=columns)
+    # Dictionary-encode the few distinct symbols instead of one string per row
+    df['symbol'] = df['symbol'].astype(pd.ArrowDtype(pa.dictionary(pa.int32(), pa.string())))
+    return df
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_get_ohlc(limit: int) -> pd.DataFrame:
+    """Uploaded OHLC rows with a datetime column; only uploads and clears change them"""
+    df = get_ohlc_data(limit=limit)
+    if df.empty:
+        return df
+    if df['timestamp'].dtype == 'int64':
+        # Reinterpret epoch ms as datetime64 and widen, no per-value parsing
+        df['datetime'] = df['timestamp'].to_numpy().view('datetime64[ms]').astype('datetime64[ns]')
+    else:
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+
+def align_pair(frame1: pd.DataFrame, frame2: pd.DataFrame) -> tuple:
+    """Close series of two symbols on their shared candle times, matched on int64 views"""
+    t1 = frame1['datetime'].to_numpy()
+    t2 = frame2['datetime'].to_numpy()
+    _, i1, i2 = np.intersect1d(t1.view('int64'), t2.view('int64'),
+                               assume_unique=True, return_indices=True)
+    index = pd.DatetimeIndex(t1[i1], name='datetime')
+    p1 = pd.Series(frame1['close'].to_numpy()[i1], index=index, name='close')
+    p2 = pd.Series(frame2['close'].to_numpy()[i2], index=index, name='close')
+    return p1, p2
+
+
+@st.cache_data(ttl=30, max_entries=16, show_spinner=False)
+def compute_pair_stats(p1: pd.Series, p2: pd.Series, method: str, window: int) -> tuple:
+    """Hedge ratio, intercept, spread and z-score for an aligned pair, shared by the pair and backtest tabs"""
+    hr, intercept = Analytics.calculate_hedge_ratio(p1, p2, method, window=window)
+    spread = Analytics.calculate_spread(p1, p2, hr)
+    zscore = Analytics.calculate_zscore(spread, window)
+    return hr, intercept, spread, zscore
+
+
+@st.cache_data(ttl=60, max_entries=16, show_spinner=False)
+def compute_adf(spread: pd.Series) -> dict:
+    """ADF test on a pair spread, reused for repeat clicks on the same spread"""
+    return Analytics.adf_test(spread)
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def compute_symbol_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-symbol close statistics in one groupby aggregation"""
+    agg = df.groupby('symbol', sort=False, observed=True)['close'].agg(
+        ['mean', 'std', 'min', 'max', 'first', 'last'])
+    return pd.DataFrame({
+        'Symbol': agg.index.astype(str).str.upper(),
+        'Mean': agg['mean'].to_numpy(),
+        'Std': agg['std'].to_numpy(),
+        'Min': agg['min'].to_numpy(),
+        'Max': agg['max'].to_numpy(),
+        'Latest': agg['last'].to_numpy(),
+        'Change %': ((agg['last'] / agg['first'] - 1) * 100).to_numpy()
+    })
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _cached_price_changes(symbols: tuple, minutes: int, version: int) -> dict:
+    """get_price_changes memoized per (symbols, window, data version)"""
+    return get_price_changes(list(symbols), minutes=minutes)
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _cached_get_database_size(version: int) -> dict:
+    """get_database_size memoized per data version, for a few seconds at most"""
+    return get_database_size()
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _cached_get_statistics(version: int) -> pd.DataFrame:
+    """Per-symbol SQL aggregates memoized per data version, for a few seconds at most"""
+    return get_statistics()
+
+
+def sidebar_snapshot(collector: BatchTickCollector) -> dict:
+    """Collector stats, batch data version and database size for one rerun"""
+    stats = collector.get_stats()
+    version = stats['total_ticks'] // collector.batch_size
+    return {'stats': stats, 'version': version, 'db': _cached_get_database_size(version)}
+
+
+def _frame_to_csv(df: pd.DataFrame) -> bytes:
+    """CSV bytes via Arrow's multithreaded writer, falling back to pandas
+    
+    Frames with datetime columns stay on pandas, whose millisecond timestamps
+    the candle exports have always had; Arrow writes nanoseconds. Arrow's
+    output quotes string fields, which CSV readers parse the same.
+    """
+    if any(pd.api.types.is_datetime64_any_dtype(dtype) for dtype in df.dtypes):
+        return df.to_csv(index=False).encode()
+    
+    try:
+        import pyarrow.csv as pacsv
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Straight into a bytes buffer, no intermediate Python string
+        buf = pa.BufferOutputStream()
+        pacsv.write_csv(table, buf)
+        return buf.getvalue().to_pybytes()
+    except (ImportError, pa.ArrowException):
+        return df.to_csv(index=False).encode()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_export_csv(limit: int, version: int) -> bytes:
+    """Tick export as CSV bytes, rebuilt only after new ticks land"""
+    df = get_ticks(limit=limit)
+    if df.empty:
+        return b''
+    return _frame_to_csv(df)
+
+
+@st.cache_data(ttl=30, max_entries=16, show_spinner=False)
+def _cached_frame_csv(df: pd.DataFrame) -> bytes:
+    """Download bytes for a rendered frame, serialized again only when its contents change"""
+    return _frame_to_csv(df)
+
+
+# Newer Streamlit accepts a callable as download_button data and runs it only on click
+try:
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    DEFERRED_DOWNLOADS = hasattr(MediaFileManager, 'add_deferred')
+except ImportError:
+    DEFERRED_DOWNLOADS = False
+
+
+def csv_download_data(df: pd.DataFrame):
+    """download_button payload for a frame, serialized on click where supported"""
+    if DEFERRED_DOWNLOADS:
+        return lambda: _frame_to_csv(df)
+    return _cached_frame_csv(df)
+
+
+# Newest ticks resampled into the full-history candle export, streamed 50k rows at a time
+HISTORY_TICK_LIMIT = 2_000_000
+
+
+def _history_ohlc_csv(timeframe: str) -> bytes:
+    """Candles over the stored tick history as CSV, resampled chunk by chunk so memory stays bounded"""
+    ticks = iter_ticks(limit=HISTORY_TICK_LIMIT, order='ASC', columns=['symbol', 'timestamp', 'price', 'size'])
+    parts = list(Analytics.resample_ohlcv_stream(ticks, timeframe))
+    if not parts:
+        return b''
+    return _frame_to_csv(pd.concat(parts, ignore_index=True))
+
+
+@st.cache_data(ttl=30, max_entries=4, show_spinner=False)
+def _cached_history_ohlc_csv(timeframe: str, version: int) -> bytes:
+    """Full-history candle CSV, rebuilt only after new ticks land"""
+    return _history_ohlc_csv(timeframe)
+
+
+def history_ohlc_download_data(timeframe: str, version: int):
+    """download_button payload for the full-history candles, built on click where supported"""
+    if DEFERRED_DOWNLOADS:
+        return lambda: _history_ohlc_csv(timeframe)
+    return _cached_history_ohlc_csv(timeframe, version)
+
+
+# Figure builders memoized on their inputs: a rerun from an unrelated widget
+# gets the finished figure back instead of rebuilding every trace
+_figure_cache = st.cache_data(ttl=30, max_entries=32, show_spinner=False)
+cached_spread_chart = _figure_cache(create_spread_chart)
+cached_rolling_correlation_chart = _figure_cache(create_rolling_correlation_chart)
+cached_backtest_chart = _figure_cache(create_backtest_chart)
+cached_correlation_matrix_chart = _figure_cache(create_correlation_matrix_chart)
+cached_distribution_chart = _figure_cache(create_distribution_chart)
+
+
+def live_ohlc_chart(df, symbol: str, show_volume: bool = True):
+    """Per-symbol candlestick figure kept in session state and refreshed in place"""
+    figures = st.session_state.setdefault('ohlc_figures', {})
+    key = (symbol, show_volume)
+    fig = figures.get(key)
+    if fig is None:
+        fig = create_single_ohlc_chart(df, symbol, show_volume=show_volume)
+    else:
+        fig = update_ohlc_inplace(fig, df, symbol, show_volume=show_volume)
+    figures[key] = fig
+    return fig
+
+
+def _incremental_resample(df_trades: pd.DataFrame, timeframe: str, cache: dict) -> pd.DataFrame:
+    """
+    Resample only the ticks that can still change the cached candles
+    
+    Each symbol's last cached candle may still be open, so that bucket and
+    everything newer is recomputed; older candles are reused and trimmed to
+    the span of the current tick window.
+    """
+    if df_trades.empty:
+        cache.pop(timeframe, None)
+        return pd.DataFrame()
+    
+    tick_time = Analytics._parse_timestamps(df_trades['timestamp'])
+    window_key = (len(df_trades), tick_time.max())
+    cached = cache.get(timeframe)
+    if cached is not None and cached['window_key'] == window_key:
+        return cached['frame']
+    
+    parts = []
+    if cached is None:
+        tail_mask = pd.Series(True, index=df_trades.index)
+    else:
+        frame = cached['frame']
+        cutoff = cached['cutoff']
+        tick_cutoff = df_trades['symbol'].map(cutoff)
+        tail_mask = tick_cutoff.isna() | (tick_time >= tick_cutoff)
+        
+        # Keep finished candles that still fall inside the tick window
+        first_bucket = tick_time.groupby(df_trades['symbol']).min().dt.floor(
+            pd.tseries.frequencies.to_offset(timeframe)
+        )
+        keep = ((frame['datetime'] < frame['symbol'].map(cutoff)) &
+                (frame['datetime'] >= frame['symbol'].map(first_bucket)))
+        parts.append(frame[keep])
+    
+    parts.append(Analytics.resample_ohlcv(df_trades[tail_mask], timeframe))
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        cache.pop(timeframe, None)
+        return pd.DataFrame()
+    
+    frame = pd.concat(parts, ignore_index=True)
+    cache[timeframe] = {
+        'frame': frame,
+        'cutoff': frame.groupby('symbol')['datetime'].max().to_dict(),
+        'window_key': window_key,
+    }
+    return frame
+
+
+def _clear_db_caches():
+    """Drop cached reads after the database is modified from the UI"""
+    _cached_get_ticks.clear()
+    _cached_get_ohlc.clear()
+    _cached_get_database_size.clear()
+    _cached_get_statistics.clear()
+    _cached_price_changes.clear()
+    _cached_export_csv.clear()
+
+
+SYMBOL_RE = re.compile(r'[a-z0-9]{3,15}')
+
+
+@lru_cache(maxsize=16)
+def parse_symbols(symbols_input: str) -> tuple:
+    """Extract valid symbols from the comma-separated input once per distinct string"""
+    return tuple(SYMBOL_RE.findall(symbols_input.lower()))
+
+
+# One row per alert; price alerts leave sym2 empty, z-score alerts watch symbol/sym2
+ALERT_COLUMNS = ['type', 'symbol', 'condition', 'value', 'sym2']
+
+
+# Typed position tables; closed trades add the exit fields
+POSITION_DTYPES = {
+    'id': 'int64', 'symbol': 'object', 'side': 'object', 'size': 'float64',
+    'entry_price': 'float64', 'entry_time': 'datetime64[ns]', 'quantity': 'float64'
+}
+CLOSED_TRADE_DTYPES = {
+    **POSITION_DTYPES,
+    'exit_price': 'float64', 'exit_time': 'datetime64[ns]', 'pnl': 'float64', 'pnl_pct': 'float64'
+}
+
+
+def _empty_table(dtypes: dict) -> pd.DataFrame:
+    """Zero-row DataFrame with fixed column dtypes"""
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()})
+
+
+def append_position(table: pd.DataFrame, row: dict):
+    """Append a row in place, keeping the table's column dtypes"""
+    table.loc[len(table)] = [row[col] for col in table.columns]
+
+
+def _add_alert(alert_type: str, symbol: str, condition: str, value: float, sym2: str = None):
+    """Append an alert row to the session's alert table"""
+    alerts = st.session_state.alerts
+    alerts.loc[len(alerts)] = [alert_type, symbol, condition, float(value), sym2]
+
+
+@st.cache_data(ttl=30, max_entries=32, show_spinner=False)
+def check_alerts(state_key: tuple, alerts_key: tuple, rolling_window: int,
+                 _df: pd.DataFrame, _by_sym: dict, _latest_close: dict) -> list:
+    """Evaluate price and z-score alerts against the current candles
+    
+    Cached on state_key (the candle fingerprint: timeframe, candle count, last
+    candle time, close and volume sums) and the alert rows, so reruns with
+    unchanged data and alerts skip the hedge-ratio and z-score work. The
+    underscored frames are not hashed.
+    """
+    df, by_sym = _df, _by_sym
+    alerts = pd.DataFrame(list(alerts_key), columns=ALERT_COLUMNS)
+    triggered = {}
+    if 'datetime' not in df.columns:
+        return []
+    
+    # Price alerts: compare every threshold against the latest closes in one vectorized pass
+    price_alerts = alerts[alerts['type'] == 'price']
+    if not price_alerts.empty:
+        latest = price_alerts['symbol'].map(_latest_close).to_numpy(dtype=float)
+        values = price_alerts['value'].to_numpy(dtype=float)
+        conditions = price_alerts['condition'].to_numpy()
+        above = (conditions == 'above') & (latest > values)
+        below = (conditions == 'below') & (latest < values)
+        
+        for idx, symbol, price, value, is_above in zip(
+                price_alerts.index[above | below], price_alerts['symbol'].to_numpy()[above | below],
+                latest[above | below], values[above | below], above[above | below]):
+            op = '>' if is_above else '<'
+            triggered[idx] = f"PRICE ALERT: {symbol.upper()} ${price:.2f} {op} ${value:.2f}"
+    
+    # Z-score alerts: one hedge ratio and z-score per distinct pair, however many alerts watch it
+    zscore_alerts = alerts[alerts['type'] == 'zscore']
+    if not zscore_alerts.empty:
+        pair_z = {}
+        
+        for s1, s2 in set(zip(zscore_alerts['symbol'], zscore_alerts['sym2'])):
+            if s1 == s2 or s1 not in by_sym or s2 not in by_sym:
+                continue
+            
+            # Align just the two symbols' closes instead of pivoting every symbol
+            pair = pd.concat({
+                s1: by_sym[s1].set_index('datetime')['close'],
+                s2: by_sym[s2].set_index('datetime')['close']
+            }, axis=1).dropna().sort_index()
+            if len(pair) <= rolling_window:
+                continue
+            
+            p1 = pair[s1].to_numpy()
+            p2 = pair[s2].to_numpy()
+            hr, _ = Analytics.calculate_hedge_ratio(pair[s1], pair[s2])
+            spread = Analytics.calculate_spread_raw(p1, p2, hr)
+            pair_z[(s1, s2)] = Analytics.calculate_zscore_raw(spread, rolling_window)[-1]
+        
+        for alert in zscore_alerts.itertuples():
+            s1, s2 = alert.symbol, alert.sym2
+            if (s1, s2) not in pair_z:
+                continue
+            current_z = pair_z[(s1, s2)]
+            
+            if alert.condition == 'above' and current_z > alert.value:
+                triggered[alert.Index] = f"Z-SCORE ALERT: {s1.upper()}/{s2.upper()} z={current_z:.2f} > {alert.value:.2f}"
+            elif alert.condition == 'below' and current_z < alert.value:
+                triggered[alert.Index] = f"Z-SCORE ALERT: {s1.upper()}/{s2.upper()} z={current_z:.2f} < {alert.value:.2f}"
+    
+    # Report in the order the alerts were created
+    return [triggered[idx] for idx in sorted(triggered)]
+
 # Session state initialization
 if 'collector' not in st.session_state:
     st.session_state.collector = BatchTickCollector(buffer_size=10000, batch_size=50, batch_interval=3)
-    from database import insert_tick
-    def save_tick(tick):
+    from database import insert_ticks_bulk
+    def save_batch(batch):
         try:
-            insert_tick(tick['symbol'], tick['timestamp'], tick['price'], tick['size'])
+            insert_ticks_bulk(batch)
         except Exception as e:
-            print(f"Error inserting tick: {e}")
-    st.session_state.collector.set_callback(save_tick)
+            print(f"Error inserting ticks: {e}")
+    st.session_state.collector.set_batch_callback(save_batch)
 
 if 'collecting' not in st.session_state:
     st.session_state.collecting = False
 if 'last_update' not in st.session_state:
     st.session_state.last_update = datetime.now()
 if 'alerts' not in st.session_state:
-    st.session_state.alerts = []
+    st.session_state.alerts = pd.DataFrame(columns=ALERT_COLUMNS)
 if 'page' not in st.session_state:
     st.session_state.page = 'landing'
 if 'portfolio' not in st.session_state:
-    st.session_state.portfolio = []  # List of positions
+    st.session_state.portfolio = _empty_table(POSITION_DTYPES)  # Open positions
+if 'next_position_id' not in st.session_state:
+    st.session_state.next_position_id = 1  # Stable ids; never reused after a close
 if 'closed_trades' not in st.session_state:
-    st.session_state.closed_trades = []  # Closed trade history
+    st.session_state.closed_trades = _empty_table(CLOSED_TRADE_DTYPES)  # Closed trade history
+if 'ohlc_cache' not in st.session_state:
+    st.session_state.ohlc_cache = {}  # timeframe -> incrementally resampled candles
+
+def _rerun_on_new_ticks():
+    """Rerun the full app only once the collector has received new ticks"""
+    total_ticks = st.session_state.collector.get_stats()['total_ticks']
+    if total_ticks != st.session_state.get('prev_total', -1):
+        st.rerun()
+
 
-# Only auto-refresh when collecting data
-if st.session_state.get('collecting', False):
-    st_autorefresh(interval=Config.REFRESH_INTERVAL, key="data-refresh")
+# Poll the tick counter in a fragment so idle intervals skip the full rerun
+if hasattr(st, 'fragment'):
+    _rerun_on_new_ticks = st.fragment(
+        run_every=timedelta(milliseconds=Config.REFRESH_INTERVAL)
+    )(_rerun_on_new_ticks)
+
+# Check query params for direct dashboard access
+query_params = st.query_params
+if query_params.get("page") == "dashboard":
+    st.session_state.page = 'dashboard'
+
+# Only auto-refresh when collecting data; the landing page is static, so it never refreshes
+if st.session_state.get('collecting', False) and st.session_state.page != 'landing':
+    if hasattr(st, 'fragment'):
+        st.session_state.prev_total = st.session_state.collector.get_stats()['total_ticks']
+        _rerun_on_new_ticks()
+    else:
+        st_autorefresh(interval=Config.REFRESH_INTERVAL, key="data-refresh")
 
 
 def show_landing_page():
@@ -663,6 +630,11 @@ def show_landing_page():
     st.markdown("</div>", unsafe_allow_html=True)
 
 
+# Tabs with their own widgets rerun on their own when fragments are available,
+# instead of re-running the data prep for every tab
+_tab_fragment = st.fragment if hasattr(st, 'fragment') else (lambda func: func)
+
+
 def show_dashboard():
     """Display the main dashboard"""
     
@@ -690,7 +662,7 @@ def show_dashboard():
             value="btcusdt,ethusdt",
             help="Comma-separated symbols (lowercase)"
         )
-        symbols = [s.strip().lower() for s in symbols_input.split(',') if s.strip()]
+        symbols = parse_symbols(symbols_input)
         
         st.markdown("---")
         
@@ -700,8 +672,9 @@ def show_dashboard():
         with col1:
             if st.button("Start", key="start_btn"):
                 if not st.session_state.collecting:
-                    st.session_state.collector.start(symbols)
+                    st.session_state.collector.start(list(symbols))
                     st.session_state.collecting = True
+                    st.session_state.ohlc_cache = {}
                     st.success("Started!")
                     st.rerun()
                 else:
@@ -712,13 +685,16 @@ def show_dashboard():
                 if st.session_state.collecting:
                     st.session_state.collector.stop()
                     st.session_state.collecting = False
+                    st.session_state.ohlc_cache = {}
                     st.success("Stopped!")
                     st.rerun()
                 else:
                     st.info("Not collecting")
         
         # Status
-        collector_stats = st.session_state.collector.get_stats()
+        snapshot = sidebar_snapshot(st.session_state.collector)
+        collector_stats = snapshot['stats']
+        data_version = snapshot['version']
         status_class = "status-active" if st.session_state.collecting else "status-inactive"
         status_text = "Active" if st.session_state.collecting else "Inactive"
         
@@ -749,7 +725,7 @@ def show_dashboard():
         # Database info
         st.markdown("### Database")
         
-        db_info = get_database_size()
+        db_info = snapshot['db']
         st.markdown(f"""
             <div style="padding: 12px; background: rgba(255,255,255,0.1); border-radius: 10px; border: 1px solid rgba(255,255,255,0.2); margin-bottom: 12px;">
                 <div style="color: #cbd5e1; font-size: 0.85rem; line-height: 1.8;">
@@ -763,13 +739,19 @@ def show_dashboard():
         # Database actions
         if st.button("Clear Database", key="clear_btn"):
             clear_database()
+            _clear_db_caches()
+            st.session_state.ohlc_cache = {}
             st.success("Database cleared!")
             st.rerun()
         
-        # Export data
-        df_export = get_ticks(limit=100000)
-        if not df_export.empty:
-            csv = df_export.to_csv(index=False)
+        # Export data; with deferred downloads the ticks are only queried on click
+        if not DEFERRED_DOWNLOADS:
+            csv = _cached_export_csv(100000, data_version)
+        elif db_info['tick_count']:
+            csv = lambda: _frame_to_csv(get_ticks(limit=100000))
+        else:
+            csv = None
+        if csv:
             st.download_button(
                 label="Export CSV",
                 data=csv,
@@ -789,11 +771,7 @@ def show_dashboard():
                 alert_value = st.number_input("Threshold", min_value=0.0, value=50000.0)
                 
                 if st.button("Add Alert"):
-                    st.session_state.alerts.append({
-                        'symbol': alert_symbol,
-                        'condition': alert_condition,
-                        'value': alert_value
-                    })
+                    _add_alert('price', alert_symbol, alert_condition, alert_value)
                     st.success("Alert added!")
         
         # Z-Score Alerts
@@ -804,20 +782,15 @@ def show_dashboard():
                 zscore_threshold = st.number_input("Z-Score Threshold", min_value=-5.0, max_value=5.0, value=2.0, step=0.1, key='zscore_th')
                 
                 if st.button("Add Z-Score Alert", key="add_zscore_alert"):
-                    st.session_state.alerts.append({
-                        'type': 'zscore',
-                        'condition': zscore_condition,
-                        'value': zscore_threshold,
-                        'symbols': symbols[:2]
-                    })
+                    _add_alert('zscore', symbols[0], zscore_condition, zscore_threshold, symbols[1])
                     st.success("Z-Score alert added!")
             else:
                 st.info("Need 2 symbols for z-score alerts")
         
-        if st.session_state.alerts:
+        if not st.session_state.alerts.empty:
             st.write(f"**Active Alerts:** {len(st.session_state.alerts)}")
             if st.button("Clear Alerts"):
-                st.session_state.alerts = []
+                st.session_state.alerts = pd.DataFrame(columns=ALERT_COLUMNS)
                 st.rerun()
         
         st.markdown("---")
@@ -825,12 +798,15 @@ def show_dashboard():
         # OHLC Upload
         st.markdown("### Upload OHLC Data")
         uploaded_file = st.file_uploader("CSV File", type=['csv'])
-        if uploaded_file:
+        # The uploader keeps its file across reruns; import each upload only once
+        if uploaded_file and st.session_state.get('ohlc_upload_id') != uploaded_file.file_id:
             try:
                 udf = pd.read_csv(uploaded_file)
                 required_cols = ['symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume']
                 if all(col in udf.columns for col in required_cols):
                     if save_ohlc_data(udf):
+                        st.session_state.ohlc_upload_id = uploaded_file.file_id
+                        _cached_get_ohlc.clear()
                         st.success(f"Uploaded {len(udf)} rows!")
                 else:
                     st.error(f"Required columns: {required_cols}")
@@ -838,72 +814,83 @@ def show_dashboard():
                 st.error(f"Error: {e}")
     
     # Main content
-    df_trades = get_ticks(limit=10000)
-    df_ohlc_db = get_ohlc_data(limit=10000)
+    # Resampling never reads created_at, so it isn't fetched
+    df_trades = _cached_get_ticks(10000, data_version, columns=('symbol', 'timestamp', 'price', 'size'))
+    df_ohlc_db = _cached_get_ohlc(10000)
     
-    # Resample tick data to OHLC
-    if not df_trades.empty:
-        df_resampled = Analytics.resample_ohlcv(df_trades, timeframe)
-    else:
-        df_resampled = pd.DataFrame()
+    # Resample tick data to OHLC (only the ticks newer than the cached candles)
+    df_resampled = _incremental_resample(df_trades, timeframe, st.session_state.ohlc_cache)
     
     # Combine with uploaded OHLC data
     if not df_ohlc_db.empty:
-        df_ohlc_db['datetime'] = pd.to_datetime(df_ohlc_db['timestamp'], unit='ms')
         if df_resampled.empty:
             df_resampled = df_ohlc_db
         else:
-            df_resampled = pd.concat([df_resampled, df_ohlc_db]).drop_duplicates()
-    
-    # Check for alerts (price and z-score)
-    def check_alerts(df, alerts, rolling_window=20):
-        triggered = []
-        for alert in alerts:
-            alert_type = alert.get('type', 'price')
-            
-            if alert_type == 'zscore':
-                # Z-Score alert
-                syms = alert.get('symbols', [])
-                if len(syms) >= 2:
-                    s1, s2 = syms[0], syms[1]
-                    p1 = df[df['symbol'] == s1].set_index('datetime')['close'] if 'datetime' in df.columns else pd.Series()
-                    p2 = df[df['symbol'] == s2].set_index('datetime')['close'] if 'datetime' in df.columns else pd.Series()
-                    
-                    if not p1.empty and not p2.empty:
-                        common_idx = p1.index.intersection(p2.index)
-                        if len(common_idx) > rolling_window:
-                            p1 = p1.loc[common_idx]
-                            p2 = p2.loc[common_idx]
-                            hr, _ = Analytics.calculate_hedge_ratio(p1, p2)
-                            spread = Analytics.calculate_spread(p1, p2, hr)
-                            zscore = Analytics.calculate_zscore(spread, rolling_window)
-                            
-                            if not zscore.empty:
-                                current_z = zscore.iloc[-1]
-                                if alert['condition'] == 'above' and current_z > alert['value']:
-                                    triggered.append(f"Z-SCORE ALERT: {s1.upper()}/{s2.upper()} z={current_z:.2f} > {alert['value']:.2f}")
-                                elif alert['condition'] == 'below' and current_z < alert['value']:
-                                    triggered.append(f"Z-SCORE ALERT: {s1.upper()}/{s2.upper()} z={current_z:.2f} < {alert['value']:.2f}")
-            else:
-                # Price alert
-                symbol = alert.get('symbol', '')
-                sdf = df[df['symbol'] == symbol]
-                if not sdf.empty:
-                    latest = sdf.iloc[-1]['close']
-                    if alert['condition'] == 'above' and latest > alert['value']:
-                        triggered.append(f"PRICE ALERT: {symbol.upper()} ${latest:.2f} > ${alert['value']:.2f}")
-                    elif alert['condition'] == 'below' and latest < alert['value']:
-                        triggered.append(f"PRICE ALERT: {symbol.upper()} ${latest:.2f} < ${alert['value']:.2f}")
-        return triggered
+            df_resampled = pd.concat([df_resampled, df_ohlc_db])
+            duplicated = df_resampled.duplicated(subset=['symbol', 'datetime'], keep='last')
+            if duplicated.any():
+                df_resampled = df_resampled[~duplicated]
+    
+    # Fingerprint of the candles: widget-only reruns see the same one and reuse the
+    # derived frames below. The sums catch ticks landing in the still-open candle.
+    if df_resampled.empty:
+        fp = (timeframe, 0)
+    else:
+        fp = (timeframe, len(df_resampled), df_resampled['datetime'].max(),
+              df_resampled['close'].to_numpy().sum(), df_resampled['volume'].to_numpy().sum())
+    memo = st.session_state.get('frame_memo')
+    if memo is None or memo['fp'] != fp:
+        if not df_resampled.empty:
+            # Merged uploads fall back to object strings; integer codes make symbol
+            # masks and groupbys compare ints. assign() leaves the resample cache as is.
+            df_resampled = df_resampled.assign(symbol=df_resampled['symbol'].astype('category'))
+        
+        # Split candles by symbol once; every tab below reads its per-symbol frames from here
+        by_sym = {sym: g for sym, g in df_resampled.groupby('symbol', sort=False, observed=True)} \
+            if not df_resampled.empty else {}
+        corr = None
+        if len(by_sym) >= 2:
+            # One candle-time x symbol close matrix, correlated in NumPy
+            corr = Analytics.correlation_matrix(df_resampled, list(by_sym))
+        memo = {'fp': fp, 'frame': df_resampled, 'by_sym': by_sym,
+                # Column arrays the candlestick charts slice and read on every rerun
+                'bars': {sym: bars_from_frame(g) for sym, g in by_sym.items()},
+                'latest': {sym: g['close'].iloc[-1] for sym, g in by_sym.items()},
+                'corr': corr, 'pair': None}
+        st.session_state.frame_memo = memo
+    df_resampled = memo['frame']
+    by_sym = memo['by_sym']
+    unique_symbols = list(by_sym)
+    latest_by_symbol = memo['latest']
     
     # Display alerts
-    if st.session_state.alerts and not df_resampled.empty:
-        triggered = check_alerts(df_resampled, st.session_state.alerts, rolling_window)
+    if not st.session_state.alerts.empty and not df_resampled.empty:
+        # The candle fingerprint's close/volume sums move with every tick in the open candle
+        state_key = memo['fp']
+        alerts_key = tuple(st.session_state.alerts.itertuples(index=False, name=None))
+        triggered = check_alerts(state_key, alerts_key, rolling_window, df_resampled, by_sym, latest_by_symbol)
         if triggered:
             st.warning("### Alerts Triggered!")
             for t in triggered:
                 st.write(t)
     
+    # Pair selection shared by the Pair Analytics and Backtest tabs, fitted once per rerun
+    s1 = s2 = p1 = p2 = pair_stats = None
+    if len(unique_symbols) >= 2:
+        col1, col2 = st.columns(2)
+        with col1:
+            s1 = st.selectbox("Primary Symbol", unique_symbols, key='s1')
+        with col2:
+            s2 = st.selectbox("Secondary Symbol", [s for s in unique_symbols if s != s1], key='s2')
+        
+        pair_key = (s1, s2, regression_method, rolling_window)
+        if memo['pair'] is None or memo['pair'][0] != pair_key:
+            p1, p2 = align_pair(by_sym[s1], by_sym[s2])
+            if len(p1) > rolling_window:
+                pair_stats = compute_pair_stats(p1, p2, regression_method, rolling_window)
+            memo['pair'] = (pair_key, p1, p2, pair_stats)
+        _, p1, p2, pair_stats = memo['pair']
+    
     # Tabs - Always show, handle empty states within each tab
     tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
         "Dashboard", "OHLC Charts", "Pair Analytics", 
@@ -913,7 +900,7 @@ def show_dashboard():
     with tab1:
         st.header("Market Overview")
         
-        stats_df = get_statistics()
+        stats_df = _cached_get_statistics(data_version)
         
         if not stats_df.empty:
             cols = st.columns(4)
@@ -959,9 +946,10 @@ def show_dashboard():
             st.markdown("### Price Changes (1 Hour)")
             
             change_cols = st.columns(len(symbols))
+            price_changes = _cached_price_changes(symbols, 60, data_version)
             for idx, symbol in enumerate(symbols):
                 with change_cols[idx]:
-                    change_data = get_price_change(symbol, minutes=60)
+                    change_data = price_changes[symbol]
                     change_pct = change_data['change_pct']
                     current_price = change_data['current_price']
                     
@@ -984,492 +972,487 @@ def show_dashboard():
                 st.info("📊 Click **Start** in the sidebar to begin collecting data")
     
     with tab2:
-        st.header("OHLC Candlestick Charts")
+        render_charts_tab(df_resampled, memo['bars'], unique_symbols, timeframe)
+    
+    with tab3:
+        render_pair_tab(unique_symbols, s1, s2, p1, p2, pair_stats, regression_method, rolling_window)
+    
+    with tab4:
+        render_backtest_tab(unique_symbols, s1, s2, p1, p2, pair_stats, rolling_window)
+    
+    with tab5:
+        render_statistics_tab(df_resampled, by_sym, unique_symbols, memo['corr'])
+    
+    with tab6:
+        render_data_tab(df_resampled, symbols, data_version, timeframe)
+    
+    with tab7:
+        render_portfolio_tab(unique_symbols, latest_by_symbol)
+
+
+@_tab_fragment
+def render_charts_tab(df_resampled: pd.DataFrame, bars_by_sym: dict, unique_symbols: list, timeframe: str):
+    """OHLC Charts tab: per-symbol candlesticks over a scrollable time window"""
+    st.header("OHLC Candlestick Charts")
+    
+    if not df_resampled.empty:
         
-        if not df_resampled.empty:
-            unique_symbols = list(df_resampled['symbol'].unique())
+        # Get time window based on timeframe
+        time_window = Config.TIMEFRAME_WINDOWS.get(timeframe, 60)
+        
+        # Calculate total available data duration
+        min_time = df_resampled['datetime'].min()
+        max_time = df_resampled['datetime'].max()
+        total_seconds = int((max_time - min_time).total_seconds())
+        max_scroll = max(0, total_seconds - time_window)
+        
+        # Show current time window info
+        if time_window < 60:
+            window_text = f"{time_window}s"
+        elif time_window < 3600:
+            window_text = f"{time_window // 60}min"
+        else:
+            window_text = f"{time_window // 3600}h"
+        
+        # Status info
+        is_live = st.session_state.get('collecting', False)
+        status_text = "🔴 LIVE" if is_live else "⏸️ Paused"
+        st.caption(f"{status_text} | Window: {window_text} | Total data: {total_seconds}s")
+        
+        # Time scroll slider (only useful when not collecting or for historical view)
+        time_offset = 0
+        if max_scroll > 0:
+            time_offset = st.slider(
+                "⏪ Scroll back in time (seconds)", 
+                min_value=0, 
+                max_value=max_scroll, 
+                value=0,
+                step=max(1, time_window // 10),
+                key="time_scroll",
+                help="Move slider to view historical data"
+            )
+        
+        # Slice each symbol to the visible window once, so the charts (and
+        # their cache keys) only carry the candles actually drawn
+        windowed_by_sym = {sym: window_bars(bars_by_sym[sym], time_window, time_offset)
+                           for sym in unique_symbols}
+        
+        if len(unique_symbols) >= 2:
+            # Volume toggle buttons
+            toggle_col1, toggle_col2 = st.columns(2)
+            with toggle_col1:
+                show_vol1 = st.checkbox(f"Show {unique_symbols[0].upper()} Volume", value=True, key="vol_toggle_1")
+            with toggle_col2:
+                show_vol2 = st.checkbox(f"Show {unique_symbols[1].upper()} Volume", value=True, key="vol_toggle_2")
             
-            # Get time window based on timeframe
-            time_window = Config.TIMEFRAME_WINDOWS.get(timeframe, 60)
+            # Side-by-side charts
+            chart_col1, chart_col2 = st.columns(2)
             
-            # Calculate total available data duration
-            min_time = df_resampled['datetime'].min()
-            max_time = df_resampled['datetime'].max()
-            total_seconds = int((max_time - min_time).total_seconds())
-            max_scroll = max(0, total_seconds - time_window)
+            with chart_col1:
+                fig1 = live_ohlc_chart(windowed_by_sym[unique_symbols[0]], unique_symbols[0], show_volume=show_vol1)
+                st.plotly_chart(fig1, use_container_width=True)
             
-            # Show current time window info
-            if time_window < 60:
-                window_text = f"{time_window}s"
-            elif time_window < 3600:
-                window_text = f"{time_window // 60}min"
+            with chart_col2:
+                fig2 = live_ohlc_chart(windowed_by_sym[unique_symbols[1]], unique_symbols[1], show_volume=show_vol2)
+                st.plotly_chart(fig2, use_container_width=True)
+            
+            # Show any additional symbols below
+            if len(unique_symbols) > 2:
+                st.markdown("### Additional Symbols")
+                for i, sym in enumerate(unique_symbols[2:]):
+                    show_vol = st.checkbox(f"Show {sym.upper()} Volume", value=True, key=f"vol_toggle_{i+3}")
+                    fig = live_ohlc_chart(windowed_by_sym[sym], sym, show_volume=show_vol)
+                    st.plotly_chart(fig, use_container_width=True)
+        
+        elif len(unique_symbols) == 1:
+            show_vol = st.checkbox(f"Show {unique_symbols[0].upper()} Volume", value=True, key="vol_toggle_single")
+            fig = live_ohlc_chart(windowed_by_sym[unique_symbols[0]], unique_symbols[0], show_volume=show_vol)
+            st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("No OHLC data available")
+
+
+@_tab_fragment
+def render_pair_tab(unique_symbols: list, s1: str, s2: str, p1: pd.Series, p2: pd.Series,
+                    pair_stats: tuple, regression_method: str, rolling_window: int):
+    """Pair Analytics tab: spread, z-score, ADF test and rolling correlation"""
+    st.header("Pair Trading Analytics")
+    
+    if len(unique_symbols) >= 2:
+        if pair_stats is not None:
+            hr, intercept, spread, zscore = pair_stats
+            
+            # Handle dynamic hedge ratio display
+            if isinstance(hr, pd.Series):
+                display_hr = hr.iloc[-1]
+                display_int = intercept.iloc[-1] if isinstance(intercept, pd.Series) else intercept
+                st.info(f"**Hedge Ratio ({regression_method.upper()}):** {display_hr:.4f} (Dynamic) | **Intercept:** {display_int:.4f}")
             else:
-                window_text = f"{time_window // 3600}h"
+                st.info(f"**Hedge Ratio ({regression_method.upper()}):** {hr:.4f} | **Intercept:** {intercept:.4f}")
             
-            # Status info
-            is_live = st.session_state.get('collecting', False)
-            status_text = "🔴 LIVE" if is_live else "⏸️ Paused"
-            st.caption(f"{status_text} | Window: {window_text} | Total data: {total_seconds}s")
+            fig = cached_spread_chart(spread, zscore, s1, s2)
+            st.plotly_chart(fig)
             
-            # Time scroll slider (only useful when not collecting or for historical view)
-            time_offset = 0
-            if max_scroll > 0:
-                time_offset = st.slider(
-                    "⏪ Scroll back in time (seconds)", 
-                    min_value=0, 
-                    max_value=max_scroll, 
-                    value=0,
-                    step=max(1, time_window // 10),
-                    key="time_scroll",
-                    help="Move slider to view historical data"
-                )
+            # Export Analytics Data
+            analytics_df = pd.DataFrame({
+                'timestamp': spread.index,
+                'price1': p1.values,
+                'price2': p2.values,
+                'spread': spread.values,
+                'zscore': zscore.values
+            })
             
-            if len(unique_symbols) >= 2:
-                # Volume toggle buttons
-                toggle_col1, toggle_col2 = st.columns(2)
-                with toggle_col1:
-                    show_vol1 = st.checkbox(f"Show {unique_symbols[0].upper()} Volume", value=True, key="vol_toggle_1")
-                with toggle_col2:
-                    show_vol2 = st.checkbox(f"Show {unique_symbols[1].upper()} Volume", value=True, key="vol_toggle_2")
-                
-                # Side-by-side charts
-                chart_col1, chart_col2 = st.columns(2)
-                
-                with chart_col1:
-                    fig1 = create_single_ohlc_chart(df_resampled, unique_symbols[0], show_volume=show_vol1, 
-                                                    time_window_seconds=time_window, time_offset_seconds=time_offset)
-                    st.plotly_chart(fig1, use_container_width=True)
-                
-                with chart_col2:
-                    fig2 = create_single_ohlc_chart(df_resampled, unique_symbols[1], show_volume=show_vol2, 
-                                                    time_window_seconds=time_window, time_offset_seconds=time_offset)
-                    st.plotly_chart(fig2, use_container_width=True)
-                
-                # Show any additional symbols below
-                if len(unique_symbols) > 2:
-                    st.markdown("### Additional Symbols")
-                    for i, sym in enumerate(unique_symbols[2:]):
-                        show_vol = st.checkbox(f"Show {sym.upper()} Volume", value=True, key=f"vol_toggle_{i+3}")
-                        fig = create_single_ohlc_chart(df_resampled, sym, show_volume=show_vol, 
-                                                       time_window_seconds=time_window, time_offset_seconds=time_offset)
-                        st.plotly_chart(fig, use_container_width=True)
+            csv_analytics = csv_download_data(analytics_df)
+            st.download_button(
+                label="Download Analytics Data (CSV)",
+                data=csv_analytics,
+                file_name=f"pair_analytics_{s1}_{s2}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                key="download_analytics"
+            )
             
-            elif len(unique_symbols) == 1:
-                show_vol = st.checkbox(f"Show {unique_symbols[0].upper()} Volume", value=True, key="vol_toggle_single")
-                fig = create_single_ohlc_chart(df_resampled, unique_symbols[0], show_volume=show_vol, 
-                                               time_window_seconds=time_window, time_offset_seconds=time_offset)
-                st.plotly_chart(fig, use_container_width=True)
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                if st.button("Run ADF Test"):
+                    adf = compute_adf(spread)
+                    if adf:
+                        with col2:
+                            st.metric("ADF Statistic", f"{adf['statistic']:.4f}")
+                        with col3:
+                            status = "Stationary" if adf['is_stationary'] else "Non-stationary"
+                            st.metric("P-Value", f"{adf['pvalue']:.4f}", delta=status)
+            
+            st.subheader("Rolling Correlation")
+            rcorr = Analytics.rolling_correlation(p1, p2, rolling_window)
+            fig_corr = cached_rolling_correlation_chart(rcorr, s1, s2, rolling_window)
+            st.plotly_chart(fig_corr)
         else:
-            st.info("No OHLC data available")
-    
-    with tab3:
-        st.header("Pair Trading Analytics")
+            st.warning(f"Not enough data points yet. Need {rolling_window}, but only have {len(p1)}. Please wait...")
+    else:
+        st.info("Add at least 2 symbols for pair analytics")
+
+
+@_tab_fragment
+def render_backtest_tab(unique_symbols: list, s1: str, s2: str, p1: pd.Series, p2: pd.Series,
+                        pair_stats: tuple, rolling_window: int):
+    """Backtest tab: mean-reversion run over the shared pair fit"""
+    st.header("Mean Reversion Backtest")
+    
+    if len(unique_symbols) >= 2:
+        st.caption(f"Pair: {s1.upper()} / {s2.upper()}")
+        entry_th = st.slider("Entry Threshold (Z-Score)", 1.0, 3.0, 2.0, 0.1)
+        exit_th = st.slider("Exit Threshold (Z-Score)", -0.5, 0.5, 0.0, 0.1)
         
-        unique_symbols = df_resampled['symbol'].unique() if not df_resampled.empty else []
-        if len(unique_symbols) >= 2:
-            col1, col2 = st.columns(2)
-            with col1:
-                s1 = st.selectbox("Primary Symbol", unique_symbols, key='s1')
-            with col2:
-                s2 = st.selectbox("Secondary Symbol", [s for s in unique_symbols if s != s1], key='s2')
+        if pair_stats is not None:
+            hr = pair_stats[0]
+            spread, zscore, trades_df, positions = Analytics.backtest_pair(
+                p1, p2, hr, rolling_window, entry_th, exit_th
+            )
             
-            p1 = df_resampled[df_resampled['symbol'] == s1].set_index('datetime')['close']
-            p2 = df_resampled[df_resampled['symbol'] == s2].set_index('datetime')['close']
+            col_m1, col_m2, col_m3, col_m4 = st.columns(4)
             
-            common_idx = p1.index.intersection(p2.index)
-            p1 = p1.loc[common_idx]
-            p2 = p2.loc[common_idx]
+            total_trades = len(trades_df)
             
-            if len(p1) > rolling_window:
-                hr, intercept = Analytics.calculate_hedge_ratio(p1, p2, regression_method, window=rolling_window)
-                
-                # Handle dynamic hedge ratio display
-                if isinstance(hr, pd.Series):
-                    display_hr = hr.iloc[-1]
-                    display_int = intercept.iloc[-1] if isinstance(intercept, pd.Series) else intercept
-                    st.info(f"**Hedge Ratio ({regression_method.upper()}):** {display_hr:.4f} (Dynamic) | **Intercept:** {display_int:.4f}")
-                else:
-                    st.info(f"**Hedge Ratio ({regression_method.upper()}):** {hr:.4f} | **Intercept:** {intercept:.4f}")
-                
-                spread = Analytics.calculate_spread(p1, p2, hr)
-                zscore = Analytics.calculate_zscore(spread, rolling_window)
-                
-                fig = create_spread_chart(spread, zscore, s1, s2)
-                st.plotly_chart(fig)
-                
-                # Export Analytics Data
-                analytics_df = pd.DataFrame({
-                    'timestamp': spread.index,
-                    'price1': p1.values,
-                    'price2': p2.values,
-                    'spread': spread.values,
-                    'zscore': zscore.values
-                })
-                
-                csv_analytics = analytics_df.to_csv(index=False)
-                st.download_button(
-                    label="Download Analytics Data (CSV)",
-                    data=csv_analytics,
-                    file_name=f"pair_analytics_{s1}_{s2}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    key="download_analytics"
-                )
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if st.button("Run ADF Test"):
-                        adf = Analytics.adf_test(spread)
-                        if adf:
-                            with col2:
-                                st.metric("ADF Statistic", f"{adf['statistic']:.4f}")
-                            with col3:
-                                status = "Stationary" if adf['is_stationary'] else "Non-stationary"
-                                st.metric("P-Value", f"{adf['pvalue']:.4f}", delta=status)
-                
-                st.subheader("Rolling Correlation")
-                rcorr = Analytics.rolling_correlation(p1, p2, rolling_window)
-                fig_corr = create_rolling_correlation_chart(rcorr, s1, s2, rolling_window)
-                st.plotly_chart(fig_corr)
+            if not trades_df.empty and 'pnl' in trades_df.columns:
+                total_pnl = trades_df['pnl'].dropna().sum()
+                completed_trades = trades_df['pnl'].dropna()
+                win_rate = (len(completed_trades[completed_trades > 0]) / len(completed_trades) * 100) if len(completed_trades) > 0 else 0.0
+                avg_pnl = completed_trades.mean() if len(completed_trades) > 0 else 0.0
             else:
-                st.warning(f"Not enough data points yet. Need {rolling_window}, but only have {len(p1)}. Please wait...")
-        else:
-            st.info("Add at least 2 symbols for pair analytics")
-    
-    with tab4:
-        st.header("Mean Reversion Backtest")
-        
-        unique_symbols = df_resampled['symbol'].unique() if not df_resampled.empty else []
-        if len(unique_symbols) >= 2:
-            col1, col2 = st.columns(2)
-            with col1:
-                s1 = st.selectbox("Primary Symbol", unique_symbols, key='bt1')
-            with col2:
-                s2 = st.selectbox("Secondary Symbol", [s for s in unique_symbols if s != s1], key='bt2')
+                total_pnl = 0.0
+                win_rate = 0.0
+                avg_pnl = 0.0
             
-            entry_th = st.slider("Entry Threshold (Z-Score)", 1.0, 3.0, 2.0, 0.1)
-            exit_th = st.slider("Exit Threshold (Z-Score)", -0.5, 0.5, 0.0, 0.1)
-            
-            p1 = df_resampled[df_resampled['symbol'] == s1].set_index('datetime')['close']
-            p2 = df_resampled[df_resampled['symbol'] == s2].set_index('datetime')['close']
+            with col_m1:
+                st.metric("Total Trades", total_trades)
+            with col_m2:
+                st.metric("Total P&L", f"{total_pnl:.4f}")
+            with col_m3:
+                st.metric("Win Rate", f"{win_rate:.1f}%")
+            with col_m4:
+                st.metric("Avg P&L", f"{avg_pnl:.4f}")
             
-            common_idx = p1.index.intersection(p2.index)
-            p1 = p1.loc[common_idx]
-            p2 = p2.loc[common_idx]
+            st.subheader("Backtest Visualization")
+            fig_bt = cached_backtest_chart(trades_df, positions, spread)
+            st.plotly_chart(fig_bt)
             
-            if len(p1) > rolling_window:
-                hr, _ = Analytics.calculate_hedge_ratio(p1, p2, regression_method, window=rolling_window)
-                spread = Analytics.calculate_spread(p1, p2, hr)
-                zscore = Analytics.calculate_zscore(spread, rolling_window)
-                
-                trades_df, positions = Analytics.backtest_mean_reversion(spread, zscore, entry_th, exit_th)
-                
-                col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+            if not trades_df.empty:
+                st.subheader("Trade Log")
+                st.dataframe(trades_df)
                 
-                total_trades = len(trades_df)
-                
-                if not trades_df.empty and 'pnl' in trades_df.columns:
-                    total_pnl = trades_df['pnl'].dropna().sum()
-                    completed_trades = trades_df['pnl'].dropna()
-                    win_rate = (len(completed_trades[completed_trades > 0]) / len(completed_trades) * 100) if len(completed_trades) > 0 else 0.0
-                    avg_pnl = completed_trades.mean() if len(completed_trades) > 0 else 0.0
-                else:
-                    total_pnl = 0.0
-                    win_rate = 0.0
-                    avg_pnl = 0.0
-                
-                with col_m1:
-                    st.metric("Total Trades", total_trades)
-                with col_m2:
-                    st.metric("Total P&L", f"{total_pnl:.4f}")
-                with col_m3:
-                    st.metric("Win Rate", f"{win_rate:.1f}%")
-                with col_m4:
-                    st.metric("Avg P&L", f"{avg_pnl:.4f}")
-                
-                st.subheader("Backtest Visualization")
-                fig_bt = create_backtest_chart(trades_df, positions, spread)
-                st.plotly_chart(fig_bt)
-                
-                if not trades_df.empty:
-                    st.subheader("Trade Log")
-                    st.dataframe(trades_df)
-                    
-                    csv_trades = trades_df.to_csv(index=False)
-                    st.download_button(
-                        label="Download Trade Log (CSV)",
-                        data=csv_trades,
-                        file_name=f"backtest_trades_{s1}_{s2}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        key="download_trades"
-                    )
-            else:
-                st.warning(f"Not enough data points yet. Need {rolling_window}, but only have {len(p1)}. Please wait...")
+                csv_trades = csv_download_data(trades_df)
+                st.download_button(
+                    label="Download Trade Log (CSV)",
+                    data=csv_trades,
+                    file_name=f"backtest_trades_{s1}_{s2}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv",
+                    key="download_trades"
+                )
         else:
-            st.info("Select two different symbols to run backtest")
+            st.warning(f"Not enough data points yet. Need {rolling_window}, but only have {len(p1)}. Please wait...")
+    else:
+        st.info("Select two different symbols to run backtest")
+
+
+@_tab_fragment
+def render_statistics_tab(df_resampled: pd.DataFrame, by_sym: dict, unique_symbols: list, corr: pd.DataFrame):
+    """Statistics tab: correlation matrix, summary table and price distribution"""
+    st.header("Statistical Analysis")
+    
+    
+    if len(unique_symbols) >= 2:
+        st.subheader("Correlation Matrix")
+        fig_heatmap = cached_correlation_matrix_chart(corr)
+        st.plotly_chart(fig_heatmap)
+    
+    if len(unique_symbols) > 0:
+        st.subheader("Time Series Statistics")
+        stats_table = compute_symbol_stats(df_resampled[['symbol', 'close']])
+        if not stats_table.empty:
+            st.dataframe(stats_table)
+        
+        st.subheader("Price Distribution")
+        selected_dist_symbol = st.selectbox("Select Symbol", unique_symbols, key='dist_sym')
+        if selected_dist_symbol:
+            dist_data = by_sym[selected_dist_symbol]['close']
+            fig_dist = cached_distribution_chart(dist_data, f"{selected_dist_symbol.upper()} Price Distribution")
+            st.plotly_chart(fig_dist)
+    else:
+        st.info("No data available for statistics")
+
+
+@_tab_fragment
+def render_data_tab(df_resampled: pd.DataFrame, symbols: list, data_version: int, timeframe: str):
+    """Data Table tab: raw tick browser and CSV exports"""
+    st.header("Data Management")
     
-    with tab5:
-        st.header("Statistical Analysis")
+    st.subheader("Raw Tick Data")
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        table_symbol = st.selectbox("Filter by Symbol", ["All"] + [s.upper() for s in symbols], key="table_symbol")
+    with col2:
+        limit = st.number_input("Limit", min_value=10, max_value=10000, value=100, step=10, key="table_limit")
+    with col3:
+        sort_order = st.selectbox("Sort", ["Newest First", "Oldest First"], key="sort_order")
+    
+    selected_symbol = None if table_symbol == "All" else table_symbol.lower()
+    order = 'ASC' if sort_order == "Oldest First" else 'DESC'
+    df = _cached_get_ticks(int(limit), data_version, selected_symbol, order)
+    
+    if not df.empty:
+        # Stored as epoch ms; show readable UTC times, exports keep the raw ms
+        st.dataframe(df.assign(timestamp=Analytics._parse_timestamps(df['timestamp'])), hide_index=True)
         
-        unique_symbols = df_resampled['symbol'].unique() if not df_resampled.empty else []
+        st.markdown("### Export Data")
+        col_d1, col_d2, col_d3 = st.columns(3)
         
-        if len(unique_symbols) >= 2:
-            st.subheader("Correlation Matrix")
-            fig_heatmap = create_correlation_heatmap(df_resampled, unique_symbols)
-            st.plotly_chart(fig_heatmap)
+        with col_d1:
+            csv = csv_download_data(df)
+            st.download_button(
+                label="Download Raw Ticks (CSV)",
+                data=csv,
+                file_name=f"ticks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                key="download_ticks_tab"
+            )
         
-        if len(unique_symbols) > 0:
-            st.subheader("Time Series Statistics")
-            stats_data = []
-            for symbol in unique_symbols:
-                sdf = df_resampled[df_resampled['symbol'] == symbol]['close']
-                if len(sdf) > 0:
-                    stats_data.append({
-                        'Symbol': symbol.upper(),
-                        'Mean': sdf.mean(),
-                        'Std': sdf.std(),
-                        'Min': sdf.min(),
-                        'Max': sdf.max(),
-                        'Latest': sdf.iloc[-1],
-                        'Change %': ((sdf.iloc[-1] / sdf.iloc[0] - 1) * 100)
-                    })
-            
-            if stats_data:
-                stats_table = pd.DataFrame(stats_data)
-                st.dataframe(stats_table)
-            
-            st.subheader("Price Distribution")
-            selected_dist_symbol = st.selectbox("Select Symbol", unique_symbols, key='dist_sym')
-            if selected_dist_symbol:
-                dist_data = df_resampled[df_resampled['symbol'] == selected_dist_symbol]['close']
-                fig_dist = create_distribution_chart(dist_data, f"{selected_dist_symbol.upper()} Price Distribution")
-                st.plotly_chart(fig_dist)
-        else:
-            st.info("No data available for statistics")
+        with col_d2:
+            if not df_resampled.empty:
+                csv_ohlc = csv_download_data(df_resampled)
+                st.download_button(
+                    label="Download OHLC Analytics (CSV)",
+                    data=csv_ohlc,
+                    file_name=f"analytics_ohlc_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                    mime="text/csv",
+                    key="download_ohlc_tab"
+                )
+        
+        with col_d3:
+            st.download_button(
+                label=f"Download Full-History {timeframe} OHLC (CSV)",
+                data=history_ohlc_download_data(timeframe, data_version),
+                file_name=f"history_ohlc_{timeframe}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                mime="text/csv",
+                key="download_history_ohlc_tab"
+            )
+        
+        st.markdown("### Table Summary")
+        cols = st.columns(4)
+        
+        # Plain float arrays so the reductions run as NumPy loops, not Arrow dispatches
+        prices = df['price'].to_numpy(dtype=float)
+        sizes = df['size'].to_numpy(dtype=float)
+        
+        with cols[0]:
+            st.metric("Records", len(df))
+        with cols[1]:
+            st.metric("Avg Price", f"${prices.mean():,.2f}")
+        with cols[2]:
+            st.metric("Total Volume", f"{sizes.sum():,.2f}")
+        with cols[3]:
+            st.metric("Price Range", f"${np.ptp(prices):,.2f}")
+    else:
+        st.info("No data available")
+
+
+@_tab_fragment
+def render_portfolio_tab(unique_symbols: list, latest_by_symbol: dict):
+    """Portfolio tab: paper positions marked to the latest closes"""
+    st.header("Portfolio & P&L Tracker")
     
-    with tab6:
-        st.header("Data Management")
+    # Get current prices for each symbol
+    current_prices = latest_by_symbol
+    
+    # Position tables are appended in place, so one lookup each serves the whole tab
+    portfolio = st.session_state.portfolio
+    closed_trades = st.session_state.closed_trades
+    
+    # Open Position Form
+    st.subheader("Open New Position")
+    
+    if len(unique_symbols) > 0:
+        col1, col2, col3, col4 = st.columns(4)
         
-        st.subheader("Raw Tick Data")
-        col1, col2, col3 = st.columns([2, 1, 1])
         with col1:
-            table_symbol = st.selectbox("Filter by Symbol", ["All"] + [s.upper() for s in symbols], key="table_symbol")
+            pos_symbol = st.selectbox("Symbol", list(unique_symbols), key="pos_symbol")
         with col2:
-            limit = st.number_input("Limit", min_value=10, max_value=10000, value=100, step=10, key="table_limit")
+            pos_side = st.selectbox("Side", ["LONG", "SHORT"], key="pos_side")
         with col3:
-            sort_order = st.selectbox("Sort", ["Newest First", "Oldest First"], key="sort_order")
+            pos_size = st.number_input("Position Size ($)", min_value=100.0, value=1000.0, step=100.0, key="pos_size")
+        with col4:
+            pos_entry = current_prices.get(pos_symbol, 0.0)
+            st.metric("Current Price", f"${pos_entry:,.2f}")
         
-        selected_symbol = None if table_symbol == "All" else table_symbol.lower()
-        df = get_ticks(symbol=selected_symbol, limit=limit)
+        if st.button("Open Position", type="primary", key="open_pos"):
+            if pos_entry > 0:
+                new_pos = {
+                    'id': st.session_state.next_position_id,
+                    'symbol': pos_symbol,
+                    'side': pos_side,
+                    'size': pos_size,
+                    'entry_price': pos_entry,
+                    'entry_time': datetime.now(),
+                    'quantity': pos_size / pos_entry
+                }
+                append_position(portfolio, new_pos)
+                st.session_state.next_position_id += 1
+                st.success(f"Opened {pos_side} {pos_symbol.upper()} @ ${pos_entry:,.2f}")
+                st.rerun()
+            else:
+                st.error("No price data available for this symbol")
+    else:
+        st.info("Start data collection to open positions")
+    
+    st.markdown("---")
+    
+    # Active Positions with Live P&L
+    st.subheader("Active Positions")
+    
+    if not portfolio.empty:
+        # Mark every open position to market in one vectorized pass
+        entry_prices = portfolio['entry_price'].to_numpy(dtype=float)
+        quantities = portfolio['quantity'].to_numpy(dtype=float)
+        marks = portfolio['symbol'].map(current_prices).to_numpy(dtype=float)
+        marks = np.where(np.isnan(marks), entry_prices, marks)
+        is_long = portfolio['side'].to_numpy() == 'LONG'
+        pnls = np.where(is_long, marks - entry_prices, entry_prices - marks) * quantities
+        pnl_pcts = np.where(is_long, marks / entry_prices - 1, entry_prices / marks - 1) * 100
+        values = quantities * marks
+        total_unrealized_pnl = pnls.sum()
+        total_position_value = values.sum()
         
-        if not df.empty:
-            if sort_order == "Oldest First":
-                df = df.sort_values('timestamp')
+        to_close = []
+        for i, pos in enumerate(portfolio.to_dict('records')):
+            current_price, pnl, pnl_pct, current_value = marks[i], pnls[i], pnl_pcts[i], values[i]
             
-            st.dataframe(df, hide_index=True)
+            pnl_color = "#10b981" if pnl >= 0 else "#ef4444"
             
-            st.markdown("### Export Data")
-            col_d1, col_d2 = st.columns(2)
+            col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 2, 1])
             
-            with col_d1:
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="Download Raw Ticks (CSV)",
-                    data=csv,
-                    file_name=f"ticks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    key="download_ticks_tab"
-                )
+            with col1:
+                st.markdown(f"**{pos['symbol'].upper()}** ({pos['side']})")
+                st.caption(f"Entry: ${pos['entry_price']:,.2f} | Qty: {pos['quantity']:.6f}")
             
-            with col_d2:
-                if not df_resampled.empty:
-                    csv_ohlc = df_resampled.to_csv(index=False)
-                    st.download_button(
-                        label="Download OHLC Analytics (CSV)",
-                        data=csv_ohlc,
-                        file_name=f"analytics_ohlc_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                        mime="text/csv",
-                        key="download_ohlc_tab"
-                    )
+            with col2:
+                st.metric("Current", f"${current_price:,.2f}")
             
-            st.markdown("### Table Summary")
-            cols = st.columns(4)
+            with col3:
+                st.metric("Value", f"${current_value:,.2f}")
             
-            with cols[0]:
-                st.metric("Records", len(df))
-            with cols[1]:
-                st.metric("Avg Price", f"${df['price'].mean():,.2f}")
-            with cols[2]:
-                st.metric("Total Volume", f"{df['size'].sum():,.2f}")
-            with cols[3]:
-                st.metric("Price Range", f"${df['price'].max() - df['price'].min():,.2f}")
-        else:
-            st.info("No data available")
-    
-    with tab7:
-        st.header("Portfolio & P&L Tracker")
+            with col4:
+                st.markdown(f"<div style='color: {pnl_color}; font-size: 1.2rem; font-weight: 700;'>${pnl:+,.2f} ({pnl_pct:+.2f}%)</div>", unsafe_allow_html=True)
+            
+            with col5:
+                if st.button("Close", key=f"close_{pos['id']}"):
+                    # Close position; removed from the open table after the loop
+                    closed_pos = {**pos, 'exit_price': current_price, 'exit_time': datetime.now(),
+                                  'pnl': pnl, 'pnl_pct': pnl_pct}
+                    append_position(closed_trades, closed_pos)
+                    to_close.append(pos['id'])
+                    st.success(f"Closed {pos['symbol'].upper()} for ${pnl:+,.2f}")
+            
+            st.markdown("---")
         
-        # Get current prices for each symbol
-        unique_symbols = df_resampled['symbol'].unique() if not df_resampled.empty else []
-        current_prices = {}
-        for sym in unique_symbols:
-            sdf = df_resampled[df_resampled['symbol'] == sym]
-            if not sdf.empty:
-                current_prices[sym] = sdf.iloc[-1]['close']
+        if to_close:
+            st.session_state.portfolio = portfolio[~portfolio['id'].isin(to_close)].reset_index(drop=True)
+            st.rerun()
         
-        # Open Position Form
-        st.subheader("Open New Position")
+        # Portfolio Summary
+        st.subheader("Portfolio Summary")
+        sum_cols = st.columns(4)
         
-        if len(unique_symbols) > 0:
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                pos_symbol = st.selectbox("Symbol", list(unique_symbols), key="pos_symbol")
-            with col2:
-                pos_side = st.selectbox("Side", ["LONG", "SHORT"], key="pos_side")
-            with col3:
-                pos_size = st.number_input("Position Size ($)", min_value=100.0, value=1000.0, step=100.0, key="pos_size")
-            with col4:
-                pos_entry = current_prices.get(pos_symbol, 0.0)
-                st.metric("Current Price", f"${pos_entry:,.2f}")
-            
-            if st.button("Open Position", type="primary", key="open_pos"):
-                if pos_entry > 0:
-                    new_pos = {
-                        'id': len(st.session_state.portfolio) + 1,
-                        'symbol': pos_symbol,
-                        'side': pos_side,
-                        'size': pos_size,
-                        'entry_price': pos_entry,
-                        'entry_time': datetime.now(),
-                        'quantity': pos_size / pos_entry
-                    }
-                    st.session_state.portfolio.append(new_pos)
-                    st.success(f"Opened {pos_side} {pos_symbol.upper()} @ ${pos_entry:,.2f}")
-                    st.rerun()
-                else:
-                    st.error("No price data available for this symbol")
-        else:
-            st.info("Start data collection to open positions")
+        with sum_cols[0]:
+            st.metric("Open Positions", len(portfolio))
+        with sum_cols[1]:
+            st.metric("Total Value", f"${total_position_value:,.2f}")
+        with sum_cols[2]:
+            pnl_delta = "profit" if total_unrealized_pnl >= 0 else "loss"
+            st.metric("Unrealized P&L", f"${total_unrealized_pnl:+,.2f}", delta=pnl_delta)
+        with sum_cols[3]:
+            # Calculate realized P&L from closed trades
+            realized_pnl = closed_trades['pnl'].sum()
+            st.metric("Realized P&L", f"${realized_pnl:+,.2f}")
         
-        st.markdown("---")
+    else:
+        st.info("No open positions. Open a position above to start tracking.")
+    
+    # Closed Trades History
+    if not closed_trades.empty:
+        st.subheader("Trade History")
         
-        # Active Positions with Live P&L
-        st.subheader("Active Positions")
+        trades_data = pd.DataFrame({
+            'Symbol': closed_trades['symbol'].str.upper(),
+            'Side': closed_trades['side'],
+            'Entry': closed_trades['entry_price'].map('${:,.2f}'.format),
+            'Exit': closed_trades['exit_price'].map('${:,.2f}'.format),
+            'Size': closed_trades['size'].map('${:,.2f}'.format),
+            'P&L': closed_trades['pnl'].map('${:+,.2f}'.format),
+            'Return': closed_trades['pnl_pct'].map('{:+.2f}%'.format)
+        })
         
-        if st.session_state.portfolio:
-            total_unrealized_pnl = 0
-            total_position_value = 0
-            
-            for i, pos in enumerate(st.session_state.portfolio):
-                current_price = current_prices.get(pos['symbol'], pos['entry_price'])
-                
-                # Calculate P&L
-                if pos['side'] == 'LONG':
-                    pnl = (current_price - pos['entry_price']) * pos['quantity']
-                    pnl_pct = ((current_price / pos['entry_price']) - 1) * 100
-                else:  # SHORT
-                    pnl = (pos['entry_price'] - current_price) * pos['quantity']
-                    pnl_pct = ((pos['entry_price'] / current_price) - 1) * 100
-                
-                current_value = pos['quantity'] * current_price
-                total_unrealized_pnl += pnl
-                total_position_value += current_value
-                
-                pnl_color = "#10b981" if pnl >= 0 else "#ef4444"
-                
-                col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 2, 1])
-                
-                with col1:
-                    st.markdown(f"**{pos['symbol'].upper()}** ({pos['side']})")
-                    st.caption(f"Entry: ${pos['entry_price']:,.2f} | Qty: {pos['quantity']:.6f}")
-                
-                with col2:
-                    st.metric("Current", f"${current_price:,.2f}")
-                
-                with col3:
-                    st.metric("Value", f"${current_value:,.2f}")
-                
-                with col4:
-                    st.markdown(f"<div style='color: {pnl_color}; font-size: 1.2rem; font-weight: 700;'>${pnl:+,.2f} ({pnl_pct:+.2f}%)</div>", unsafe_allow_html=True)
-                
-                with col5:
-                    if st.button("Close", key=f"close_{i}"):
-                        # Close position
-                        closed_pos = pos.copy()
-                        closed_pos['exit_price'] = current_price
-                        closed_pos['exit_time'] = datetime.now()
-                        closed_pos['pnl'] = pnl
-                        closed_pos['pnl_pct'] = pnl_pct
-                        st.session_state.closed_trades.append(closed_pos)
-                        st.session_state.portfolio.pop(i)
-                        st.success(f"Closed {pos['symbol'].upper()} for ${pnl:+,.2f}")
-                        st.rerun()
-                
-                st.markdown("---")
-            
-            # Portfolio Summary
-            st.subheader("Portfolio Summary")
-            sum_cols = st.columns(4)
-            
-            with sum_cols[0]:
-                st.metric("Open Positions", len(st.session_state.portfolio))
-            with sum_cols[1]:
-                st.metric("Total Value", f"${total_position_value:,.2f}")
-            with sum_cols[2]:
-                pnl_delta = "profit" if total_unrealized_pnl >= 0 else "loss"
-                st.metric("Unrealized P&L", f"${total_unrealized_pnl:+,.2f}", delta=pnl_delta)
-            with sum_cols[3]:
-                # Calculate realized P&L from closed trades
-                realized_pnl = sum(t.get('pnl', 0) for t in st.session_state.closed_trades)
-                st.metric("Realized P&L", f"${realized_pnl:+,.2f}")
-            
-        else:
-            st.info("No open positions. Open a position above to start tracking.")
+        st.dataframe(trades_data, hide_index=True)
         
-        # Closed Trades History
-        if st.session_state.closed_trades:
-            st.subheader("Trade History")
-            
-            trades_data = []
-            for t in st.session_state.closed_trades:
-                trades_data.append({
-                    'Symbol': t['symbol'].upper(),
-                    'Side': t['side'],
-                    'Entry': f"${t['entry_price']:,.2f}",
-                    'Exit': f"${t['exit_price']:,.2f}",
-                    'Size': f"${t['size']:,.2f}",
-                    'P&L': f"${t['pnl']:+,.2f}",
-                    'Return': f"{t['pnl_pct']:+.2f}%"
-                })
-            
-            st.dataframe(pd.DataFrame(trades_data), hide_index=True)
-            
-            # Trade stats
-            total_trades = len(st.session_state.closed_trades)
-            winning_trades = len([t for t in st.session_state.closed_trades if t['pnl'] > 0])
-            win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-            
-            stat_cols = st.columns(3)
-            with stat_cols[0]:
-                st.metric("Total Trades", total_trades)
-            with stat_cols[1]:
-                st.metric("Win Rate", f"{win_rate:.1f}%")
-            with stat_cols[2]:
-                total_pnl = sum(t['pnl'] for t in st.session_state.closed_trades)
-                st.metric("Total Realized", f"${total_pnl:+,.2f}")
-            
-            if st.button("Clear Trade History", key="clear_history"):
-                st.session_state.closed_trades = []
-                st.rerun()
+        # Trade stats
+        total_trades = len(closed_trades)
+        winning_trades = int((closed_trades['pnl'] > 0).sum())
+        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+        
+        stat_cols = st.columns(3)
+        with stat_cols[0]:
+            st.metric("Total Trades", total_trades)
+        with stat_cols[1]:
+            st.metric("Win Rate", f"{win_rate:.1f}%")
+        with stat_cols[2]:
+            total_pnl = closed_trades['pnl'].sum()
+            st.metric("Total Realized", f"${total_pnl:+,.2f}")
+        
+        if st.button("Clear Trade History", key="clear_history"):
+            st.session_state.closed_trades = _empty_table(CLOSED_TRADE_DTYPES)
+            st.rerun()
 
 
 # Main app routing
 # Main app routing
-# Check query params for direct dashboard access
-query_params = st.query_params
-if query_params.get("page") == "dashboard":
-    st.session_state.page = 'dashboard'
-
 if st.session_state.page == 'landing':
     show_landing_page()
 else:
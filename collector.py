@@ -3,34 +3,88 @@ WebSocket collector for Binance Futures tick data
 Implements DataFeed interface for pluggable data source architecture
 """
 import websocket
-import json
+import sys
 import threading
 import time
-from datetime import datetime
-from collections import deque
+from array import array
 from typing import List, Callable, Optional, Dict
 import logging
 
+import numpy as np
+
 from config import Config
 from data_feed import DataFeed
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Every trade frame carries this near its start: {"stream":"<symbol>@trade","data":{"e":"trade",...
+# Only the quoted value is matched, so whitespace after the colon can't hide a trade;
+# the stream name ends in @trade" and "aggTrade" differs in its quotes, so neither matches
+TRADE_MARKER = '"trade"'
+TRADE_MARKER_SCAN = 128  # leading characters searched for the marker
+
+# Trade messages decode straight into a typed struct with msgspec when it is
+# installed; otherwise parse to a dict with orjson, or the stdlib json module
+try:
+    import msgspec
+    
+    class _TradeEvent(msgspec.Struct):
+        """The Binance trade event fields a tick is built from"""
+        e: str
+        s: str = ''
+        T: int = 0
+        p: float = 0.0  # sent as decimal strings; strict=False parses them during decoding
+        q: float = 0.0
+        t: Optional[int] = None
+        m: bool = False
+    
+    class _StreamMessage(msgspec.Struct):
+        """Combined-stream envelope around each event"""
+        data: _TradeEvent
+    
+    _decode_message = msgspec.json.Decoder(_StreamMessage, strict=False).decode
+except ImportError:
+    msgspec = None
+    try:
+        from orjson import loads as _json_loads
+    except ImportError:
+        from json import loads as _json_loads
+
 
 class TickCollector(DataFeed):
     """Collects real-time tick data from Binance Futures WebSocket"""
     
+    # Reconnect backoff bounds, in seconds
+    RECONNECT_BACKOFF_MIN = 1
+    RECONNECT_BACKOFF_MAX = 15
+    
+    # In-memory buffer row layout; symbol_id indexes the symbol_index keys
+    BUFFER_DTYPE = np.dtype([('timestamp', 'i8'), ('price', 'f8'),
+                             ('size', 'f8'), ('symbol_id', 'i2')])
+    
     def __init__(self, buffer_size: int = None):
         self.buffer_size = buffer_size or Config.BUFFER_SIZE
         self.running = False
-        self.buffer = deque(maxlen=self.buffer_size)
+        self.stop_event = threading.Event()  # set by stop(); every wait/backoff returns at once
+        # Recent ticks in a preallocated ring; buffer_written is an absolute counter
+        self.buffer = np.zeros(self.buffer_size, dtype=self.BUFFER_DTYPE)
+        self.buffer_written = 0
         self.threads = []
-        self.websockets = []
+        self.ws: Optional[websocket.WebSocketApp] = None  # current connection, replaced on reconnect
         self.on_tick_callback: Optional[Callable] = None
+        # Batched consumers get lists of ticks instead of one call per tick
+        self.on_ticks_callback: Optional[Callable] = None
+        self.tick_batch_size = 64
+        self.tick_batch_delay = 0.01  # seconds
+        self.pending_ticks: List[dict] = []
+        self.pending_since = 0.0
+        # Per-tick counters are unsigned slots indexed by symbol; get_stats() builds the dicts
+        self.symbol_index: Dict[str, int] = {}
+        # Binance's uppercase symbol -> one interned lowercase str shared by every tick
+        self.symbol_names: Dict[str, str] = {}
+        self.tick_counts = array('Q')
         self.stats = {
-            'total_ticks': 0,
-            'ticks_per_symbol': {},
             'errors': 0,
             'reconnections': 0,
             'source': 'binance_ws'
@@ -40,6 +94,21 @@ class TickCollector(DataFeed):
         """Set callback function to be called on each tick"""
         self.on_tick_callback = callback
     
+    def set_ticks_callback(self, callback: Callable, max_batch: int = 64, max_delay_ms: int = 10):
+        """Set callback called with lists of up to max_batch ticks, once full or max_delay_ms old"""
+        self.on_ticks_callback = callback
+        self.tick_batch_size = max_batch
+        self.tick_batch_delay = max_delay_ms / 1000
+    
+    def _emit_ticks(self):
+        """Hand the pending tick list to the batched callback"""
+        ticks, self.pending_ticks = self.pending_ticks, []
+        if ticks and self.on_ticks_callback:
+            try:
+                self.on_ticks_callback(ticks)
+            except Exception as e:
+                logger.error(f"Batch callback error: {e}")
+    
     def connect(self, symbols: List[str]):
         """Alias for start() to match DataFeed interface"""
         self.start(symbols)
@@ -59,34 +128,43 @@ class TickCollector(DataFeed):
             return
         
         self.running = True
-        self.stats['ticks_per_symbol'] = {symbol: 0 for symbol in symbols}
-        
+        self.stop_event.clear()
+        # Counts persist across restarts so total_ticks never moves backwards
         for symbol in symbols:
-            thread = threading.Thread(
-                target=self._collect,
-                args=(symbol,),
-                daemon=True,
-                name=f"Collector-{symbol}"
-            )
-            thread.start()
-            self.threads.append(thread)
-            logger.info(f"Started collector for {symbol}")
-    
-    def _collect(self, symbol: str):
-        """Collect ticks for a single symbol"""
-        url = Config.get_ws_url(symbol)
+            symbol = self._symbol_name(symbol.upper())
+            if symbol not in self.symbol_index:
+                self.symbol_index[symbol] = len(self.tick_counts)
+                self.tick_counts.append(0)
+        
+        # One combined-stream socket and reader thread for every symbol
+        thread = threading.Thread(
+            target=self._collect,
+            args=(symbols,),
+            daemon=True,
+            name="Collector"
+        )
+        thread.start()
+        self.threads.append(thread)
+        logger.info(f"Started collector for {', '.join(symbols)}")
+    
+    def _collect(self, symbols: List[str]):
+        """Collect ticks for all symbols over one combined-stream connection"""
+        url = Config.get_combined_ws_url(symbols)
+        streams = '/'.join(symbols)
+        symbol_index, tick_counts = self.symbol_index, self.tick_counts
         
         def on_message(ws, message):
             try:
-                data = json.loads(message)
-                if data.get('e') == 'trade':
-                    tick = self._normalize_tick(data)
-                    self.buffer.append(tick)
+                tick = self._parse_message(message)
+                if tick is not None:
+                    symbol_id = symbol_index[tick['symbol']]
+                    # One row assignment, so readers never see a half-written tick
+                    self.buffer[self.buffer_written % self.buffer_size] = (
+                        tick['timestamp'], tick['price'], tick['size'], symbol_id)
+                    self.buffer_written += 1
                     
-                    # Update statistics
-                    self.stats['total_ticks'] += 1
-                    self.stats['ticks_per_symbol'][symbol] = \
-                        self.stats['ticks_per_symbol'].get(symbol, 0) + 1
+                    # Update statistics: one array slot, no dict writes or int boxing
+                    tick_counts[symbol_id] += 1
                     
                     # Call callback if set
                     if self.on_tick_callback:
@@ -94,20 +172,35 @@ class TickCollector(DataFeed):
                             self.on_tick_callback(tick)
                         except Exception as e:
                             logger.error(f"Callback error: {e}")
+                    
+                    # Batched callback: the age check runs as ticks arrive, and stop() drains the rest
+                    if self.on_ticks_callback:
+                        now = time.monotonic()
+                        if not self.pending_ticks:
+                            self.pending_since = now
+                        self.pending_ticks.append(tick)
+                        if (len(self.pending_ticks) >= self.tick_batch_size or
+                                now - self.pending_since >= self.tick_batch_delay):
+                            self._emit_ticks()
                             
             except Exception as e:
-                logger.error(f"Error processing message for {symbol}: {e}")
+                logger.error(f"Error processing message for {streams}: {e}")
                 self.stats['errors'] += 1
         
         def on_error(ws, error):
-            logger.error(f"WebSocket error for {symbol}: {error}")
+            logger.error(f"WebSocket error for {streams}: {error}")
             self.stats['errors'] += 1
         
         def on_close(ws, close_status_code, close_msg):
-            logger.info(f"WebSocket closed for {symbol}: {close_status_code} - {close_msg}")
+            logger.info(f"WebSocket closed for {streams}: {close_status_code} - {close_msg}")
+        
+        # Reconnect delay doubles per failed attempt up to the cap; a successful open resets it
+        backoff = self.RECONNECT_BACKOFF_MIN
         
         def on_open(ws):
-            logger.info(f"WebSocket connected for {symbol}")
+            nonlocal backoff
+            backoff = self.RECONNECT_BACKOFF_MIN
+            logger.info(f"WebSocket connected for {streams}")
         
         # Keep reconnecting while running
         while self.running:
@@ -120,27 +213,69 @@ class TickCollector(DataFeed):
                     on_open=on_open
                 )
                 
-                self.websockets.append(ws)
+                self.ws = ws  # the previous, closed app is released here
                 ws.run_forever()
                 
                 # If we get here, connection was closed
                 if self.running:
-                    logger.info(f"Reconnecting {symbol} in 5 seconds...")
+                    logger.info(f"Reconnecting {streams} in {backoff} seconds...")
                     self.stats['reconnections'] += 1
-                    time.sleep(5)
                     
             except Exception as e:
-                logger.error(f"Connection error for {symbol}: {e}")
+                logger.error(f"Connection error for {streams}: {e}")
                 self.stats['errors'] += 1
-                if self.running:
-                    time.sleep(5)
+            
+            # Returns early (True) as soon as stop() is called
+            if self.stop_event.wait(timeout=backoff):
+                break
+            backoff = min(backoff * 2, self.RECONNECT_BACKOFF_MAX)
+    
+    def _symbol_name(self, raw: str) -> str:
+        """Interned lowercase name for a Binance symbol, remembered after the first lookup"""
+        name = self.symbol_names[raw] = sys.intern(raw.lower())
+        return name
+    
+    def _parse_message(self, message) -> Optional[dict]:
+        """Decode a combined-stream message; returns the tick, or None for non-trade events"""
+        # Substring prefilter: other frames are dropped without being parsed at all
+        head = message[:TRADE_MARKER_SCAN]
+        if isinstance(head, bytes):
+            head = head.decode('utf-8', 'ignore')
+        if TRADE_MARKER not in head:
+            return None
+        
+        if msgspec is not None:
+            trade = _decode_message(message).data
+            if trade.e != 'trade':
+                return None
+            try:
+                symbol = self.symbol_names[trade.s]
+            except KeyError:
+                symbol = self._symbol_name(trade.s)
+            return {
+                'symbol': symbol,
+                'timestamp': trade.T,  # trade time, epoch ms
+                'price': trade.p,
+                'size': trade.q,
+                'trade_id': trade.t,
+                'is_buyer_maker': trade.m
+            }
+        
+        # Combined streams wrap each event as {"stream": ..., "data": {...}}
+        data = _json_loads(message).get('data', {})
+        if data.get('e') != 'trade':
+            return None
+        return self._normalize_tick(data)
     
     def _normalize_tick(self, data: dict) -> dict:
         """Normalize Binance tick data to standard format"""
-        timestamp = datetime.fromtimestamp(data['T'] / 1000).isoformat()
+        try:
+            symbol = self.symbol_names[data['s']]
+        except KeyError:
+            symbol = self._symbol_name(data['s'])
         return {
-            'symbol': data['s'].lower(),
-            'timestamp': timestamp,
+            'symbol': symbol,
+            'timestamp': data['T'],  # trade time, epoch ms
             'price': float(data['p']),
             'size': float(data['q']),
             'trade_id': data.get('t'),
@@ -155,38 +290,46 @@ class TickCollector(DataFeed):
         
         logger.info("Stopping collector...")
         self.running = False
+        self.stop_event.set()
         
-        # Close all WebSocket connections
-        for ws in self.websockets:
+        # Close the live WebSocket connection
+        if self.ws is not None:
             try:
-                ws.close()
+                self.ws.close()
             except:
                 pass
         
-        self.websockets = []
+        self.ws = None
         self.threads = []
+        self._emit_ticks()
         logger.info("Collector stopped")
     
     def get_buffer_size(self) -> int:
         """Get current buffer size"""
-        return len(self.buffer)
+        return min(self.buffer_written, self.buffer_size)
     
-    def get_buffer_data(self, limit: Optional[int] = None) -> List[dict]:
-        """Get data from buffer"""
+    def get_buffer_data(self, limit: Optional[int] = None) -> np.ndarray:
+        """Get the newest buffered ticks, oldest first, as a BUFFER_DTYPE array"""
+        end = self.buffer_written
+        count = min(end, self.buffer_size)
         if limit:
-            return list(self.buffer)[-limit:]
-        return list(self.buffer)
+            count = min(count, limit)
+        # np.take copies both sides of the wrap-around in one call
+        return self.buffer.take(np.arange(end - count, end) % self.buffer_size)
     
     def clear_buffer(self):
         """Clear the buffer"""
-        self.buffer.clear()
+        self.buffer_written = 0
         logger.info("Buffer cleared")
     
     def get_stats(self) -> dict:
         """Get collector statistics"""
+        counts = self.tick_counts.tolist()
         return {
             **self.stats,
-            'buffer_size': len(self.buffer),
+            'total_ticks': sum(counts),
+            'ticks_per_symbol': dict(zip(self.symbol_index, counts)),
+            'buffer_size': self.get_buffer_size(),
             'active_threads': len([t for t in self.threads if t.is_alive()]),
             'is_running': self.running
         }
@@ -199,13 +342,30 @@ class TickCollector(DataFeed):
 class BatchTickCollector(TickCollector):
     """Extended collector with batch database insertion"""
     
+    # Ring buffer row layout, in insert_ticks_bulk column order
+    TICK_DTYPE = np.dtype([('symbol', 'U20'), ('timestamp', 'i8'),
+                           ('price', 'f8'), ('size', 'f8')])
+    
     def __init__(self, buffer_size: int = 10000, batch_size: int = 100, 
                  batch_interval: int = 5):
         super().__init__(buffer_size)
         self.batch_size = batch_size
         self.batch_interval = batch_interval
-        self.batch_buffer = []
         self.batch_thread = None
+        self.on_batch_callback: Optional[Callable] = None
+        
+        # Pending ticks live in a preallocated ring; written/flushed are absolute
+        # counters, so a slot index is counter % capacity
+        self.ring = np.empty(self.buffer_size, dtype=self.TICK_DTYPE)
+        self.ring_lock = threading.Lock()
+        self.flush_lock = threading.Lock()  # one flusher at a time (processor vs stop())
+        self.flush_event = threading.Event()  # set by producers once a full batch is pending
+        self.written = 0
+        self.flushed = 0
+        self.stats['dropped_ticks'] = 0
+        
+        # Buffer ticks for batch insertion even when no per-tick callback is set
+        self.set_callback(None)
         
     def start(self, symbols: List[str]):
         """Start collecting with batch processing"""
@@ -220,27 +380,87 @@ class BatchTickCollector(TickCollector):
         self.batch_thread.start()
         logger.info("Batch processor started")
     
+    def set_batch_callback(self, callback: Callable):
+        """Set callback called with each structured array of ticks ready to persist"""
+        self.on_batch_callback = callback
+    
+    def _save_batch(self, ticks: np.ndarray):
+        """Persist a batch via the batch callback, or straight to the database"""
+        if self.on_batch_callback:
+            self.on_batch_callback(ticks)
+        else:
+            from database import insert_ticks_bulk
+            insert_ticks_bulk(ticks)
+    
+    def _commit_saved(self):
+        """Commit batches the database is still grouping into one transaction"""
+        from database import flush_writes
+        flush_writes()
+    
+    def _push(self, tick: dict):
+        """Append a tick to the ring, overwriting the oldest unflushed one when full"""
+        with self.ring_lock:
+            if self.written - self.flushed == len(self.ring):
+                self.flushed += 1
+                self.stats['dropped_ticks'] += 1
+            self.ring[self.written % len(self.ring)] = (
+                tick['symbol'], tick['timestamp'], tick['price'], tick['size'])
+            self.written += 1
+            if self.written - self.flushed >= self.batch_size:
+                self.flush_event.set()
+    
+    def pending_count(self) -> int:
+        """Number of buffered ticks not yet persisted"""
+        with self.ring_lock:
+            return self.written - self.flushed
+    
+    def _flush(self, max_rows: Optional[int] = None) -> int:
+        """Persist up to max_rows pending ticks; returns the number saved"""
+        with self.flush_lock:
+            with self.ring_lock:
+                start = self.flushed
+                end = self.written if max_rows is None else min(self.written, start + max_rows)
+                if end <= start:
+                    return 0
+                # Copy out under the lock (np.take handles the wrap-around), insert outside it
+                batch = self.ring.take(np.arange(start, end) % len(self.ring))
+            
+            self._save_batch(batch)
+            
+            with self.ring_lock:
+                # Producers may have dropped past `end` meanwhile; never move backwards
+                self.flushed = max(self.flushed, end)
+            return len(batch)
+    
     def _batch_processor(self):
-        """Process ticks in batches"""
-        from database import insert_ticks_batch
-        
+        """Process ticks in batches, woken as soon as a full batch is pending"""
         while self.running:
-            time.sleep(self.batch_interval)
+            # batch_interval only bounds the wait; a full batch wakes the processor at once
+            woken = self.flush_event.wait(timeout=self.batch_interval)
+            self.flush_event.clear()
             
-            if len(self.batch_buffer) >= self.batch_size:
-                # Insert batch
+            # A quiet interval: don't leave grouped batches uncommitted
+            if not woken:
                 try:
-                    ticks_to_insert = self.batch_buffer[:self.batch_size]
-                    insert_ticks_batch(ticks_to_insert)
-                    self.batch_buffer = self.batch_buffer[self.batch_size:]
-                    logger.info(f"Inserted batch of {len(ticks_to_insert)} ticks")
+                    self._commit_saved()
+                except Exception as e:
+                    logger.error(f"Commit error: {e}")
+            
+            # Drain every full batch that accumulated while waiting
+            while self.pending_count() >= self.batch_size:
+                try:
+                    inserted = self._flush(self.batch_size)
+                    logger.info(f"Inserted batch of {inserted} ticks")
                 except Exception as e:
                     logger.error(f"Batch insert error: {e}")
+                    # Producers keep setting the event; back off instead of spinning
+                    self.stop_event.wait(timeout=self.batch_interval)
+                    break
     
     def set_callback(self, callback: Callable):
         """Override to add batch buffering"""
         def batch_callback(tick):
-            self.batch_buffer.append(tick)
+            self._push(tick)
             if callback:
                 callback(tick)
         
@@ -249,13 +469,13 @@ class BatchTickCollector(TickCollector):
     def stop(self):
         """Stop collector and flush remaining batch"""
         super().stop()
+        self.flush_event.set()  # let the processor notice running=False without waiting
         
         # Flush remaining ticks
-        if self.batch_buffer:
-            try:
-                from database import insert_ticks_batch
-                insert_ticks_batch(self.batch_buffer)
-                logger.info(f"Flushed {len(self.batch_buffer)} remaining ticks")
-                self.batch_buffer = []
-            except Exception as e:
-                logger.error(f"Error flushing batch: {e}")
+        try:
+            flushed = self._flush()
+            self._commit_saved()
+            if flushed:
+                logger.info(f"Flushed {flushed} remaining ticks")
+        except Exception as e:
+            logger.error(f"Error flushing batch: {e}")
@@ -11,6 +11,8 @@ class Config:
     
     # Database settings
     DB_PATH = os.getenv("CRYPTO_DB_PATH", "crypto_ticks.db")
+    SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", "256"))   # page cache per connection
+    SQLITE_MMAP_MB = int(os.getenv("SQLITE_MMAP_MB", "1024"))    # memory-mapped I/O window
     
     # WebSocket settings
     BINANCE_WS_BASE = os.getenv("BINANCE_WS_URL", "wss://fstream.binance.com/ws")
@@ -20,6 +22,10 @@ class Config:
     BATCH_SIZE = int(os.getenv("BATCH_SIZE", "100"))
     BATCH_INTERVAL = int(os.getenv("BATCH_INTERVAL", "5"))
     
+    # Tick batches share one write transaction until either limit is reached
+    COMMIT_ROWS = int(os.getenv("COMMIT_ROWS", "1000"))
+    COMMIT_INTERVAL = float(os.getenv("COMMIT_INTERVAL", "1.0"))  # seconds
+    
     # Auto-refresh interval (milliseconds) - 1 second for near real-time
     REFRESH_INTERVAL = int(os.getenv("REFRESH_INTERVAL", "1000"))
     
@@ -27,6 +33,12 @@ class Config:
     DEFAULT_TIMEFRAME = os.getenv("DEFAULT_TIMEFRAME", "1s")
     DEFAULT_ROLLING_WINDOW = int(os.getenv("DEFAULT_ROLLING_WINDOW", "10"))
     
+    # Symbols per worker chunk when resampling many symbols in parallel
+    RESAMPLE_CHUNK_SIZE = int(os.getenv("RESAMPLE_CHUNK_SIZE", "100"))
+    
+    # Number of ADF test results memoized by series contents (0 disables)
+    ADF_CACHE_SIZE = int(os.getenv("ADF_CACHE_SIZE", "1024"))
+    
     # Cleanup settings
     DATA_RETENTION_HOURS = int(os.getenv("DATA_RETENTION_HOURS", "24"))
     
@@ -49,17 +61,32 @@ class Config:
         """Get WebSocket URL for a symbol"""
         return f"{cls.BINANCE_WS_BASE}/{symbol.lower()}@trade"
     
+    @classmethod
+    def get_combined_ws_url(cls, symbols: list) -> str:
+        """Get one combined-stream WebSocket URL carrying trades for all symbols"""
+        base = cls.BINANCE_WS_BASE.rstrip('/')
+        if base.endswith('/ws'):
+            base = base[:-len('/ws')]
+        streams = '/'.join(f"{symbol.lower()}@trade" for symbol in symbols)
+        return f"{base}/stream?streams={streams}"
+    
     @classmethod
     def to_dict(cls) -> dict:
         """Export all config as dictionary"""
         return {
             "db_path": cls.DB_PATH,
+            "sqlite_cache_mb": cls.SQLITE_CACHE_MB,
+            "sqlite_mmap_mb": cls.SQLITE_MMAP_MB,
             "ws_base": cls.BINANCE_WS_BASE,
             "buffer_size": cls.BUFFER_SIZE,
             "batch_size": cls.BATCH_SIZE,
             "batch_interval": cls.BATCH_INTERVAL,
+            "commit_rows": cls.COMMIT_ROWS,
+            "commit_interval": cls.COMMIT_INTERVAL,
             "refresh_interval": cls.REFRESH_INTERVAL,
             "default_timeframe": cls.DEFAULT_TIMEFRAME,
             "rolling_window": cls.DEFAULT_ROLLING_WINDOW,
+            "resample_chunk_size": cls.RESAMPLE_CHUNK_SIZE,
+            "adf_cache_size": cls.ADF_CACHE_SIZE,
             "retention_hours": cls.DATA_RETENTION_HOURS,
         }
@@ -44,7 +44,7 @@ class DataFeed(ABC):
         Standard format:
         {
             'symbol': str,
-            'timestamp': str (ISO format),
+            'timestamp': int (epoch ms),
             'price': float,
             'size': float,
             'source': str
@@ -56,6 +56,9 @@ class DataFeed(ABC):
 class CSVDataFeed(DataFeed):
     """Data feed from CSV file (for backtesting/historical analysis)"""
     
+    # Rows read per chunk, so very large files are streamed with bounded memory
+    CHUNK_SIZE = 100_000
+    
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.connected = False
@@ -66,20 +69,39 @@ class CSVDataFeed(DataFeed):
         import pandas as pd
         self.connected = True
         
-        df = pd.read_csv(self.file_path)
+        wanted = {s.lower() for s in symbols} if symbols else None
         
-        for _, row in df.iterrows():
-            if symbols and row.get('symbol', '').lower() not in [s.lower() for s in symbols]:
-                continue
-            
-            tick = self.normalize_tick(row.to_dict(), 'csv')
-            self.stats['total_ticks'] += 1
+        for chunk in pd.read_csv(self.file_path, chunksize=self.CHUNK_SIZE):
+            ticks = self.normalize_frame(chunk)
+            if wanted is not None:
+                ticks = ticks[ticks['symbol'].isin(wanted)]
             
-            if self.callback:
-                self.callback(tick)
+            # Columns are already normalized, so each row is just unpacked
+            for symbol, timestamp, price, size in ticks.itertuples(index=False, name=None):
+                tick = {'symbol': symbol, 'timestamp': timestamp, 'price': price,
+                        'size': size, 'source': 'csv'}
+                self.stats['total_ticks'] += 1
+                
+                if self.callback:
+                    self.callback(tick)
         
         self.connected = False
     
+    @staticmethod
+    def normalize_frame(df):
+        """Vectorized normalize_tick over a whole chunk: symbol, timestamp, price, size columns"""
+        import pandas as pd
+        
+        def column(name, default):
+            return df[name] if name in df.columns else pd.Series(default, index=df.index)
+        
+        return pd.DataFrame({
+            'symbol': column('symbol', '').astype(str).str.lower(),
+            'timestamp': column('timestamp', int(datetime.now().timestamp() * 1000)),
+            'price': column('price', 0).astype(float),
+            'size': column('size', column('volume', 0)).astype(float),
+        })
+    
     def disconnect(self) -> None:
         self.connected = False
     
@@ -96,7 +118,7 @@ class CSVDataFeed(DataFeed):
     def normalize_tick(raw_data: dict, source: str) -> dict:
         return {
             'symbol': str(raw_data.get('symbol', '')).lower(),
-            'timestamp': raw_data.get('timestamp', datetime.now().isoformat()),
+            'timestamp': raw_data.get('timestamp', int(datetime.now().timestamp() * 1000)),
             'price': float(raw_data.get('price', 0)),
             'size': float(raw_data.get('size', raw_data.get('volume', 0))),
             'source': source
@@ -117,18 +139,28 @@ class RESTDataFeed(DataFeed):
     def connect(self, symbols: List[str]) -> None:
         import threading
         import time
+        from concurrent.futures import ThreadPoolExecutor
         import requests
         
         self.connected = True
         self._running = True
         
+        # One keep-alive session reuses connections; the pool fetches all symbols at once
+        session = requests.Session()
+        pool = ThreadPoolExecutor(max_workers=max(len(symbols), 1), thread_name_prefix="RESTPoll")
+        
+        def fetch(symbol):
+            response = session.get(f"{self.base_url}/{symbol}")
+            return response.json() if response.status_code == 200 else None
+        
         def poll_loop():
             while self._running:
-                for symbol in symbols:
+                started = time.monotonic()
+                futures = [(symbol, pool.submit(fetch, symbol)) for symbol in symbols]
+                for symbol, future in futures:
                     try:
-                        response = requests.get(f"{self.base_url}/{symbol}")
-                        if response.status_code == 200:
-                            data = response.json()
+                        data = future.result()
+                        if data is not None:
                             tick = self.normalize_tick(data, 'rest')
                             tick['symbol'] = symbol
                             self.stats['total_ticks'] += 1
@@ -139,7 +171,11 @@ class RESTDataFeed(DataFeed):
                         self.stats['errors'] = self.stats.get('errors', 0) + 1
                 
                 self.stats['polls'] += 1
-                time.sleep(self.poll_interval)
+                # Poll on a fixed cadence: request latency comes out of the interval
+                time.sleep(max(self.poll_interval - (time.monotonic() - started), 0))
+            
+            pool.shutdown(wait=False)
+            session.close()
         
         threading.Thread(target=poll_loop, daemon=True).start()
     
@@ -160,7 +196,7 @@ class RESTDataFeed(DataFeed):
     def normalize_tick(raw_data: dict, source: str) -> dict:
         return {
             'symbol': str(raw_data.get('symbol', '')).lower(),
-            'timestamp': raw_data.get('timestamp', datetime.now().isoformat()),
+            'timestamp': raw_data.get('timestamp', int(datetime.now().timestamp() * 1000)),
             'price': float(raw_data.get('price', raw_data.get('last', 0))),
             'size': float(raw_data.get('size', raw_data.get('volume', 0))),
             'source': source
@@ -2,35 +2,187 @@
 Database utilities for crypto tick data storage and retrieval
 """
 import sqlite3
+import threading
+import time
+import numpy as np
 import pandas as pd
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Optional, List, Dict
+from urllib.parse import quote
 
 from config import Config
 
 DB_PATH = Config.DB_PATH
 
+TICKS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS ticks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        price REAL NOT NULL,
+        size REAL NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# tick_stats keeps one running aggregate row per symbol and hour of ticks
+STATS_BUCKET_MS = 3_600_000
+
+TICK_STATS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tick_stats (
+        symbol TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        tick_count INTEGER NOT NULL,
+        min_price REAL,
+        max_price REAL,
+        sum_price REAL,
+        total_volume REAL,
+        first_tick INTEGER,
+        last_tick INTEGER,
+        PRIMARY KEY (symbol, bucket)
+    )
+"""
+
+# Aggregates ticks matching {where} into tick_stats, merging into existing buckets.
+# NOT INDEXED keeps the planner on rowid ranges instead of walking the covering
+# index end to end just to get symbol-ordered groups
+ROLLUP_SQL = f"""
+    INSERT INTO tick_stats (symbol, bucket, tick_count, min_price, max_price,
+                            sum_price, total_volume, first_tick, last_tick)
+    SELECT symbol, timestamp / {STATS_BUCKET_MS}, COUNT(*), MIN(price), MAX(price),
+           SUM(price), SUM(size), MIN(timestamp), MAX(timestamp)
+    FROM ticks NOT INDEXED
+    WHERE {{where}}
+    GROUP BY 1, 2
+    ON CONFLICT (symbol, bucket) DO UPDATE SET
+        tick_count = tick_count + excluded.tick_count,
+        min_price = MIN(min_price, excluded.min_price),
+        max_price = MAX(max_price, excluded.max_price),
+        sum_price = sum_price + excluded.sum_price,
+        total_volume = total_volume + excluded.total_volume,
+        first_tick = MIN(first_tick, excluded.first_tick),
+        last_tick = MAX(last_tick, excluded.last_tick)
+"""
+
+# One SQL text for every tick insert, so all of them share one prepared statement
+INSERT_TICK_SQL = "INSERT INTO ticks (symbol, timestamp, price, size) VALUES (?, ?, ?, ?)"
+
+def to_epoch_ms(value) -> int:
+    """Epoch milliseconds from ms numbers, ISO strings or datetimes (naive means local time)"""
+    if isinstance(value, str):
+        try:
+            return int(float(value))
+        except ValueError:
+            value = pd.Timestamp(value).to_pydatetime()
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(value)
+
+def _tune_connection(conn: sqlite3.Connection):
+    """Per-connection cache, mmap and temp-store PRAGMAs; none of them persist in the file"""
+    conn.execute(f"PRAGMA cache_size=-{Config.SQLITE_CACHE_MB * 1024}")
+    conn.execute(f"PRAGMA mmap_size={Config.SQLITE_MMAP_MB * 1024 * 1024}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+# One read-only connection shared by the dashboard's hot read paths, so repeated
+# refreshes reuse a warm page cache instead of reopening the file each time
+_read_conn: Optional[sqlite3.Connection] = None
+_read_lock = threading.Lock()
+
+@contextmanager
+def _read_connection():
+    """Yield the shared read-only connection, opening it on first use"""
+    global _read_conn
+    with _read_lock:
+        if _read_conn is None:
+            uri = f"file:{quote(Path(DB_PATH).resolve().as_posix())}?mode=ro"
+            _read_conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            _tune_connection(_read_conn)
+        yield _read_conn
+
+# Single long-lived writer shared by the collector thread and the UI; the lock
+# serializes writes, so no connect() or PRAGMA setup per batch
+_write_conn: Optional[sqlite3.Connection] = None
+_tick_cursor: Optional[sqlite3.Cursor] = None  # reused by insert_ticks_bulk
+_write_lock = threading.Lock()
+
+# Rows inserted by insert_ticks_bulk but not yet committed; the writer holds the
+# transaction open so the WAL commit is paid once per COMMIT_ROWS / COMMIT_INTERVAL
+_pending_rows = 0
+_last_commit = time.monotonic()
+
+@contextmanager
+def _write_connection(commit_pending: bool = True):
+    """Yield the shared writer connection under the write lock, opening it on first use"""
+    global _write_conn, _tick_cursor
+    with _write_lock:
+        if _write_conn is None:
+            _write_conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+            # With WAL, NORMAL only syncs at checkpoints instead of on every commit
+            _write_conn.execute("PRAGMA synchronous=NORMAL")
+            _tune_connection(_write_conn)
+            _tick_cursor = _write_conn.cursor()
+        # Other writers start from a clean transaction, so their rollback can't drop grouped ticks
+        if commit_pending and _write_conn.in_transaction:
+            _commit_pending(_write_conn)
+        yield _write_conn
+
+def _commit_pending(conn: sqlite3.Connection):
+    """Commit the open tick transaction and reset the group-commit counters"""
+    global _pending_rows, _last_commit
+    conn.commit()
+    _pending_rows = 0
+    _last_commit = time.monotonic()
+
+def flush_writes():
+    """Commit tick batches still held in the open write transaction"""
+    with _write_connection():
+        pass
+
 def init_db():
     """Initialize SQLite database with optimized schema"""
     conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
-    # Main ticks table
+    # Larger pages halve the B-tree depth of the ticks scans; this only takes
+    # effect on a new file, since a WAL database keeps its page size
+    cursor.execute("PRAGMA page_size=8192")
+    
+    # WAL persists in the database file: readers no longer block the batch writer
+    cursor.execute("PRAGMA journal_mode=WAL")
+    
+    # Main ticks table; timestamps are INTEGER epoch ms like ohlc_data
+    cursor.execute(TICKS_SCHEMA)
+    
+    # Databases from before the switch hold local-time ISO TEXT; convert them in place
+    declared = {row[1]: row[2] for row in cursor.execute("PRAGMA table_info(ticks)")}
+    if declared.get('timestamp', '').upper() == 'TEXT':
+        cursor.execute("ALTER TABLE ticks RENAME TO ticks_iso")
+        cursor.execute(TICKS_SCHEMA)
+        cursor.execute("""
+            INSERT INTO ticks (id, symbol, timestamp, price, size, created_at)
+            SELECT id, symbol,
+                CAST(ROUND((julianday(timestamp, 'utc') - 2440587.5) * 86400000) AS INTEGER),
+                price, size, created_at
+            FROM ticks_iso
+            WHERE julianday(timestamp) IS NOT NULL
+        """)
+        cursor.execute("DROP TABLE ticks_iso")
+    
+    # Covering index: symbol/time range scans read price and size without touching the table
+    cursor.execute("DROP INDEX IF EXISTS idx_symbol_timestamp")
     cursor.execute("""
-        CREATE TABLE IF NOT EXISTS ticks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            symbol TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            price REAL NOT NULL,
-            size REAL NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
+        CREATE INDEX IF NOT EXISTS idx_symbol_ts_price 
+        ON ticks(symbol, timestamp, price, size)
     """)
     
-    # Indexes for performance
+    # Time-leading twin for the all-symbol "newest N ticks" reads, which would
+    # otherwise sort the whole table on every dashboard refresh
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_symbol_timestamp 
-        ON ticks(symbol, timestamp)
+        CREATE INDEX IF NOT EXISTS idx_ts_symbol_price 
+        ON ticks(timestamp, symbol, price, size)
     """)
     
     # OHLC data table
@@ -55,64 +207,85 @@ def init_db():
         ON ticks(created_at)
     """)
     
-    # Aggregated statistics table (for faster queries)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tick_stats (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            symbol TEXT NOT NULL,
-            interval_start TEXT NOT NULL,
-            interval_end TEXT NOT NULL,
-            tick_count INTEGER,
-            min_price REAL,
-            max_price REAL,
-            avg_price REAL,
-            total_volume REAL,
-            price_change REAL,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(symbol, interval_start)
-        )
-    """)
+    # Aggregated statistics table, kept current by every tick insert
+    stats_columns = {row[1] for row in cursor.execute("PRAGMA table_info(tick_stats)")}
+    if 'bucket' not in stats_columns:
+        # The old interval layout was never populated; rebuild it from the ticks once
+        cursor.execute("DROP TABLE IF EXISTS tick_stats")
+        cursor.execute(TICK_STATS_SCHEMA)
+        cursor.execute(ROLLUP_SQL.format(where="1"))
     
     conn.commit()
+    
+    # init_db runs on every rerun; gather planner statistics only once up front
+    analyzed = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+    ).fetchone()
+    if not analyzed:
+        _analyze(conn)
     conn.close()
 
-def insert_tick(symbol: str, timestamp: str, price: float, size: float):
-    """Insert a single tick into the database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO ticks (symbol, timestamp, price, size)
-        VALUES (?, ?, ?, ?)
-    """, (symbol, timestamp, price, size))
+def _analyze(conn: sqlite3.Connection, table: Optional[str] = None):
+    """Refresh planner statistics after bulk changes, for one table or the whole file"""
+    conn.execute(f"ANALYZE {table}" if table else "ANALYZE")
     conn.commit()
-    conn.close()
+
+def insert_tick(symbol: str, timestamp, price: float, size: float):
+    """Insert a single tick into the database (timestamp in epoch ms, ISO strings accepted)"""
+    with _write_connection() as conn, conn:
+        cursor = conn.execute(INSERT_TICK_SQL, (symbol, to_epoch_ms(timestamp), price, size))
+        conn.execute(ROLLUP_SQL.format(where="id = ?"), (cursor.lastrowid,))
 
 def insert_ticks_batch(ticks: List[Dict]):
     """Insert multiple ticks in a batch for better performance"""
     if not ticks:
         return
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    data = [(tick['symbol'], tick['timestamp'], tick['price'], tick['size']) 
-            for tick in ticks]
-    
-    cursor.executemany("""
-        INSERT INTO ticks (symbol, timestamp, price, size)
-        VALUES (?, ?, ?, ?)
-    """, data)
-    
-    conn.commit()
-    conn.close()
+    insert_ticks_bulk([(tick['symbol'], to_epoch_ms(tick['timestamp']), tick['price'], tick['size']) 
+                       for tick in ticks])
 
-def get_ticks(symbol: Optional[str] = None, limit: int = 1000, 
-              start_time: Optional[str] = None, end_time: Optional[str] = None) -> pd.DataFrame:
-    """Retrieve ticks from database with optional filters"""
-    conn = sqlite3.connect(DB_PATH)
+def insert_ticks_bulk(rows):
+    """Insert (symbol, epoch_ms, price, size) tuples or structured-array rows; commits are grouped via flush_writes()"""
+    if isinstance(rows, np.ndarray):
+        rows = rows.tolist()
+    if not rows:
+        return
     
-    query = """
-        SELECT symbol, timestamp, price, size, created_at
+    global _pending_rows
+    with _write_connection(commit_pending=False) as conn:
+        cursor = _tick_cursor
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        # A savepoint per batch: a failed batch rolls back alone, earlier ones stay pending
+        cursor.execute("SAVEPOINT tick_batch")
+        try:
+            last_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM ticks").fetchone()[0]
+            cursor.executemany(INSERT_TICK_SQL, rows)
+            # Fold just this batch's rows (ids past last_id) into the running aggregates
+            cursor.execute(ROLLUP_SQL.format(where="id > ?"), (last_id,))
+        except Exception:
+            cursor.execute("ROLLBACK TO tick_batch")
+            cursor.execute("RELEASE tick_batch")
+            raise
+        cursor.execute("RELEASE tick_batch")
+        
+        _pending_rows += len(rows)
+        if (_pending_rows >= Config.COMMIT_ROWS or
+                time.monotonic() - _last_commit >= Config.COMMIT_INTERVAL):
+            _commit_pending(conn)
+
+TICK_COLUMNS = ('symbol', 'timestamp', 'price', 'size', 'created_at')
+
+
+def _ticks_query(symbol: Optional[str], limit: int, start_time, end_time,
+                 order: str, columns: Optional[List[str]]) -> tuple:
+    """SQL text and parameters shared by get_ticks and iter_ticks"""
+    # Only whitelisted names reach the SQL text
+    order = 'ASC' if order.upper() == 'ASC' else 'DESC'
+    columns = [c for c in (columns or ()) if c in TICK_COLUMNS] or list(TICK_COLUMNS)
+    
+    query = f"""
+        SELECT {', '.join(columns)}
         FROM ticks
         WHERE 1=1
     """
@@ -124,35 +297,57 @@ def get_ticks(symbol: Optional[str] = None, limit: int = 1000,
     
     if start_time:
         query += " AND timestamp >= ?"
-        params.append(start_time)
+        params.append(to_epoch_ms(start_time))
     
     if end_time:
         query += " AND timestamp <= ?"
-        params.append(end_time)
+        params.append(to_epoch_ms(end_time))
     
     query += " ORDER BY timestamp DESC LIMIT ?"
     params.append(limit)
-    
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
+    if order == 'ASC':
+        # Same newest rows, re-sorted by SQLite rather than pandas
+        query = f"SELECT * FROM ({query}) ORDER BY timestamp ASC"
+    return query, params
+
+def get_ticks(symbol: Optional[str] = None, limit: int = 1000, 
+              start_time=None, end_time=None,
+              dtype_backend: Optional[str] = None, order: str = 'DESC',
+              columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Retrieve the newest `limit` ticks with optional filters, returned in `order` by timestamp"""
+    query, params = _ticks_query(symbol, limit, start_time, end_time, order, columns)
+    kwargs = {'dtype_backend': dtype_backend} if dtype_backend else {}
+    with _read_connection() as conn:
+        df = pd.read_sql_query(query, conn, params=params, **kwargs)
     return df
 
+def iter_ticks(symbol: Optional[str] = None, limit: int = 1000,
+               start_time=None, end_time=None, order: str = 'DESC',
+               columns: Optional[List[str]] = None, chunksize: int = 50_000):
+    """get_ticks as a stream of DataFrames of at most `chunksize` rows, for large exports"""
+    query, params = _ticks_query(symbol, limit, start_time, end_time, order, columns)
+    # A private connection: the shared reader's lock can't be held across yields
+    uri = f"file:{quote(Path(DB_PATH).resolve().as_posix())}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        yield from pd.read_sql_query(query, conn, params=params, chunksize=chunksize)
+    finally:
+        conn.close()
+
 def get_statistics(symbol: Optional[str] = None) -> pd.DataFrame:
-    """Get comprehensive statistics from database"""
-    conn = sqlite3.connect(DB_PATH)
-    
+    """Get comprehensive statistics from the tick_stats rollup, O(symbols x hours)"""
     query = """
         SELECT 
             symbol,
-            COUNT(*) as tick_count,
-            MIN(price) as min_price,
-            MAX(price) as max_price,
-            AVG(price) as avg_price,
-            SUM(size) as total_volume,
-            MIN(timestamp) as first_tick,
-            MAX(timestamp) as last_tick,
-            (MAX(price) - MIN(price)) / MIN(price) * 100 as price_range_pct
-        FROM ticks
+            SUM(tick_count) as tick_count,
+            MIN(min_price) as min_price,
+            MAX(max_price) as max_price,
+            SUM(sum_price) / SUM(tick_count) as avg_price,
+            SUM(total_volume) as total_volume,
+            MIN(first_tick) as first_tick,
+            MAX(last_tick) as last_tick,
+            (MAX(max_price) - MIN(min_price)) / MIN(min_price) * 100 as price_range_pct
+        FROM tick_stats
     """
     
     if symbol:
@@ -163,8 +358,8 @@ def get_statistics(symbol: Optional[str] = None) -> pd.DataFrame:
     
     query += " GROUP BY symbol"
     
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
+    with _read_connection() as conn:
+        df = pd.read_sql_query(query, conn, params=params)
     return df
 
 def get_recent_price(symbol: str) -> Optional[float]:
@@ -186,8 +381,6 @@ def get_recent_price(symbol: str) -> Optional[float]:
 
 def get_price_change(symbol: str, minutes: int = 60) -> Dict:
     """Calculate price change over specified time period"""
-    conn = sqlite3.connect(DB_PATH)
-    
     # Get current price
     current_query = """
         SELECT price, timestamp FROM ticks
@@ -195,17 +388,17 @@ def get_price_change(symbol: str, minutes: int = 60) -> Dict:
         ORDER BY timestamp DESC
         LIMIT 1
     """
-    current_df = pd.read_sql_query(current_query, conn, params=[symbol])
+    with _read_connection() as conn:
+        current_df = pd.read_sql_query(current_query, conn, params=[symbol])
     
     if current_df.empty:
-        conn.close()
         return {'change': 0, 'change_pct': 0, 'current_price': 0, 'previous_price': 0}
     
     current_price = current_df.iloc[0]['price']
-    current_time = pd.to_datetime(current_df.iloc[0]['timestamp'])
+    current_ms = int(current_df.iloc[0]['timestamp'])
     
     # Get price from N minutes ago
-    past_time = (current_time - timedelta(minutes=minutes)).isoformat()
+    past_time = current_ms - minutes * 60_000
     
     past_query = """
         SELECT price FROM ticks
@@ -213,9 +406,8 @@ def get_price_change(symbol: str, minutes: int = 60) -> Dict:
         ORDER BY timestamp ASC
         LIMIT 1
     """
-    past_df = pd.read_sql_query(past_query, conn, params=[symbol, past_time])
-    
-    conn.close()
+    with _read_connection() as conn:
+        past_df = pd.read_sql_query(past_query, conn, params=[symbol, past_time])
     
     if past_df.empty:
         return {'change': 0, 'change_pct': 0, 'current_price': current_price, 'previous_price': current_price}
@@ -231,125 +423,149 @@ def get_price_change(symbol: str, minutes: int = 60) -> Dict:
         'previous_price': previous_price
     }
 
-def get_ohlc_data(symbol: str, interval_minutes: int = 5, limit: int = 100) -> pd.DataFrame:
+def get_price_changes(symbols: List[str], minutes: int = 60) -> Dict[str, Dict]:
+    """get_price_change for several symbols in two queries instead of two per symbol"""
+    empty = {'change': 0, 'change_pct': 0, 'current_price': 0, 'previous_price': 0}
+    changes = {symbol: dict(empty) for symbol in symbols}
+    if not symbols:
+        return changes
+    
+    placeholders = ','.join('?' * len(symbols))
+    with _read_connection() as conn:
+        latest = conn.execute(f"""
+            SELECT symbol, MAX(timestamp) FROM ticks
+            WHERE symbol IN ({placeholders})
+            GROUP BY symbol
+        """, list(symbols)).fetchall()
+        if not latest:
+            return changes
+        
+        # Same cutoff as get_price_change: N minutes before each symbol's latest tick
+        windows = [(symbol, ts - minutes * 60_000) for symbol, ts in latest]
+        values = ','.join('(?, ?)' for _ in windows)
+        rows = conn.execute(f"""
+            WITH w(symbol, cutoff) AS (VALUES {values})
+            SELECT w.symbol,
+                (SELECT price FROM ticks t WHERE t.symbol = w.symbol
+                 ORDER BY t.timestamp DESC LIMIT 1),
+                (SELECT price FROM ticks t WHERE t.symbol = w.symbol AND t.timestamp >= w.cutoff
+                 ORDER BY t.timestamp ASC LIMIT 1)
+            FROM w
+        """, [param for window in windows for param in window]).fetchall()
+    
+    for symbol, current_price, previous_price in rows:
+        if previous_price is None:
+            changes[symbol] = {'change': 0, 'change_pct': 0, 'current_price': current_price,
+                               'previous_price': current_price}
+            continue
+        change = current_price - previous_price
+        changes[symbol] = {
+            'change': change,
+            'change_pct': (change / previous_price * 100) if previous_price != 0 else 0,
+            'current_price': current_price,
+            'previous_price': previous_price
+        }
+    return changes
+
+def get_tick_ohlc_data(symbol: str, interval_minutes: int = 5, limit: int = 100) -> pd.DataFrame:
     """Generate OHLC (candlestick) data from tick data"""
-    conn = sqlite3.connect(DB_PATH)
-    
+    # One statement: aggregate the newest `limit` intervals, then look up each
+    # interval's open/close tick through idx_symbol_ts_price
     query = """
+        WITH bucketed AS (
+            SELECT 
+                timestamp / (? * 60000) as bucket,
+                timestamp, price, size
+            FROM ticks
+            WHERE symbol = ?
+        ),
+        candles AS (
+            SELECT 
+                bucket,
+                MIN(price) as low,
+                MAX(price) as high,
+                SUM(size) as volume,
+                MIN(timestamp) as first_tick,
+                MAX(timestamp) as last_tick
+            FROM bucketed
+            GROUP BY bucket
+            ORDER BY bucket DESC
+            LIMIT ?
+        )
         SELECT 
-            datetime(timestamp, '-' || (strftime('%M', timestamp) % ?) || ' minutes') as interval_start,
-            MIN(price) as low,
-            MAX(price) as high,
-            SUM(size) as volume
-        FROM ticks
-        WHERE symbol = ?
-        GROUP BY interval_start
-        ORDER BY interval_start DESC
-        LIMIT ?
+            datetime(c.bucket * ? * 60, 'unixepoch') as interval_start,
+            c.low, c.high, c.volume,
+            (SELECT price FROM ticks
+             WHERE symbol = ? AND timestamp = c.first_tick
+             ORDER BY id ASC LIMIT 1) as open,
+            (SELECT price FROM ticks
+             WHERE symbol = ? AND timestamp = c.last_tick
+             ORDER BY id DESC LIMIT 1) as close
+        FROM candles c
+        ORDER BY c.bucket DESC
     """
     
-    df = pd.read_sql_query(query, conn, params=[interval_minutes, symbol, limit])
-    
-    # Get open and close prices for each interval
-    if not df.empty:
-        for idx, row in df.iterrows():
-            interval_start = row['interval_start']
-            
-            # Get first price (open)
-            open_query = """
-                SELECT price FROM ticks
-                WHERE symbol = ? AND timestamp >= ?
-                ORDER BY timestamp ASC
-                LIMIT 1
-            """
-            open_result = pd.read_sql_query(open_query, conn, params=[symbol, interval_start])
-            df.at[idx, 'open'] = open_result.iloc[0]['price'] if not open_result.empty else row['low']
-            
-            # Get last price (close)
-            close_query = """
-                SELECT price FROM ticks
-                WHERE symbol = ? AND timestamp >= ?
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """
-            close_result = pd.read_sql_query(close_query, conn, params=[symbol, interval_start])
-            df.at[idx, 'close'] = close_result.iloc[0]['price'] if not close_result.empty else row['high']
-    
-    conn.close()
+    params = [interval_minutes, symbol, limit, interval_minutes, symbol, symbol]
+    with _read_connection() as conn:
+        df = pd.read_sql_query(query, conn, params=params)
     return df
 
 def get_volume_profile(symbol: str, price_bins: int = 20) -> pd.DataFrame:
     """Calculate volume profile (volume at price levels)"""
-    conn = sqlite3.connect(DB_PATH)
-    
-    # Get price range
-    range_query = """
-        SELECT MIN(price) as min_price, MAX(price) as max_price
-        FROM ticks
-        WHERE symbol = ?
-    """
-    range_df = pd.read_sql_query(range_query, conn, params=[symbol])
-    
-    if range_df.empty:
-        conn.close()
-        return pd.DataFrame()
-    
-    min_price = range_df.iloc[0]['min_price']
-    max_price = range_df.iloc[0]['max_price']
-    bin_size = (max_price - min_price) / price_bins
-    
-    # Get all ticks
-    ticks_df = pd.read_sql_query("""
-        SELECT price, size FROM ticks
-        WHERE symbol = ?
-    """, conn, params=[symbol])
-    
-    conn.close()
-    
-    # Create price bins
-    ticks_df['price_bin'] = ((ticks_df['price'] - min_price) / bin_size).astype(int)
-    ticks_df['price_bin'] = ticks_df['price_bin'].clip(0, price_bins - 1)
-    
-    # Aggregate volume by price bin
-    volume_profile = ticks_df.groupby('price_bin').agg({
-        'size': 'sum',
-        'price': 'mean'
-    }).reset_index()
-    
-    volume_profile.columns = ['bin', 'volume', 'price_level']
+    with _read_connection() as conn:
+        # Get price range
+        min_price, max_price = conn.execute("""
+            SELECT MIN(price) as min_price, MAX(price) as max_price
+            FROM ticks
+            WHERE symbol = ?
+        """, (symbol,)).fetchone()
+        
+        if min_price is None:
+            return pd.DataFrame()
+        
+        # A flat price range would divide by zero; every tick then lands in bin 0
+        bin_size = (max_price - min_price) / price_bins or 1.0
+        
+        # Bin and aggregate inside SQLite so only one row per price bin comes back
+        volume_profile = pd.read_sql_query("""
+            SELECT
+                MIN(MAX(CAST((price - ?) / ? AS INTEGER), 0), ?) as bin,
+                SUM(size) as volume,
+                AVG(price) as price_level
+            FROM ticks
+            WHERE symbol = ?
+            GROUP BY bin
+        """, conn, params=[min_price, bin_size, price_bins - 1, symbol])
     
     return volume_profile.sort_values('price_level')
 
 def clear_database():
     """Clear all ticks from database and shrink file size"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM ticks")
-    cursor.execute("DELETE FROM tick_stats")
-    cursor.execute("DELETE FROM ohlc_data")
-    conn.commit()
-    # VACUUM to actually shrink the database file size
-    cursor.execute("VACUUM")
-    conn.close()
+    with _write_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM ticks")
+        cursor.execute("DELETE FROM tick_stats")
+        cursor.execute("DELETE FROM ohlc_data")
+        conn.commit()
+        # VACUUM to actually shrink the database file size
+        cursor.execute("VACUUM")
 
 def get_database_size() -> Dict:
     """Get database size information"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Get tick count
-    cursor.execute("SELECT COUNT(*) FROM ticks")
-    tick_count = cursor.fetchone()[0]
-    
-    # Get unique symbols
-    cursor.execute("SELECT COUNT(DISTINCT symbol) FROM ticks")
-    symbol_count = cursor.fetchone()[0]
-    
-    # Get database file size
-    cursor.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
-    db_size = cursor.fetchone()[0]
-    
-    conn.close()
+    with _read_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Get tick count
+        cursor.execute("SELECT COUNT(*) FROM ticks")
+        tick_count = cursor.fetchone()[0]
+        
+        # Get unique symbols
+        cursor.execute("SELECT COUNT(DISTINCT symbol) FROM ticks")
+        symbol_count = cursor.fetchone()[0]
+        
+        # Get database file size
+        cursor.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
+        db_size = cursor.fetchone()[0]
     
     return {
         'tick_count': tick_count,
@@ -361,16 +577,15 @@ def get_database_size() -> Dict:
 def save_ohlc_data(df: pd.DataFrame) -> bool:
     """Save OHLC data to database"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        for _, row in df.iterrows():
-            conn.execute(
+        source = df['source'] if 'source' in df.columns else 'upload'
+        rows = df[['symbol', 'timestamp', 'open', 'high', 'low', 'close', 'volume']].assign(source=source)
+        with _write_connection() as conn, conn:
+            conn.executemany(
                 '''INSERT INTO ohlc_data (symbol, timestamp, open, high, low, close, volume, source) 
                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                (row['symbol'], row['timestamp'], row['open'], row['high'], 
-                 row['low'], row['close'], row['volume'], row.get('source', 'upload'))
+                rows.itertuples(index=False, name=None)
             )
-        conn.commit()
-        conn.close()
+            _analyze(conn, 'ohlc_data')
         return True
     except Exception as e:
         print(f"Error saving OHLC data: {e}")
@@ -378,8 +593,6 @@ def save_ohlc_data(df: pd.DataFrame) -> bool:
 
 def get_ohlc_data(symbol: Optional[str] = None, limit: int = 10000) -> pd.DataFrame:
     """Get OHLC data from database"""
-    conn = sqlite3.connect(DB_PATH)
-    
     if symbol:
         query = "SELECT * FROM ohlc_data WHERE symbol = ? ORDER BY timestamp DESC LIMIT ?"
         params = [symbol, limit]
@@ -387,29 +600,39 @@ def get_ohlc_data(symbol: Optional[str] = None, limit: int = 10000) -> pd.DataFr
         query = "SELECT * FROM ohlc_data ORDER BY timestamp DESC LIMIT ?"
         params = [limit]
     
-    df = pd.read_sql_query(query, conn, params=params)
-    conn.close()
+    with _read_connection() as conn:
+        df = pd.read_sql_query(query, conn, params=params)
+    
+    # Uploads can leave REAL or TEXT epochs behind; hand back int64 ms whenever they all parse
+    timestamps = pd.to_numeric(df['timestamp'], errors='coerce')
+    if timestamps.notna().all():
+        df['timestamp'] = timestamps.astype('int64')
     return df
 
 def cleanup_old_data(days: int = 7):
     """Remove data older than specified days"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-    
-    cursor.execute("""
-        DELETE FROM ticks
-        WHERE timestamp < ?
-    """, (cutoff_date,))
-    
-    cursor.execute("""
-        DELETE FROM ohlc_data
-        WHERE timestamp < ?
-    """, (int((datetime.now() - timedelta(days=days)).timestamp() * 1000),))
-    
-    deleted_count = cursor.rowcount
-    conn.commit()
-    conn.close()
+    cutoff_ms = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
+    
+    with _write_connection() as conn, conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            DELETE FROM ticks
+            WHERE timestamp < ?
+        """, (cutoff_ms,))
+        
+        # Drop the rollup buckets the delete reached and rebuild the partial one
+        cutoff_bucket = cutoff_ms // STATS_BUCKET_MS
+        cursor.execute("DELETE FROM tick_stats WHERE bucket <= ?", (cutoff_bucket,))
+        cursor.execute(ROLLUP_SQL.format(where="timestamp >= ? AND timestamp < ?"),
+                       (cutoff_ms, (cutoff_bucket + 1) * STATS_BUCKET_MS))
+        
+        cursor.execute("""
+            DELETE FROM ohlc_data
+            WHERE timestamp < ?
+        """, (cutoff_ms,))
+        
+        deleted_count = cursor.rowcount
+        _analyze(conn)
     
     return deleted_count
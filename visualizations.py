@@ -3,12 +3,20 @@ Visualization Module
 Chart creation functions optimized for dark theme with light colors
 """
 
+import copy
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 
+from analytics import Analytics
+
 COLORS = {
     'primary': '#1d9bf0',      # Twitter blue
     'secondary': '#00ba7c',    # Green  
@@ -24,10 +32,25 @@ COLORS = {
     'paper': '#192734',        # Slightly lighter bg
 }
 
+# Every figure is built on plotly_dark. As the default template Plotly applies it
+# without re-validating it, which template='plotly_dark' per figure did (~20ms each).
+# App colours stay explicit layout values below: Streamlit's theme overrides the
+# template's layout, not the figure's own.
+pio.templates.default = 'plotly_dark'
+
+# st.plotly_chart serializes every figure with pio.to_json. Its orjson engine writes
+# the datetime arrays and base64 buffers 1.3-3x faster than the stdlib json module.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    pio.json.config.default_engine = 'orjson'
+
 # Professional chart template
 CHART_TEMPLATE = {
     'layout': {
-        'template': 'plotly_dark',
         'paper_bgcolor': COLORS['background'],
         'plot_bgcolor': COLORS['paper'],
         'font': {'color': COLORS['text'], 'family': 'Inter, -apple-system, sans-serif'},
@@ -37,6 +60,190 @@ CHART_TEMPLATE = {
     }
 }
 
+def _as_f32(values) -> np.ndarray:
+    """Contiguous float32 copy of a series, which Plotly ships as compact base64"""
+    return np.ascontiguousarray(np.asarray(values), dtype=np.float32)
+
+
+# Correlation matrices keyed on the input contents, least recently used evicted first
+_CORR_CACHE = OrderedDict()
+_CORR_CACHE_SIZE = 8
+_CORR_CACHE_LOCK = threading.Lock()  # shared by every Streamlit session thread
+
+# Candles per trace sent to the browser; beyond this Plotly's SVG rendering dominates
+MAX_CHART_POINTS = 2500
+# WebGL line segments stay cheap to draw far past the SVG candlestick limit
+MAX_WEBGL_CHART_POINTS = 25_000
+
+# One symbol's candles as contiguous column arrays in datetime order. Chart code
+# slices and reads them directly, without per-access Series wrapping or index checks.
+Bars = namedtuple('Bars', 'datetime open high low close volume')
+
+
+def bars_from_frame(sdf: pd.DataFrame) -> Bars:
+    """
+    Column arrays for one symbol's OHLCV candles
+    
+    Prices stay float64 so hover values keep full precision; volume is
+    float32, the compact form its bar trace is sent in.
+    
+    Args:
+        sdf: Single-symbol OHLC DataFrame
+    
+    Returns:
+        Bars sorted by datetime
+    """
+    sdf = _sorted_by_time(sdf)
+    return Bars(
+        datetime=np.ascontiguousarray(sdf['datetime'].to_numpy(dtype='datetime64[ns]')),
+        open=np.ascontiguousarray(sdf['open'].to_numpy(dtype=np.float64)),
+        high=np.ascontiguousarray(sdf['high'].to_numpy(dtype=np.float64)),
+        low=np.ascontiguousarray(sdf['low'].to_numpy(dtype=np.float64)),
+        close=np.ascontiguousarray(sdf['close'].to_numpy(dtype=np.float64)),
+        volume=_as_f32(sdf['volume']),
+    )
+
+
+def window_bars(bars: Bars, window_seconds: int = None, offset_seconds: int = 0) -> Bars:
+    """
+    Bars in the window ending offset_seconds before the latest candle
+    
+    Args:
+        bars: Candles from bars_from_frame
+        window_seconds: Window length; None or 0 keeps every candle
+        offset_seconds: Scroll offset - how many seconds back from latest
+    
+    Returns:
+        Bars whose arrays are views into the input's
+    """
+    if not window_seconds or not len(bars.datetime):
+        return bars
+    end = bars.datetime[-1] - np.timedelta64(offset_seconds, 's')
+    start = end - np.timedelta64(window_seconds, 's')
+    # Arrays are time-sorted, so the window is one positional slice found by binary search
+    lo = bars.datetime.searchsorted(start)
+    hi = bars.datetime.searchsorted(end, side='right')
+    return Bars(*(column[lo:hi] for column in bars))
+
+
+def downsample_ohlc(sdf: pd.DataFrame, max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """
+    Merge consecutive candles into at most max_points wider candles
+    
+    Each bucket keeps OHLC semantics: first open, max high, min low,
+    last close and summed volume, stamped at the bucket's first datetime.
+    
+    Args:
+        sdf: Single-symbol OHLC DataFrame sorted by datetime
+        max_points: Maximum number of candles to return
+    
+    Returns:
+        Downsampled DataFrame (the input itself when already small enough)
+    """
+    if len(sdf) <= max_points:
+        return sdf
+    return pd.DataFrame(_downsample_bars(bars_from_frame(sdf), max_points)._asdict())
+
+
+def _downsample_bars(bars: Bars, max_points: int) -> Bars:
+    """downsample_ohlc on column arrays; bars itself when already small enough"""
+    n = len(bars.datetime)
+    if n <= max_points:
+        return bars
+    
+    starts = np.arange(0, n, -(-n // max_points))
+    ends = np.append(starts[1:], n) - 1
+    
+    return Bars(
+        datetime=bars.datetime[starts],
+        open=bars.open[starts],
+        high=np.maximum.reduceat(bars.high, starts),
+        low=np.minimum.reduceat(bars.low, starts),
+        close=bars.close[ends],
+        # Summed in float64, so large buckets don't lose float32 precision
+        volume=np.add.reduceat(bars.volume, starts, dtype=np.float64).astype(np.float32),
+    )
+
+
+# make_subplots layouts by grid shape; building one validates every axis, so it is done once
+_SUBPLOT_GRIDS = {}
+
+
+def _subplot_grid(row_heights: tuple, vertical_spacing: float, subplot_titles: tuple = None,
+                  secondary_y: bool = False) -> tuple:
+    """
+    Layout dict and axis names for a stacked, shared-x make_subplots grid
+    
+    Args:
+        row_heights: Relative height of each row
+        vertical_spacing: Space between rows
+        subplot_titles: Optional title per row
+        secondary_y: Whether every row gets a secondary y-axis
+    
+    Returns:
+        (layout dict to fill in, {(row, secondary): (xaxis name, yaxis name)})
+    """
+    key = (row_heights, vertical_spacing, subplot_titles, secondary_y)
+    if key not in _SUBPLOT_GRIDS:
+        rows = len(row_heights)
+        fig = make_subplots(
+            rows=rows, cols=1,
+            shared_xaxes=True,
+            vertical_spacing=vertical_spacing,
+            subplot_titles=subplot_titles,
+            row_heights=list(row_heights),
+            specs=[[{"secondary_y": secondary_y}]] * rows,
+        )
+        axes = {}
+        for row in range(1, rows + 1):
+            for secondary in ((False, True) if secondary_y else (False,)):
+                subplot = fig.get_subplot(row, 1, secondary_y=secondary)
+                axes[row, secondary] = (subplot.xaxis.plotly_name, subplot.yaxis.plotly_name)
+        layout = fig.layout.to_plotly_json()
+        layout.pop('template', None)  # left to the default, which skips validation
+        _SUBPLOT_GRIDS[key] = (layout, axes)
+    
+    layout, axes = _SUBPLOT_GRIDS[key]
+    return copy.deepcopy(layout), axes
+
+
+def _trace_axes(axis_names: tuple) -> dict:
+    """Trace xaxis/yaxis references ('x2', 'y3') for layout axis names ('xaxis2', 'yaxis3')"""
+    xaxis, yaxis = axis_names
+    return {'xaxis': xaxis.replace('axis', ''), 'yaxis': yaxis.replace('axis', '')}
+
+
+def _hline(y: float, color: str, dash: str, width: int = None, text: str = None,
+           xaxis: str = 'x', yaxis: str = 'y') -> tuple:
+    """Shape and optional label dicts for a full-width horizontal line, the same ones add_hline builds"""
+    line = {'color': color, 'dash': dash}
+    if width is not None:
+        line['width'] = width
+    shape = {'type': 'line', 'xref': f'{xaxis} domain', 'x0': 0, 'x1': 1,
+             'yref': yaxis, 'y0': y, 'y1': y, 'line': line}
+    label = None
+    if text is not None:
+        label = {'text': text, 'font': {'color': COLORS['text']}, 'showarrow': False,
+                 'xref': f'{xaxis} domain', 'x': 1, 'xanchor': 'right',
+                 'yref': yaxis, 'y': y, 'yanchor': 'bottom'}
+    return shape, label
+
+
+def _style_axes(layout: dict, prefix: str, **props):
+    """Set props on every 'xaxis*' or 'yaxis*' entry of a layout dict, like update_xaxes/update_yaxes"""
+    for name, axis in layout.items():
+        if name.startswith(prefix):
+            axis.update(props)
+
+
+def _apply_chart_template(layout: dict):
+    """Merge CHART_TEMPLATE into a layout dict, keeping the grid's axis domains and anchors"""
+    for name, value in CHART_TEMPLATE['layout'].items():
+        if isinstance(value, dict):
+            layout.setdefault(name, {}).update(value)
+        else:
+            layout[name] = value
+
 
 def create_ohlc_chart(df: pd.DataFrame, symbols: list) -> go.Figure:
     """
@@ -52,98 +259,78 @@ def create_ohlc_chart(df: pd.DataFrame, symbols: list) -> go.Figure:
     symbols = list(symbols)
     use_secondary = len(symbols) > 1
     
+    # At most one stable sort and one pass over df split it into per-symbol frames
+    by_symbol = dict(tuple(_sorted_by_time(df).groupby('symbol', sort=False, observed=True)))
+    empty = df.iloc[:0]
+    
     # Both price and volume subplots support secondary y-axis when 2+ symbols
-    fig = make_subplots(
-        rows=2, cols=1,
-        shared_xaxes=True,
+    layout, axes = _subplot_grid(
+        row_heights=(0.7, 0.3),
         vertical_spacing=0.03,
         subplot_titles=('Price', 'Volume'),
-        row_heights=[0.7, 0.3],
-        specs=[[{"secondary_y": use_secondary}], [{"secondary_y": use_secondary}]],
+        secondary_y=use_secondary,
     )
     
     # Color palette for multiple symbols
     colors = [COLORS['primary'], COLORS['secondary'], COLORS['accent'], 
               COLORS['purple'], COLORS['orange']]
     
+    data = []
     for idx, symbol in enumerate(symbols):
-        sdf = df[df['symbol'] == symbol].sort_values('datetime')
+        sdf = downsample_ohlc(by_symbol.get(symbol, empty))
         secondary_axis = use_secondary and idx == 1
         
         # Candlestick chart
-        fig.add_trace(
-            go.Candlestick(
-                x=sdf['datetime'],
-                open=sdf['open'],
-                high=sdf['high'],
-                low=sdf['low'],
-                close=sdf['close'],
-                name=symbol.upper(),
-                increasing_line_color=COLORS['secondary'],
-                decreasing_line_color=COLORS['danger'],
-            ),
-            row=1, col=1,
-            secondary_y=secondary_axis,
-        )
+        data.append({
+            'type': 'candlestick',
+            'x': sdf['datetime'],
+            'open': sdf['open'],
+            'high': sdf['high'],
+            'low': sdf['low'],
+            'close': sdf['close'],
+            'name': symbol.upper(),
+            'increasing': {'line': {'color': COLORS['secondary']}},
+            'decreasing': {'line': {'color': COLORS['danger']}},
+            **_trace_axes(axes[1, secondary_axis]),
+        })
         
         # Volume bars - each symbol on its own axis
-        fig.add_trace(
-            go.Bar(
-                x=sdf['datetime'],
-                y=sdf['volume'],
-                name=f'{symbol.upper()} Vol',
-                marker_color=colors[idx % len(colors)],
-                opacity=0.7,
-            ),
-            row=2, col=1,
-            secondary_y=secondary_axis,
-        )
+        data.append({
+            'type': 'bar',
+            'x': sdf['datetime'],
+            'y': _as_f32(sdf['volume']),
+            'name': f'{symbol.upper()} Vol',
+            'marker': {'color': colors[idx % len(colors)]},
+            'opacity': 0.7,
+            **_trace_axes(axes[2, secondary_axis]),
+        })
     
     # Update axes labels
-    fig.update_xaxes(title_text="Time", row=2, col=1, gridcolor=COLORS['grid'])
+    layout[axes[2, False][0]]['title'] = {'text': "Time"}
     
-    # Price axes
-    if symbols:
-        fig.update_yaxes(title_text=f"{symbols[0].upper()} Price", row=1, col=1, 
-                        secondary_y=False, gridcolor=COLORS['grid'])
-    if use_secondary:
-        fig.update_yaxes(title_text=f"{symbols[1].upper()} Price", row=1, col=1, 
-                        secondary_y=True, gridcolor=COLORS['grid'])
-    
-    # Volume axes - separate for each symbol
-    if symbols:
-        fig.update_yaxes(title_text=f"{symbols[0].upper()} Vol", row=2, col=1, 
-                        secondary_y=False, gridcolor=COLORS['grid'])
-    if use_secondary:
-        fig.update_yaxes(title_text=f"{symbols[1].upper()} Vol", row=2, col=1, 
-                        secondary_y=True, gridcolor=COLORS['grid'])
-    
-    # Calculate the actual data range for x-axis
-    all_datetimes = []
-    for symbol in symbols:
-        sdf = df[df['symbol'] == symbol]
-        if not sdf.empty:
-            all_datetimes.extend(sdf['datetime'].tolist())
+    # Price and volume axes - separate for each symbol
+    for secondary, symbol in zip((False, True), symbols[:2] if use_secondary else symbols[:1]):
+        layout[axes[1, secondary][1]]['title'] = {'text': f"{symbol.upper()} Price"}
+        layout[axes[2, secondary][1]]['title'] = {'text': f"{symbol.upper()} Vol"}
+    
+    # Calculate the actual data range for x-axis from the sorted groups' endpoints
+    plotted = [by_symbol[symbol]['datetime'] for symbol in symbols if symbol in by_symbol]
     
     # Set x-axis range to fit data exactly
     x_range = None
-    if all_datetimes:
-        x_min = min(all_datetimes)
-        x_max = max(all_datetimes)
+    if plotted:
+        x_min = min(dt.iloc[0] for dt in plotted)
+        x_max = max(dt.iloc[-1] for dt in plotted)
         # Add small padding (5% on each side)
         if hasattr(x_max, 'timestamp'):
-            time_span = (x_max - x_min).total_seconds()
-            padding = pd.Timedelta(seconds=time_span * 0.05) if time_span > 0 else pd.Timedelta(seconds=60)
-            x_range = [x_min - padding, x_max + padding]
+            x_range = _padded_time_range(x_min, x_max)
     
     # Update layout - Professional dark theme
-    fig.update_layout(
+    layout.update(
         height=700,
-        template='plotly_dark',
         paper_bgcolor=COLORS['background'],
         plot_bgcolor=COLORS['paper'],
         font=dict(color=COLORS['text'], family='Inter, sans-serif'),
-        xaxis_rangeslider_visible=False,
         legend=dict(
             orientation="h",
             yanchor="bottom",
@@ -157,159 +344,258 @@ def create_ohlc_chart(df: pd.DataFrame, symbols: list) -> go.Figure:
         ),
         bargap=0.1,
     )
+    layout['xaxis']['rangeslider'] = {'visible': False}
     
     # Set x-axis range explicitly to focus on data
     if x_range:
-        fig.update_xaxes(range=x_range, gridcolor=COLORS['grid'])
-        fig.update_xaxes(range=x_range, row=2, col=1, gridcolor=COLORS['grid'])
+        _style_axes(layout, 'xaxis', range=x_range, gridcolor=COLORS['grid'])
     else:
-        fig.update_xaxes(autorange=True, gridcolor=COLORS['grid'])
+        _style_axes(layout, 'xaxis', autorange=True, gridcolor=COLORS['grid'])
     
-    fig.update_yaxes(gridcolor=COLORS['grid'], autorange=True)
+    _style_axes(layout, 'yaxis', gridcolor=COLORS['grid'], autorange=True)
     
-    return fig
+    return go.Figure({'data': data, 'layout': layout})
 
 
-def create_single_ohlc_chart(df: pd.DataFrame, symbol: str, show_volume: bool = True, 
-                              time_window_seconds: int = None, time_offset_seconds: int = 0) -> go.Figure:
+def create_single_ohlc_chart(df, symbol: str, show_volume: bool = True, 
+                              time_window_seconds: int = None, time_offset_seconds: int = 0,
+                              use_webgl: bool = False) -> go.Figure:
     """
     Create OHLC candlestick chart for a single symbol
     
     Args:
-        df: DataFrame with OHLC data
+        df: DataFrame with OHLC data, or that symbol's Bars
         symbol: Symbol to plot
-        show_volume: Whether to show volume subplot
+        show_volume: Whether to show volume subplot; a window with fewer
+            than two candles is drawn price-only
         time_window_seconds: Optional, show N seconds window of data
         time_offset_seconds: Scroll offset - how many seconds back from latest
+        use_webgl: Draw candles as WebGL wick/body segments instead of an SVG
+            Candlestick, for long histories
     
     Returns:
         Plotly figure
     """
-    sdf = df[df['symbol'] == symbol].sort_values('datetime')
-    
-    # Apply time window and offset for scrolling
-    if time_window_seconds and not sdf.empty:
-        latest_time = sdf['datetime'].max()
-        # Apply offset (scroll back in time)
-        end_time = latest_time - pd.Timedelta(seconds=time_offset_seconds)
-        start_time = end_time - pd.Timedelta(seconds=time_window_seconds)
-        sdf = sdf[(sdf['datetime'] >= start_time) & (sdf['datetime'] <= end_time)]
+    bars = _single_ohlc_bars(df, symbol, time_window_seconds, time_offset_seconds)
     
-    if sdf.empty:
+    if not len(bars.datetime):
         fig = go.Figure()
         fig.update_layout(
             title=f"{symbol.upper()} - No Data",
-            template='plotly_dark',
             paper_bgcolor=COLORS['background'],
             plot_bgcolor=COLORS['paper'],
         )
         return fig
     
+    # A lone volume bar says nothing, so a near-empty window skips the volume panel
+    show_volume = show_volume and len(bars.datetime) >= 2
+    bars = _downsample_bars(bars, MAX_WEBGL_CHART_POINTS if use_webgl else MAX_CHART_POINTS)
+    x_range, y_range = _single_ohlc_ranges(bars)
+    
+    # Price over volume reuses the cached grid; the price-only chart has one default axis pair
     if show_volume:
-        fig = make_subplots(
-            rows=2, cols=1,
-            shared_xaxes=True,
-            vertical_spacing=0.03,
-            row_heights=[0.75, 0.25],
-        )
+        layout, axes = _subplot_grid(row_heights=(0.75, 0.25), vertical_spacing=0.03)
+        price_axes = _trace_axes(axes[1, False])
+        volume_axes = _trace_axes(axes[2, False])
     else:
-        fig = go.Figure()
+        layout = {'xaxis': {}, 'yaxis': {}}
+        price_axes = {}
     
     # Candlestick chart
-    fig.add_trace(
-        go.Candlestick(
-            x=sdf['datetime'],
-            open=sdf['open'],
-            high=sdf['high'],
-            low=sdf['low'],
-            close=sdf['close'],
-            name=symbol.upper(),
-            increasing_line_color=COLORS['secondary'],
-            decreasing_line_color=COLORS['danger'],
-            increasing_fillcolor=COLORS['secondary'],
-            decreasing_fillcolor=COLORS['danger'],
-        ),
-        row=1 if show_volume else None,
-        col=1 if show_volume else None,
-    )
+    if use_webgl:
+        data = [{
+            'type': 'scattergl',
+            'mode': 'lines',
+            'name': symbol.upper(),
+            'line': {'color': color, 'width': width},
+            'x': x,
+            'y': y,
+            **price_axes,
+        } for color, width, x, y in _webgl_candle_segments(bars)]
+    else:
+        data = [{
+            'type': 'candlestick',
+            'x': bars.datetime,
+            'open': bars.open,
+            'high': bars.high,
+            'low': bars.low,
+            'close': bars.close,
+            'name': symbol.upper(),
+            'increasing': {'line': {'color': COLORS['secondary']}, 'fillcolor': COLORS['secondary']},
+            'decreasing': {'line': {'color': COLORS['danger']}, 'fillcolor': COLORS['danger']},
+            **price_axes,
+        }]
     
     # Volume bars
     if show_volume:
-        colors = [COLORS['secondary'] if sdf['close'].iloc[i] >= sdf['open'].iloc[i] 
-                  else COLORS['danger'] for i in range(len(sdf))]
-        
-        fig.add_trace(
-            go.Bar(
-                x=sdf['datetime'],
-                y=sdf['volume'],
-                name='Volume',
-                marker_color=colors,
-                opacity=0.7,
-            ),
-            row=2, col=1,
-        )
-    
-    # Calculate x-axis range
-    x_range = None
-    if not sdf.empty:
-        x_min = sdf['datetime'].min()
-        x_max = sdf['datetime'].max()
-        time_span = (x_max - x_min).total_seconds()
-        padding = pd.Timedelta(seconds=time_span * 0.05) if time_span > 0 else pd.Timedelta(seconds=60)
-        x_range = [x_min - padding, x_max + padding]
-    
-    # Calculate Y-axis range with TIGHT padding for visible candle bodies
-    # Goal: Candles should take up ~80% of vertical height
-    y_range = None
-    if not sdf.empty:
-        price_min = sdf['low'].min()
-        price_max = sdf['high'].max()
-        price_range = price_max - price_min
-        
-        # If no price movement, create artificial range around current price
-        if price_range == 0 or price_range < 0.01:
-            center = (price_min + price_max) / 2
-            # Create ~0.01% range for flat prices
-            price_range = center * 0.0001
-            price_min = center - price_range / 2
-            price_max = center + price_range / 2
+        colors = np.where(bars.close >= bars.open, COLORS['secondary'], COLORS['danger'])
         
-        # Tight padding: 10% of price range on each side
-        # This makes candles occupy ~80% of vertical height
-        y_padding = price_range * 0.1
-        y_range = [price_min - y_padding, price_max + y_padding]
+        data.append({
+            'type': 'bar',
+            'x': bars.datetime,
+            'y': bars.volume,
+            'name': 'Volume',
+            'marker': {'color': colors},
+            'opacity': 0.7,
+            **volume_axes,
+        })
     
     # Layout
-    fig.update_layout(
+    layout.update(
         title=dict(text=f"{symbol.upper()} Price (USD)", font=dict(color='#FFFFFF')),
         height=450,
-        template='plotly_dark',
         paper_bgcolor=COLORS['background'],
         plot_bgcolor=COLORS['paper'],
         font=dict(color=COLORS['text'], family='Inter, sans-serif'),
-        xaxis_rangeslider_visible=False,
         showlegend=False,
         margin=dict(l=50, r=50, t=50, b=50),  # Increase bottom margin for footer
     )
+    layout['xaxis']['rangeslider'] = {'visible': False}
     
     # Update axes with calculated ranges - FORCE the Y range
     if x_range:
-        fig.update_xaxes(range=x_range, gridcolor=COLORS['grid'])
+        _style_axes(layout, 'xaxis', range=x_range, gridcolor=COLORS['grid'])
+    if use_webgl:
+        _style_axes(layout, 'xaxis', type='date')
     
     # Explicitly set tight Y-axis range ONLY for the Price subplot (row 1)
     if y_range:
-        fig.update_yaxes(range=y_range, row=1, col=1, gridcolor=COLORS['grid'], autorange=False, fixedrange=False)
+        layout['yaxis'].update(range=y_range, gridcolor=COLORS['grid'], autorange=False, fixedrange=False)
     else:
-        fig.update_yaxes(gridcolor=COLORS['grid'], autorange=True, row=1, col=1)
+        layout['yaxis'].update(gridcolor=COLORS['grid'], autorange=True)
     
     # Ensure Volume subplot (row 2) is auto-scaled with title
     if show_volume:
-        fig.update_yaxes(title_text="Volume", gridcolor=COLORS['grid'], autorange=True, row=2, col=1)
+        layout['yaxis2'].update(title={'text': "Volume"}, gridcolor=COLORS['grid'], autorange=True)
         # Add a footer-like annotation for Volume if needed, or rely on axis title
         # Axis title "Volume" on the secondary plot is standard.
     
+    return go.Figure({'data': data, 'layout': layout})
+
+
+def update_ohlc_inplace(fig: go.Figure, df, symbol: str, show_volume: bool = True,
+                        time_window_seconds: int = None, time_offset_seconds: int = 0) -> go.Figure:
+    """
+    Refresh a create_single_ohlc_chart figure with new candles, keeping its layout
+    
+    Only trace arrays and axis ranges are reassigned, so a live chart skips
+    rebuilding subplots and the template on every refresh. Falls back to a
+    new figure when fig has no candles yet or a different volume layout.
+    Candlestick and use_webgl figures are both handled, by their first trace.
+    
+    Args:
+        fig: Figure previously returned by create_single_ohlc_chart
+        df: DataFrame with OHLC data, or that symbol's Bars
+        symbol: Symbol to plot
+        show_volume: Whether fig shows the volume subplot
+        time_window_seconds: Optional, show N seconds window of data
+        time_offset_seconds: Scroll offset - how many seconds back from latest
+    
+    Returns:
+        Plotly figure (fig itself when updated in place)
+    """
+    bars = _single_ohlc_bars(df, symbol, time_window_seconds, time_offset_seconds)
+    use_webgl = bool(fig.data) and fig.data[0].type == 'scattergl'
+    price_traces = 4 if use_webgl else 1
+    # Same volume-panel rule as create_single_ohlc_chart, so a collapsed chart is rebuilt
+    show_volume = show_volume and len(bars.datetime) >= 2
+    if not len(bars.datetime) or len(fig.data) != price_traces + (1 if show_volume else 0):
+        return create_single_ohlc_chart(bars, symbol, show_volume, use_webgl=use_webgl)
+    
+    bars = _downsample_bars(bars, MAX_WEBGL_CHART_POINTS if use_webgl else MAX_CHART_POINTS)
+    x_range, y_range = _single_ohlc_ranges(bars)
+    
+    with fig.batch_update():
+        if use_webgl:
+            for trace, (_, _, x, y) in zip(fig.data, _webgl_candle_segments(bars)):
+                trace.update(x=x, y=y)
+        else:
+            fig.data[0].update(x=bars.datetime, open=bars.open, high=bars.high,
+                               low=bars.low, close=bars.close)
+        if show_volume:
+            fig.data[price_traces].update(x=bars.datetime, y=bars.volume,
+                               marker_color=np.where(bars.close >= bars.open, COLORS['secondary'], COLORS['danger']))
+        fig.update_xaxes(range=x_range)
+        fig.layout.yaxis.range = y_range  # the price axis, with or without volume
+    
     return fig
 
+
+def _webgl_candle_segments(bars: Bars) -> list:
+    """
+    Candles as NaN-separated line segments for Scattergl
+    
+    Rising and falling candles each get a thin high-low wick trace and a
+    thick open-close body trace; every candle contributes one
+    (start, end, NaN) triple, so one trace draws all its segments. x is
+    epoch milliseconds as float64, which ships as base64 rather than one
+    ISO string per point; the axis is pinned to type='date' to read it.
+    
+    Returns:
+        [(color, line width, x, y)] for rising wicks, rising bodies,
+        falling wicks and falling bodies
+    """
+    times = bars.datetime.astype('datetime64[ms]').astype(np.int64).astype(np.float64)
+    rising = bars.close >= bars.open
+    
+    segments = []
+    for mask, color in ((rising, COLORS['secondary']), (~rising, COLORS['danger'])):
+        x = np.repeat(times[mask], 3)
+        for start, end, width in ((bars.low, bars.high, 1), (bars.open, bars.close, 5)):
+            y = np.full(len(x), np.nan)
+            y[0::3] = start[mask]
+            y[1::3] = end[mask]
+            segments.append((color, width, x, y))
+    return segments
+
+
+def _single_ohlc_bars(df, symbol: str, time_window_seconds: int = None,
+                      time_offset_seconds: int = 0) -> Bars:
+    """One symbol's candles as Bars, cut to the scrolled time window; Bars input skips the split"""
+    bars = df if isinstance(df, Bars) else bars_from_frame(df[df['symbol'] == symbol])
+    return window_bars(bars, time_window_seconds, time_offset_seconds)
+
+
+def _sorted_by_time(df: pd.DataFrame) -> pd.DataFrame:
+    """df in datetime order; candles from the resampler already are, so they skip the sort"""
+    if df['datetime'].is_monotonic_increasing:
+        return df
+    return df.sort_values('datetime', kind='mergesort')
+
+
+def _padded_time_range(x_min: pd.Timestamp, x_max: pd.Timestamp) -> list:
+    """[x_min, x_max] widened by 5% of the span on each side, or by 60s when the span is zero"""
+    span_ns = x_max.value - x_min.value
+    padding = np.timedelta64(span_ns // 20 if span_ns > 0 else 60_000_000_000, 'ns')
+    return [x_min - padding, x_max + padding]
+
+
+def _single_ohlc_ranges(bars: Bars) -> tuple:
+    """Padded x-axis and tight y-axis ranges for non-empty single-symbol Bars"""
+    # Calculate x-axis range; bars are in time order, so their ends are the extremes
+    x_range = _padded_time_range(pd.Timestamp(bars.datetime[0]), pd.Timestamp(bars.datetime[-1]))
+    
+    # Calculate Y-axis range with TIGHT padding for visible candle bodies
+    # Goal: Candles should take up ~80% of vertical height
+    price_min = bars.low.min()
+    price_max = bars.high.max()
+    price_range = price_max - price_min
+    
+    # If no price movement, create artificial range around current price
+    if price_range == 0 or price_range < 0.01:
+        center = (price_min + price_max) / 2
+        # Create ~0.01% range for flat prices
+        price_range = center * 0.0001
+        price_min = center - price_range / 2
+        price_max = center + price_range / 2
+    
+    # Tight padding: 10% of price range on each side
+    # This makes candles occupy ~80% of vertical height
+    y_padding = price_range * 0.1
+    y_range = [price_min - y_padding, price_max + y_padding]
+    
+    return x_range, y_range
+
 def create_spread_chart(spread: pd.Series, zscore: pd.Series, 
                        s1: str, s2: str) -> go.Figure:
     """
@@ -334,9 +620,9 @@ def create_spread_chart(spread: pd.Series, zscore: pd.Series,
     
     # Spread line
     fig.add_trace(
-        go.Scatter(
+        go.Scattergl(
             x=spread.index,
-            y=spread.values,
+            y=_as_f32(spread),
             name='Spread',
             line=dict(color=COLORS['primary'], width=2),
             fill='tozeroy',
@@ -347,36 +633,37 @@ def create_spread_chart(spread: pd.Series, zscore: pd.Series,
     
     # Z-score line
     fig.add_trace(
-        go.Scatter(
+        go.Scattergl(
             x=zscore.index,
-            y=zscore.values,
+            y=_as_f32(zscore),
             name='Z-Score',
             line=dict(color=COLORS['purple'], width=2)
         ),
         row=2, col=1
     )
     
-    # Threshold lines
-    fig.add_hline(y=2, line_dash="dash", line_color=COLORS['danger'], 
-                 line_width=2, row=2, col=1, annotation_text="Entry +2σ",
-                 annotation_font_color=COLORS['text'])
-    fig.add_hline(y=-2, line_dash="dash", line_color=COLORS['danger'], 
-                 line_width=2, row=2, col=1, annotation_text="Entry -2σ",
-                 annotation_font_color=COLORS['text'])
-    fig.add_hline(y=0, line_dash="dot", line_color=COLORS['text'], 
-                 line_width=1, row=2, col=1)
+    # Threshold lines on the z-score subplot
+    zscore_axes = fig.get_subplot(2, 1)
+    zscore_axes = _trace_axes((zscore_axes.xaxis.plotly_name, zscore_axes.yaxis.plotly_name))
+    lines = [
+        _hline(2, COLORS['danger'], 'dash', width=2, text="Entry +2σ", **zscore_axes),
+        _hline(-2, COLORS['danger'], 'dash', width=2, text="Entry -2σ", **zscore_axes),
+        _hline(0, COLORS['text'], 'dot', width=1, **zscore_axes),
+    ]
     
     # Update axes
     fig.update_xaxes(title_text="Time", row=2, col=1, gridcolor=COLORS['grid'])
     fig.update_yaxes(title_text="Spread", row=1, col=1, gridcolor=COLORS['grid'], autorange=True)
     fig.update_yaxes(title_text="Z-Score", row=2, col=1, gridcolor=COLORS['grid'])
     
-    # Update layout
+    # Update layout, adding every threshold line in the same assignment
     fig.update_layout(
         height=600,
         **CHART_TEMPLATE['layout'],
         showlegend=True,
-        legend=dict(font=dict(color=COLORS['text']))
+        legend=dict(font=dict(color=COLORS['text'])),
+        shapes=[shape for shape, _ in lines],
+        annotations=list(fig.layout.annotations) + [label for _, label in lines if label],
     )
     
     return fig
@@ -393,9 +680,31 @@ def create_correlation_heatmap(df: pd.DataFrame, symbols: list) -> go.Figure:
     Returns:
         Plotly figure
     """
-    pivot = df.pivot_table(values='close', index='datetime', columns='symbol')
-    corr = pivot[symbols].corr()
+    hashed = pd.util.hash_pandas_object(df[['symbol', 'datetime', 'close']], index=False).to_numpy()
+    key = (tuple(symbols), hashlib.blake2b(hashed.tobytes(), digest_size=16).digest())
+    with _CORR_CACHE_LOCK:
+        corr = _CORR_CACHE.get(key)
+        if corr is not None:
+            _CORR_CACHE.move_to_end(key)
+    if corr is None:
+        corr = Analytics.correlation_matrix(df, symbols)
+        with _CORR_CACHE_LOCK:
+            _CORR_CACHE[key] = corr
+            if len(_CORR_CACHE) > _CORR_CACHE_SIZE:
+                _CORR_CACHE.popitem(last=False)
+    return create_correlation_matrix_chart(corr)
+
+
+def create_correlation_matrix_chart(corr: pd.DataFrame) -> go.Figure:
+    """
+    Create correlation heatmap from a precomputed correlation matrix
+    
+    Args:
+        corr: Square correlation matrix with symbols as index and columns
     
+    Returns:
+        Plotly figure
+    """
     fig = go.Figure(data=go.Heatmap(
         z=corr.values,
         x=[s.upper() for s in corr.columns],
@@ -414,7 +723,6 @@ def create_correlation_heatmap(df: pd.DataFrame, symbols: list) -> go.Figure:
     fig.update_layout(
         title=dict(text='Correlation Matrix', font=dict(color=COLORS['text'], size=20)),
         height=500,
-        template='plotly_dark',
         paper_bgcolor=COLORS['background'],
         plot_bgcolor=COLORS['paper'],
         font=dict(color=COLORS['text'], family='Inter, sans-serif'),
@@ -439,25 +747,24 @@ def create_backtest_chart(trades_df: pd.DataFrame, positions: pd.Series,
     Returns:
         Plotly figure
     """
-    fig = make_subplots(
-        rows=2, cols=1,
-        shared_xaxes=True,
+    layout, axes = _subplot_grid(
+        row_heights=(0.5, 0.5),
         vertical_spacing=0.05,
         subplot_titles=('Spread with Entry/Exit Signals', 'Position & Cumulative P&L'),
-        row_heights=[0.5, 0.5]
     )
+    price_axes = _trace_axes(axes[1, False])
+    position_axes = _trace_axes(axes[2, False])
     
     # Spread line
-    fig.add_trace(
-        go.Scatter(
-            x=spread.index,
-            y=spread.values,
-            name='Spread',
-            line=dict(color=COLORS['primary'], width=1),
-            opacity=0.7
-        ),
-        row=1, col=1
-    )
+    data = [{
+        'type': 'scattergl',
+        'x': spread.index,
+        'y': _as_f32(spread),
+        'name': 'Spread',
+        'line': {'color': COLORS['primary'], 'width': 1},
+        'opacity': 0.7,
+        **price_axes,
+    }]
     
     # Entry/exit markers
     if not trades_df.empty:
@@ -465,67 +772,59 @@ def create_backtest_chart(trades_df: pd.DataFrame, positions: pd.Series,
         shorts = trades_df[trades_df['side'] == 'short']
         
         if not longs.empty:
-            fig.add_trace(
-                go.Scatter(
-                    x=longs['entry_time'],
-                    y=longs['entry_price'],
-                    mode='markers',
-                    name='Long Entry',
-                    marker=dict(color=COLORS['secondary'], size=12, symbol='triangle-up'),
-                ),
-                row=1, col=1
-            )
+            data.append({
+                'type': 'scatter',
+                'x': longs['entry_time'],
+                'y': longs['entry_price'],
+                'mode': 'markers',
+                'name': 'Long Entry',
+                'marker': {'color': COLORS['secondary'], 'size': 12, 'symbol': 'triangle-up'},
+                **price_axes,
+            })
         
         if not shorts.empty:
-            fig.add_trace(
-                go.Scatter(
-                    x=shorts['entry_time'],
-                    y=shorts['entry_price'],
-                    mode='markers',
-                    name='Short Entry',
-                    marker=dict(color=COLORS['danger'], size=12, symbol='triangle-down'),
-                ),
-                row=1, col=1
-            )
+            data.append({
+                'type': 'scatter',
+                'x': shorts['entry_time'],
+                'y': shorts['entry_price'],
+                'mode': 'markers',
+                'name': 'Short Entry',
+                'marker': {'color': COLORS['danger'], 'size': 12, 'symbol': 'triangle-down'},
+                **price_axes,
+            })
     
     # Position line
-    fig.add_trace(
-        go.Scatter(
-            x=positions.index,
-            y=positions.values,
-            name='Position',
-            line=dict(color=COLORS['purple'], width=2),
-            fill='tozeroy',
-            fillcolor=f'rgba(167, 139, 250, 0.2)'
-        ),
-        row=2, col=1
-    )
+    data.append({
+        'type': 'scattergl',
+        'x': positions.index,
+        'y': _as_f32(positions),
+        'name': 'Position',
+        'line': {'color': COLORS['purple'], 'width': 2},
+        'fill': 'tozeroy',
+        'fillcolor': 'rgba(167, 139, 250, 0.2)',
+        **position_axes,
+    })
     
     # Cumulative P&L
     if not trades_df.empty and 'pnl' in trades_df.columns:
-        cum_pnl = trades_df['pnl'].fillna(0).cumsum()
-        fig.add_trace(
-            go.Scatter(
-                x=trades_df['exit_time'],
-                y=cum_pnl,
-                name='Cumulative P&L',
-                line=dict(color=COLORS['secondary'], width=3),
-                yaxis='y2'
-            ),
-            row=2, col=1
-        )
+        # Accumulate in float64 so long trade logs don't drift, then ship as float32
+        cum_pnl = np.cumsum(np.nan_to_num(trades_df['pnl'].to_numpy(dtype=np.float64)))
+        data.append({
+            'type': 'scattergl',
+            'x': trades_df['exit_time'].to_numpy(),
+            'y': _as_f32(cum_pnl),
+            'name': 'Cumulative P&L',
+            'line': {'color': COLORS['secondary'], 'width': 3},
+            **position_axes,
+        })
     
     # Update layout
-    fig.update_layout(
-        height=700,
-        **CHART_TEMPLATE['layout'],
-        legend=dict(font=dict(color=COLORS['text']))
-    )
-    
-    fig.update_xaxes(gridcolor=COLORS['grid'])
-    fig.update_yaxes(gridcolor=COLORS['grid'])
+    _apply_chart_template(layout)
+    layout.update(height=700, legend={'font': {'color': COLORS['text']}})
+    _style_axes(layout, 'xaxis', gridcolor=COLORS['grid'])
+    _style_axes(layout, 'yaxis', gridcolor=COLORS['grid'])
     
-    return fig
+    return go.Figure({'data': data, 'layout': layout})
 
 
 def create_distribution_chart(data: pd.Series, title: str = "Distribution") -> go.Figure:
@@ -541,10 +840,16 @@ def create_distribution_chart(data: pd.Series, title: str = "Distribution") -> g
     """
     fig = go.Figure()
     
+    # Bin here so the browser gets 50 counts instead of every raw value
+    values = data.to_numpy(dtype=np.float64)
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=50)
+    
     fig.add_trace(
-        go.Histogram(
-            x=data,
-            nbinsx=50,
+        go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts.astype(np.int32),
+            width=np.diff(edges),
             name='Distribution',
             marker_color=COLORS['primary'],
             opacity=0.7
@@ -552,23 +857,23 @@ def create_distribution_chart(data: pd.Series, title: str = "Distribution") -> g
     )
     
     # Add mean line
-    mean_val = data.mean()
-    fig.add_vline(
-        x=mean_val,
-        line_dash="dash",
-        line_color=COLORS['warning'],
-        line_width=2,
-        annotation_text=f"Mean: {mean_val:.4f}",
-        annotation_font_color=COLORS['text']
-    )
-    
+    mean_val = values.mean() if len(values) else np.nan
     fig.update_layout(
         title=dict(text=f'{title}', font=dict(color=COLORS['text'], size=20)),
         xaxis_title=title,
         yaxis_title="Frequency",
         height=400,
         **CHART_TEMPLATE['layout'],
-        showlegend=False
+        showlegend=False,
+        shapes=[{
+            'type': 'line', 'xref': 'x', 'x0': mean_val, 'x1': mean_val,
+            'yref': 'y domain', 'y0': 0, 'y1': 1,
+            'line': {'color': COLORS['warning'], 'dash': 'dash', 'width': 2},
+        }],
+        annotations=[{
+            'text': f"Mean: {mean_val:.4f}", 'font': {'color': COLORS['text']}, 'showarrow': False,
+            'xref': 'x', 'x': mean_val, 'xanchor': 'left', 'yref': 'y domain', 'y': 1, 'yanchor': 'top',
+        }],
     )
     
     return fig
@@ -591,9 +896,9 @@ def create_rolling_correlation_chart(corr: pd.Series, s1: str, s2: str,
     fig = go.Figure()
     
     fig.add_trace(
-        go.Scatter(
+        go.Scattergl(
             x=corr.index,
-            y=corr.values,
+            y=_as_f32(corr),
             mode='lines',
             name='Correlation',
             line=dict(color=COLORS['orange'], width=2),
@@ -603,11 +908,11 @@ def create_rolling_correlation_chart(corr: pd.Series, s1: str, s2: str,
     )
     
     # Add reference lines
-    fig.add_hline(y=0.8, line_dash="dash", line_color=COLORS['secondary'], 
-                 annotation_text="High Correlation", annotation_font_color=COLORS['text'])
-    fig.add_hline(y=0, line_dash="dot", line_color=COLORS['text'])
-    fig.add_hline(y=-0.8, line_dash="dash", line_color=COLORS['danger'],
-                 annotation_text="Negative Correlation", annotation_font_color=COLORS['text'])
+    lines = [
+        _hline(0.8, COLORS['secondary'], 'dash', text="High Correlation"),
+        _hline(0, COLORS['text'], 'dot'),
+        _hline(-0.8, COLORS['danger'], 'dash', text="Negative Correlation"),
+    ]
     
     fig.update_layout(
         title=dict(
@@ -617,7 +922,9 @@ def create_rolling_correlation_chart(corr: pd.Series, s1: str, s2: str,
         xaxis_title="Time",
         yaxis_title="Correlation",
         height=400,
-        **CHART_TEMPLATE['layout']
+        **CHART_TEMPLATE['layout'],
+        shapes=[shape for shape, _ in lines],
+        annotations=[label for _, label in lines if label],
     )
     
     return fig